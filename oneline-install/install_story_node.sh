@@ -31,12 +31,45 @@ GO_BIN_DIR="$USER_HOME/go/bin"
 SERVICE_DIR="/etc/systemd/system"
 PORTS=(26656 26657 1317 8545 8546)
 SERVICES=("story-geth.service" "story.service")
+GETH_VERSION="0.9.4"
+STORY_VERSION="0.11.0-aac4bfe"
+COSMOVISOR_VERSION="${COSMOVISOR_VERSION:-latest}"
 BINARY_URLS=(
-    "https://github.com/piplabs/story-geth/releases/download/v0.9.4/geth-linux-amd64"
-    "https://story-geth-binaries.s3.us-west-1.amazonaws.com/story-public/story-linux-amd64-0.11.0-aac4bfe.tar.gz"
+    "https://github.com/piplabs/story-geth/releases/download/v${GETH_VERSION}/geth-linux-amd64"
+    "https://story-geth-binaries.s3.us-west-1.amazonaws.com/story-public/story-linux-amd64-${STORY_VERSION}.tar.gz"
 )
+# Content-addressed cache for downloaded and built artifacts:
+#   sha256/<hash>          - the artifact itself
+#   index/<name>-<version> - the hash of the artifact for this name and version
+# Can point to an NFS share to serve several machines. Set ARTIFACT_CACHE_DIR="" to disable.
+ARTIFACT_CACHE_DIR="${ARTIFACT_CACHE_DIR-/var/cache/story-installer}"
 ADDRBOOK_URL="https://story.snapshot.stake-take.com/addrbook.json"
+SNAPSHOT_BASE_URL="${SNAPSHOT_BASE_URL:-https://story.snapshot.stake-take.com}"
+# Mirrors for every artifact (space-separated lists, can be overridden from the environment).
+# The installer measures each mirror with a short range request and downloads from the fastest one,
+# falling back to the next mirror on failure.
+read -r -a GO_MIRRORS <<< "${GO_MIRRORS:-https://dl.google.com/go https://golang.org/dl}"
+read -r -a GETH_MIRRORS <<< "${GETH_MIRRORS:-${BINARY_URLS[0]}}"
+read -r -a STORY_MIRRORS <<< "${STORY_MIRRORS:-${BINARY_URLS[1]}}"
+read -r -a ADDRBOOK_MIRRORS <<< "${ADDRBOOK_MIRRORS:-$ADDRBOOK_URL}"
+read -r -a SNAPSHOT_MIRRORS <<< "${SNAPSHOT_MIRRORS:-$SNAPSHOT_BASE_URL}"
+MIRROR_PROBE_BYTES="${MIRROR_PROBE_BYTES:-1048576}"  # 1 MB per probe
+MIRROR_PROBE_TIMEOUT="${MIRROR_PROBE_TIMEOUT:-5}"
+SNAPSHOT_FILES=("snapshot_geth.tar.lz4" "snapshot_consensus.tar.lz4")
+# parallel: download both archives with aria2 (segmented, resumable, checksum-verified), then extract
+# stream:   pipe curl straight into tar (no extra disk space needed)
+SNAPSHOT_DOWNLOAD_MODE="${SNAPSHOT_DOWNLOAD_MODE:-parallel}"
+SNAPSHOT_DOWNLOAD_DIR="${SNAPSHOT_DOWNLOAD_DIR:-$USER_HOME/.story/snapshot_download}"
+SNAPSHOT_CONNECTIONS="${SNAPSHOT_CONNECTIONS:-8}"
 STATE_SYNC_RPC="https://story-testnet-rpc.stake-take.com:443"
+# Sync monitor: sampling interval, reference RPC for the network head,
+# and how many samples without progress count as a stall
+SYNC_MONITOR_INTERVAL="${SYNC_MONITOR_INTERVAL:-10}"
+SYNC_MONITOR_REFERENCE_RPC="${SYNC_MONITOR_REFERENCE_RPC:-$STATE_SYNC_RPC}"
+SYNC_STALL_SAMPLES="${SYNC_STALL_SAMPLES:-6}"
+SYNC_EMA_ALPHA="0.3"
+# Local validator bot endpoint with a precomputed and cross-checked state sync trust point
+BOT_STATE_SYNC_URL="${BOT_STATE_SYNC_URL:-http://127.0.0.1:8787/state_sync}"
 
 # Function to print informational messages
 info() {
@@ -99,6 +132,132 @@ install_dependencies() {
     apt install -y -qq curl git make jq build-essential gcc unzip wget lz4 aria2 || error_exit "Failed to install necessary packages."
 }
 
+# Function to order mirrors by measured throughput, fastest first.
+# Usage: rank_mirrors [--working-only] <suffix> <mirror>... ; probes "<mirror><suffix>" with a short range request.
+# Mirrors that fail the probe are kept at the end as a last resort, or dropped with --working-only.
+# Prints one mirror per line.
+rank_mirrors() {
+    local working_only=false
+    if [[ "$1" == "--working-only" ]]; then
+        working_only=true
+        shift
+    fi
+    local suffix="$1"
+    shift
+    if (( $# <= 1 )); then
+        printf '%s\n' "$@"
+        return
+    fi
+
+    local probe_dir index mirror result code speed
+    local pids=()
+    probe_dir=$(mktemp -d)
+    index=0
+    for mirror in "$@"; do
+        (
+            curl -s -L -o /dev/null -r "0-$(( MIRROR_PROBE_BYTES - 1 ))" --max-time "$MIRROR_PROBE_TIMEOUT" \
+                -w '%{http_code} %{speed_download} %{time_starttransfer}' "$mirror$suffix" > "$probe_dir/$index" 2>/dev/null || true
+        ) &
+        pids+=($!)
+        index=$(( index + 1 ))
+    done
+    wait "${pids[@]}"
+
+    local ranked=() failed=()
+    index=0
+    for mirror in "$@"; do
+        read -r code speed result < "$probe_dir/$index" || true
+        if [[ "$code" == "200" || "$code" == "206" ]]; then
+            echo -e "${GREEN}[INFO]${NC} Mirror $mirror: $(( ${speed%.*} / 1024 )) KB/s, first byte after ${result}s" >&2
+            ranked+=("${speed%.*} $mirror")
+        else
+            echo -e "${YELLOW}[WARNING]${NC} Mirror $mirror is not responding (HTTP ${code:-none})." >&2
+            failed+=("$mirror")
+        fi
+        index=$(( index + 1 ))
+    done
+    rm -rf "$probe_dir"
+
+    if (( ${#ranked[@]} > 0 )); then
+        printf '%s\n' "${ranked[@]}" | sort -rn | awk '{print $2}'
+    fi
+    if (( ${#failed[@]} > 0 )) && [[ "$working_only" == false ]]; then
+        printf '%s\n' "${failed[@]}"
+    fi
+}
+
+# Function to download a file from the fastest working mirror.
+# Usage: download_from_mirrors <output> <suffix> <mirror>...
+download_from_mirrors() {
+    local output="$1"
+    local suffix="$2"
+    shift 2
+
+    local mirror
+    for mirror in $(rank_mirrors "$suffix" "$@"); do
+        info "Downloading $mirror$suffix..."
+        if curl -fL --retry 2 --progress-bar "$mirror$suffix" -o "$output.part"; then
+            mv "$output.part" "$output"
+            return 0
+        fi
+        warning "Download from $mirror failed, trying the next mirror."
+    done
+    rm -f "$output.part"
+    return 1
+}
+
+# Function to copy an artifact from the cache. Usage: cache_lookup <name> <version> <destination>
+# Returns non-zero if the artifact is not cached or its hash does not match.
+cache_lookup() {
+    local name="$1" version="$2" destination="$3"
+    [[ -n "$ARTIFACT_CACHE_DIR" ]] || return 1
+    local index="$ARTIFACT_CACHE_DIR/index/$name-$version"
+    [[ -f "$index" ]] || return 1
+
+    local hash blob
+    hash=$(<"$index")
+    blob="$ARTIFACT_CACHE_DIR/sha256/$hash"
+    if [[ ! -f "$blob" ]] || [[ "$(sha256sum "$blob" | awk '{print $1}')" != "$hash" ]]; then
+        warning "Cached $name $version is missing or corrupted, it will be downloaded again."
+        rm -f "$index" "$blob"
+        return 1
+    fi
+    cp "$blob" "$destination.part" && mv "$destination.part" "$destination" || return 1
+    info "Using cached $name $version (sha256 $hash)."
+}
+
+# Function to put an artifact into the cache. Usage: cache_store <name> <version> <file>
+# Files are written under a temporary name and renamed, so concurrent installs sharing the cache
+# never see a partially written artifact.
+cache_store() {
+    local name="$1" version="$2" file="$3"
+    [[ -n "$ARTIFACT_CACHE_DIR" ]] || return 0
+    if ! mkdir -p "$ARTIFACT_CACHE_DIR/sha256" "$ARTIFACT_CACHE_DIR/index" 2>/dev/null; then
+        warning "Artifact cache $ARTIFACT_CACHE_DIR is not writable, skipping cache."
+        return 0
+    fi
+
+    local hash blob
+    hash=$(sha256sum "$file" | awk '{print $1}')
+    blob="$ARTIFACT_CACHE_DIR/sha256/$hash"
+    if [[ ! -f "$blob" ]]; then
+        cp "$file" "$blob.$$.tmp" && mv "$blob.$$.tmp" "$blob" || { rm -f "$blob.$$.tmp"; return 0; }
+    fi
+    echo "$hash" > "$ARTIFACT_CACHE_DIR/index/$name-$version.$$.tmp" \
+        && mv "$ARTIFACT_CACHE_DIR/index/$name-$version.$$.tmp" "$ARTIFACT_CACHE_DIR/index/$name-$version"
+    info "Cached $name $version (sha256 $hash)."
+}
+
+# Function to get an artifact from the cache or, failing that, from the fastest mirror.
+# Usage: fetch_artifact <name> <version> <output> <suffix> <mirror>...
+fetch_artifact() {
+    local name="$1" version="$2" output="$3"
+    shift 3
+    cache_lookup "$name" "$version" "$output" && return 0
+    download_from_mirrors "$output" "$@" || return 1
+    cache_store "$name" "$version" "$output"
+}
+
 # Function to install Go
 install_go() {
     # Check if Go is already installed
@@ -125,7 +284,7 @@ install_go() {
 
     # Download and install Go
     info "Downloading Go version $GO_VERSION..."
-    wget -q "https://golang.org/dl/${GO_TARBALL}" -O "/tmp/${GO_TARBALL}" || error_exit "Failed to download Go."
+    fetch_artifact "go-linux-amd64" "$GO_VERSION" "/tmp/${GO_TARBALL}" "/${GO_TARBALL}" "${GO_MIRRORS[@]}" || error_exit "Failed to download Go."
 
     info "Installing Go version $GO_VERSION..."
     tar -C /usr/local -xzf "/tmp/${GO_TARBALL}" || error_exit "Failed to extract Go."
@@ -163,8 +322,23 @@ install_cosmovisor() {
         return
     fi
 
-    info "Installing Cosmovisor..."
-    go install cosmossdk.io/tools/cosmovisor/cmd/cosmovisor@latest || error_exit "Failed to install Cosmovisor."
+    # Resolve "latest" to a concrete version so the build can be cached
+    local version="$COSMOVISOR_VERSION"
+    if [[ "$version" == "latest" ]]; then
+        version=$(go list -m -f '{{.Version}}' cosmossdk.io/tools/cosmovisor@latest 2>/dev/null || true)
+        version="${version:-latest}"
+    fi
+
+    mkdir -p "$GO_BIN_DIR"
+    if [[ "$version" != "latest" ]] && cache_lookup "cosmovisor-linux-amd64" "$version" "$GO_BIN_DIR/cosmovisor"; then
+        info "Cosmovisor $version restored from cache."
+    else
+        info "Installing Cosmovisor $version..."
+        go install "cosmossdk.io/tools/cosmovisor/cmd/cosmovisor@$version" || error_exit "Failed to install Cosmovisor."
+        if [[ "$version" != "latest" && -f "$GO_BIN_DIR/cosmovisor" ]]; then
+            cache_store "cosmovisor-linux-amd64" "$version" "$GO_BIN_DIR/cosmovisor"
+        fi
+    fi
 
     # Verify Cosmovisor installation
     if [[ -f "$GO_BIN_DIR/cosmovisor" ]]; then
@@ -191,19 +365,17 @@ download_and_install_binaries() {
     info "Downloading and installing binaries..."
 
     # Download and install story-geth
-    geth_url="${BINARY_URLS[0]}"
-    geth_filename=$(basename "$geth_url")
-    info "Downloading story-geth from $geth_url..."
-    wget -q --show-progress "$geth_url" -O "/tmp/$geth_filename" || error_exit "Failed to download story-geth."
+    geth_filename=$(basename "${GETH_MIRRORS[0]}")
+    info "Downloading story-geth..."
+    fetch_artifact "story-geth-linux-amd64" "$GETH_VERSION" "/tmp/$geth_filename" "" "${GETH_MIRRORS[@]}" || error_exit "Failed to download story-geth."
     chmod +x "/tmp/$geth_filename"
     mv "/tmp/$geth_filename" "$GO_BIN_DIR/story-geth" || error_exit "Failed to move story-geth binary."
     info "story-geth installed successfully."
 
     # Download and extract story
-    story_url="${BINARY_URLS[1]}"
-    story_tarball=$(basename "$story_url")
-    info "Downloading story from $story_url..."
-    wget -q --show-progress "$story_url" -O "/tmp/$story_tarball" || error_exit "Failed to download story."
+    story_tarball=$(basename "${STORY_MIRRORS[0]}")
+    info "Downloading story..."
+    fetch_artifact "story-linux-amd64" "$STORY_VERSION" "/tmp/$story_tarball" "" "${STORY_MIRRORS[@]}" || error_exit "Failed to download story."
     info "Extracting $story_tarball..."
     tar -xzvf "/tmp/$story_tarball" -C "/tmp/" || error_exit "Failed to extract $story_tarball."
     story_binary_path=$(find /tmp -type f -name "story" | head -n 1)
@@ -351,10 +523,123 @@ download_addrbook() {
         error_exit "Node configuration directory not found. Please initialize the node first."
     fi
 
-    curl -Ls "$ADDRBOOK_URL" -o "$USER_HOME/.story/story/config/addrbook.json" || error_exit "Failed to download addrbook.json."
+    download_from_mirrors "$USER_HOME/.story/story/config/addrbook.json" "" "${ADDRBOOK_MIRRORS[@]}" || error_exit "Failed to download addrbook.json."
     info "addrbook.json has been updated."
 }
 
+# Function to get the expected sha256 of a snapshot archive.
+# Uses the snapshot_meta.json sidecar first, then a "<archive>.sha256" file. Prints nothing if unknown.
+snapshot_checksum() {
+    local name="$1"
+    local checksum
+    checksum=$(curl -s --fail --max-time 10 "$SNAPSHOT_BASE_URL/snapshot_meta.json" | jq -r --arg name "$name" '.[$name].sha256 // empty' 2>/dev/null || true)
+    if [[ -z "$checksum" ]]; then
+        checksum=$(curl -s --fail --max-time 10 "$SNAPSHOT_BASE_URL/$name.sha256" | awk '{print $1}' || true)
+    fi
+    echo "$checksum"
+}
+
+# Function to check that the download directory can hold both archives.
+# The extracted data needs additional space on top of that, which is not checked here.
+snapshot_space_available() {
+    local dir="$1"
+    local required=0 size name available
+
+    for name in "${SNAPSHOT_FILES[@]}"; do
+        size=$(curl -sIL --max-time 10 "$SNAPSHOT_BASE_URL/$name" | awk 'tolower($1) == "content-length:" {len=$2} END {print len+0}')
+        required=$(( required + size ))
+    done
+    # Already downloaded parts do not need to be fetched again
+    if [[ -d "$dir" ]]; then
+        required=$(( required - $(du -sb "$dir" | awk '{print $1}') ))
+    fi
+
+    mkdir -p "$dir"
+    available=$(df --output=avail -B1 "$dir" | tail -n 1)
+    info "Snapshot archives need $(( required / 1024 / 1024 )) MB, $(( available / 1024 / 1024 )) MB available in $dir."
+    (( available > required ))
+}
+
+# Function to download all snapshot archives concurrently with aria2.
+# Each archive is split into segments; interrupted downloads resume from where they stopped,
+# and archives with a published sha256 are verified before extraction.
+download_snapshots_parallel() {
+    local dir="$1"
+    local input_file="$dir/aria2.input"
+    local name checksum
+
+    mkdir -p "$dir"
+    : > "$input_file"
+    for name in "${SNAPSHOT_FILES[@]}"; do
+        # All working mirrors (SNAPSHOT_RANKED_MIRRORS holds only those that passed the probe)
+        # go on one line: aria2 spreads the segments across them and switches to another mirror if one fails
+        printf '%s\t' "${SNAPSHOT_RANKED_MIRRORS[@]/%//$name}" | sed 's/\t$//' >> "$input_file"
+        echo >> "$input_file"
+        echo "  out=$name" >> "$input_file"
+        checksum=$(snapshot_checksum "$name")
+        if [[ -n "$checksum" ]]; then
+            echo "  checksum=sha-256=$checksum" >> "$input_file"
+        else
+            warning "No checksum published for $name, it will not be verified."
+        fi
+    done
+
+    info "Downloading ${#SNAPSHOT_FILES[@]} snapshot archives to $dir with $SNAPSHOT_CONNECTIONS connections each..."
+    aria2c --input-file="$input_file" --dir="$dir" \
+        --max-concurrent-downloads="${#SNAPSHOT_FILES[@]}" \
+        --split="$SNAPSHOT_CONNECTIONS" --max-connection-per-server="$SNAPSHOT_CONNECTIONS" \
+        --min-split-size=64M --continue=true --check-integrity=true \
+        --auto-file-renaming=false --allow-overwrite=true --file-allocation=none \
+        --console-log-level=warn --summary-interval=30 || return 1
+    rm -f "$input_file"
+    info "Snapshot archives downloaded and verified."
+}
+
+# Function to extract the downloaded archives in parallel.
+# lz4 is given -T0 (all cores) when the installed version supports threads.
+extract_snapshots_parallel() {
+    local dir="$1"
+    local decompressor="lz4"
+    local geth_pid story_pid status=0
+
+    if lz4 -h 2>&1 | grep -q -- '-T#'; then
+        decompressor="lz4 -T0"
+    fi
+
+    info "Extracting snapshots..."
+    tar -I "$decompressor" -xf "$dir/snapshot_geth.tar.lz4" -C "$USER_HOME/.story/geth" &
+    geth_pid=$!
+    tar -I "$decompressor" -xf "$dir/snapshot_consensus.tar.lz4" -C "$USER_HOME/.story/story" &
+    story_pid=$!
+
+    wait "$geth_pid" || { warning "Failed to extract geth snapshot."; status=1; }
+    wait "$story_pid" || { warning "Failed to extract consensus snapshot."; status=1; }
+    return "$status"
+}
+
+# Function to stream one archive into tar, trying the ranked mirrors in order.
+# Each attempt extracts into a fresh directory next to the target, so a download that breaks
+# halfway does not leave partial files under the next mirror's archive; the result is merged
+# into the target (hard links, same filesystem) only after a complete extraction.
+stream_snapshot() {
+    local name="$1"
+    local target="$2"
+    local staging="$target/.snapshot_staging"
+    local mirror
+    for mirror in "${SNAPSHOT_RANKED_MIRRORS[@]}"; do
+        rm -rf "$staging"
+        mkdir -p "$staging"
+        if curl -fL "$mirror/$name" | tar -Ilz4 -xf - -C "$staging"; then
+            cp -al --remove-destination "$staging/." "$target/" || { rm -rf "$staging"; return 1; }
+            rm -rf "$staging"
+            return 0
+        fi
+        warning "Failed to stream $name from $mirror, trying the next mirror."
+    done
+    rm -rf "$staging"
+    return 1
+}
+
 # Function to install snapshot
 install_snapshot() {
     # Check if node is initialized
@@ -363,7 +648,28 @@ install_snapshot() {
     fi
 
     # Install necessary tools
-    apt install -y -qq curl tar lz4 || error_exit "Failed to install snapshot dependencies."
+    apt install -y -qq curl tar lz4 aria2 jq || error_exit "Failed to install snapshot dependencies."
+
+    # Pick the fastest snapshot mirror; metadata and checksums are read from it.
+    # Mirrors that fail the probe are not used at all: aria2 would spread segments across them
+    mapfile -t SNAPSHOT_RANKED_MIRRORS < <(rank_mirrors --working-only "/${SNAPSHOT_FILES[0]}" "${SNAPSHOT_MIRRORS[@]}")
+    if (( ${#SNAPSHOT_RANKED_MIRRORS[@]} == 0 )); then
+        error_exit "None of the snapshot mirrors is reachable, please try again later."
+    fi
+    SNAPSHOT_BASE_URL="${SNAPSHOT_RANKED_MIRRORS[0]}"
+    info "Using snapshot mirror $SNAPSHOT_BASE_URL."
+
+    local mode="$SNAPSHOT_DOWNLOAD_MODE"
+    if [[ "$mode" == "parallel" ]] && ! snapshot_space_available "$SNAPSHOT_DOWNLOAD_DIR"; then
+        warning "Not enough free disk space to keep the archives, falling back to streaming mode."
+        mode="stream"
+    fi
+
+    # In parallel mode the archives are downloaded while the node is still running,
+    # so the node is only stopped for the extraction
+    if [[ "$mode" == "parallel" ]]; then
+        download_snapshots_parallel "$SNAPSHOT_DOWNLOAD_DIR" || error_exit "Failed to download snapshots."
+    fi
 
     # Stop services before installing snapshot
     info "Stopping node services..."
@@ -379,12 +685,17 @@ install_snapshot() {
     rm -rf "$USER_HOME/.story/story/data"
     rm -rf "$USER_HOME/.story/geth/iliad/geth/chaindata"
 
-    # Download and extract snapshots
-    info "Downloading and extracting geth snapshot..."
-    curl -L https://story.snapshot.stake-take.com/snapshot_geth.tar.lz4 | tar -Ilz4 -xf - -C "$USER_HOME/.story/geth" || error_exit "Failed to extract geth snapshot."
+    if [[ "$mode" == "parallel" ]]; then
+        extract_snapshots_parallel "$SNAPSHOT_DOWNLOAD_DIR" || error_exit "Failed to extract snapshots."
+        rm -rf "$SNAPSHOT_DOWNLOAD_DIR"
+    else
+        # Download and extract snapshots
+        info "Downloading and extracting geth snapshot..."
+        stream_snapshot "snapshot_geth.tar.lz4" "$USER_HOME/.story/geth" || error_exit "Failed to extract geth snapshot."
 
-    info "Downloading and extracting consensus snapshot..."
-    curl -L https://story.snapshot.stake-take.com/snapshot_consensus.tar.lz4 | tar -Ilz4 -xf - -C "$USER_HOME/.story/story" || error_exit "Failed to extract consensus snapshot."
+        info "Downloading and extracting consensus snapshot..."
+        stream_snapshot "snapshot_consensus.tar.lz4" "$USER_HOME/.story/story" || error_exit "Failed to extract consensus snapshot."
+    fi
 
     # Restore priv_validator_state.json from backup
     info "Restoring priv_validator_state.json from backup..."
@@ -402,6 +713,23 @@ install_snapshot() {
     info "Snapshot installation completed successfully."
 }
 
+# Function to get a precomputed trust point from the local validator bot.
+# Returns non-zero if the bot is not reachable or has no trust point yet.
+fetch_state_sync_from_bot() {
+    local response
+    response=$(curl -s --fail --max-time 3 "$BOT_STATE_SYNC_URL" || true)
+    if [[ -z "$response" ]] || ! echo "$response" | jq -e '.trust_height and .trust_hash' &>/dev/null; then
+        warning "State sync trust point is not available from $BOT_STATE_SYNC_URL, querying $STATE_SYNC_RPC directly."
+        return 1
+    fi
+
+    LATEST_HEIGHT=$(echo "$response" | jq -r .latest_height)
+    SYNC_BLOCK_HEIGHT=$(echo "$response" | jq -r .trust_height)
+    SYNC_BLOCK_HASH=$(echo "$response" | jq -r .trust_hash)
+    STATE_SYNC_RPC_SERVERS=$(echo "$response" | jq -r '.rpc_servers | join(",")')
+    info "Using trust point verified by $(echo "$response" | jq -r .verified_by) RPC(s) from $BOT_STATE_SYNC_URL."
+}
+
 # Function to perform state sync
 perform_state_sync() {
     # Check if node is initialized
@@ -423,9 +751,12 @@ perform_state_sync() {
     # Get and configure state sync information
     info "Configuring state sync..."
 
-    LATEST_HEIGHT=$(curl -s "$STATE_SYNC_RPC/block" | jq -r .result.block.header.height)
-    SYNC_BLOCK_HEIGHT=$(( (LATEST_HEIGHT / 1000) * 1000 ))
-    SYNC_BLOCK_HASH=$(curl -s "$STATE_SYNC_RPC/block?height=$SYNC_BLOCK_HEIGHT" | jq -r .result.block_id.hash)
+    if ! fetch_state_sync_from_bot; then
+        LATEST_HEIGHT=$(curl -s "$STATE_SYNC_RPC/block" | jq -r .result.block.header.height)
+        SYNC_BLOCK_HEIGHT=$(( (LATEST_HEIGHT / 1000) * 1000 ))
+        SYNC_BLOCK_HASH=$(curl -s "$STATE_SYNC_RPC/block?height=$SYNC_BLOCK_HEIGHT" | jq -r .result.block_id.hash)
+        STATE_SYNC_RPC_SERVERS="$STATE_SYNC_RPC,$STATE_SYNC_RPC"
+    fi
 
     echo "Latest Height: $LATEST_HEIGHT"
     echo "Sync Block Height: $SYNC_BLOCK_HEIGHT"
@@ -434,7 +765,7 @@ perform_state_sync() {
     CONFIG_TOML="$USER_HOME/.story/story/config/config.toml"
 
     sed -i.bak -e "s|^enable *=.*|enable = true|" \
-        -e "s|^rpc_servers *=.*|rpc_servers = \"$STATE_SYNC_RPC,$STATE_SYNC_RPC\"|" \
+        -e "s|^rpc_servers *=.*|rpc_servers = \"$STATE_SYNC_RPC_SERVERS\"|" \
         -e "s|^trust_height *=.*|trust_height = $SYNC_BLOCK_HEIGHT|" \
         -e "s|^trust_hash *=.*|trust_hash = \"$SYNC_BLOCK_HASH\"|" \
         -e "s|^persistent_peers *=.*|persistent_peers = \"\"|" \
@@ -458,6 +789,102 @@ perform_state_sync() {
     info "State sync initiated. It may take some time to complete."
 }
 
+# Function to format a number of seconds as "1h 05m 10s"
+format_duration() {
+    local total="$1"
+    printf '%dh %02dm %02ds' $(( total / 3600 )) $(( total % 3600 / 60 )) $(( total % 60 ))
+}
+
+# Function to monitor synchronization progress: throughput, smoothed ETA and stall detection
+monitor_sync() {
+    info "Monitoring synchronization every ${SYNC_MONITOR_INTERVAL}s against $SYNC_MONITOR_REFERENCE_RPC."
+    info "Press Ctrl+C to return to the menu."
+
+    local stop=0 samples=0 stalled=0 warned=0
+    local prev_time="" prev_height="" prev_head="" ema_rate="" ema_head_rate=""
+    local now status height block_time catching_up head peers block_lag
+    local rate head_rate net_rate gap eta
+    trap 'stop=1' INT
+
+    while (( stop == 0 )); do
+        now=$(date +%s)
+        status=$(curl -s --max-time 5 localhost:26657/status | jq -c '.result.sync_info' 2>/dev/null || true)
+        if [[ -z "$status" || "$status" == "null" ]]; then
+            warning "Local node is not responding on localhost:26657."
+            sleep "$SYNC_MONITOR_INTERVAL" || true
+            continue
+        fi
+        height=$(jq -r '.latest_block_height' <<< "$status")
+        block_time=$(jq -r '.latest_block_time' <<< "$status")
+        catching_up=$(jq -r '.catching_up' <<< "$status")
+        head=$(curl -s --max-time 5 "$SYNC_MONITOR_REFERENCE_RPC/status" | jq -r '.result.sync_info.latest_block_height' 2>/dev/null || true)
+        [[ "$head" =~ ^[0-9]+$ ]] || head=""
+        peers=$(curl -s --max-time 5 localhost:26657/net_info | jq -r '.result.n_peers' 2>/dev/null || true)
+        [[ "$peers" =~ ^[0-9]+$ ]] || peers=""
+        block_lag=$(( now - $(date -d "$block_time" +%s 2>/dev/null || echo "$now") ))
+
+        # Blocks per second since the previous sample, smoothed with an exponential moving average
+        if [[ -n "$prev_time" ]] && (( now > prev_time )); then
+            rate=$(awk -v d="$(( height - prev_height ))" -v t="$(( now - prev_time ))" 'BEGIN { printf "%.3f", d / t }')
+            ema_rate=$(awk -v r="$rate" -v e="${ema_rate:-$rate}" -v a="$SYNC_EMA_ALPHA" 'BEGIN { printf "%.3f", a * r + (1 - a) * e }')
+            if [[ -n "$head" && -n "$prev_head" ]]; then
+                head_rate=$(awk -v d="$(( head - prev_head ))" -v t="$(( now - prev_time ))" 'BEGIN { printf "%.3f", d / t }')
+                ema_head_rate=$(awk -v r="$head_rate" -v e="${ema_head_rate:-$head_rate}" -v a="$SYNC_EMA_ALPHA" 'BEGIN { printf "%.3f", a * r + (1 - a) * e }')
+            fi
+            samples=$(( samples + 1 ))
+            if (( height == prev_height )) && [[ "$catching_up" == "true" ]]; then
+                stalled=$(( stalled + 1 ))
+            else
+                stalled=0
+            fi
+        fi
+
+        gap=""
+        [[ -n "$head" ]] && gap=$(( head > height ? head - height : 0 ))
+
+        # The node closes the gap at its own speed minus the speed at which the network produces blocks
+        eta="calculating..."
+        if [[ -n "$ema_rate" && -n "$gap" ]]; then
+            net_rate=$(awk -v r="$ema_rate" -v h="${ema_head_rate:-0}" 'BEGIN { printf "%.3f", r - h }')
+            if (( gap == 0 )); then
+                eta="synced"
+            elif awk -v n="$net_rate" 'BEGIN { exit !(n > 0) }'; then
+                eta=$(format_duration "$(awk -v g="$gap" -v n="$net_rate" 'BEGIN { printf "%d", g / n }')")
+            else
+                eta="never at the current speed"
+            fi
+        fi
+
+        echo "$(date '+%H:%M:%S') height ${height} / head ${head:-N/A} (behind ${gap:-N/A} blocks, last block $(format_duration "$block_lag") ago)" \
+             "| ${ema_rate:-?} blocks/s | peers ${peers:-N/A} | ETA ${eta}"
+
+        if [[ "$catching_up" == "false" && -n "$gap" ]] && (( gap <= 2 )); then
+            info "Your node is fully synchronized."
+            break
+        fi
+
+        # Stall: no new blocks for several samples, or the node is slower than the network itself
+        if (( warned == 0 )) && { (( stalled >= SYNC_STALL_SAMPLES )) || \
+           { (( samples >= SYNC_STALL_SAMPLES )) && [[ "$eta" == "never at the current speed" ]]; }; }; then
+            warning "Synchronization is stalled or too slow to catch up with the network."
+            if [[ -z "$peers" ]] || (( peers < 3 )); then
+                info "The node has few peers: download a fresh addrbook (menu option 4) and restart the services."
+            fi
+            info "Consider state sync (menu option 3) or a snapshot (menu option 2) to catch up faster."
+            warned=1
+        elif (( stalled == 0 )) && [[ "$eta" != "never at the current speed" ]]; then
+            warned=0
+        fi
+
+        prev_time=$now
+        prev_height=$height
+        prev_head=$head
+        sleep "$SYNC_MONITOR_INTERVAL" || true
+    done
+
+    trap - INT
+}
+
 # Function to create validator
 create_validator() {
     info "Creating a validator..."
@@ -607,6 +1034,8 @@ show_menu() {
     echo "7) View service logs"
     echo "8) Completely remove Story node"
     echo "9) Exit"
+    # New entries take the next free number, so existing numbers (and scripted answers) stay valid
+    echo "10) Monitor synchronization progress"
 }
 
 # Function to execute user's choice
@@ -690,9 +1119,13 @@ execute_choice() {
             info "Exiting the script. Goodbye!"
             exit 0
             ;;
+        10)
+            # Monitor synchronization progress
+            monitor_sync
+            ;;
         *)
             # Invalid choice
-            warning "Invalid choice. Please enter a number from 1 to 9."
+            warning "Invalid choice. Please enter a number from 1 to 10."
             ;;
     esac
 }
@@ -703,11 +1136,14 @@ main() {
 
     while true; do
         show_menu
-        read -p "Enter your choice [1-9]: " CHOICE
+        read -p "Enter your choice [1-10]: " CHOICE
         execute_choice "$CHOICE"
         echo
     done
 }
 
-# Run the main function
-main
+# Run the main function (skipped when the script is sourced, e.g. to test single functions).
+# With `curl ... | bash` or `bash -c "$(curl ...)"` BASH_SOURCE is empty, so fall back to $0.
+if [[ "${BASH_SOURCE[0]:-$0}" == "$0" ]]; then
+    main
+fi
@@ -2,50 +2,74 @@
 
 import os
 import discord
-import asyncio
 from discord.ext import commands
 from dotenv import load_dotenv
-from utils.cache import selected_validators
+from utils.cache import get_validator_cache
+from utils.networks import networks
+from utils.snapshot_store import BOT_MODE
 import logging
 
 # Загрузка переменных окружения
 load_dotenv()
 
 TOKEN = os.getenv('DISCORD_TOKEN')
-CHANNEL_ID = int(os.getenv('CHANNEL_ID'))
 GUILD_ID = int(os.getenv('GUILD_ID'))
 
 intents = discord.Intents.default()
 intents.message_content = True
 
-logging.basicConfig(level=logging.DEBUG)
+# Уровень логов задаётся LOG_LEVEL (DEBUG, INFO, WARNING...); DEBUG очень шумный из-за discord.py и aiohttp
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 # Создаём объект Bot с префиксом для текстовых команд
 bot = commands.Bot(command_prefix='/', intents=intents)
 
-# Фоновая задача для обновления кэша валидаторов и мониторинга
-async def background_validator_cache_updater():
-    """Фоновая задача для обновления кэша валидаторов и мониторинга каждые 4 минуты."""
-    from utils.validator_data import get_validator_uptimes
-    while True:
-        await get_validator_uptimes()
-        await asyncio.sleep(240)  # 4 минуты
+# Фоновые задачи уже запущены (on_ready вызывается повторно при переподключении)
+monitoring_started = False
 
 # Событие при готовности бота
 @bot.event
 async def on_ready():
-    print(f'Bot has connected to Discord as {bot.user}')
-    await load_cogs()
+    print(f'Bot has connected to Discord as {bot.user} (mode: {BOT_MODE})')
 
-    # Синхронизация команд приложения
-    try:
-        synced = await bot.tree.sync(guild=discord.Object(id=GUILD_ID))
-        print(f"Synced {len(synced)} commands to the guild {GUILD_ID}")
-    except Exception as e:
-        print(f"Failed to sync commands: {e}")
+    # Процесс poller не обрабатывает нажатия кнопок: коги не загружаем и команды
+    # не синхронизируем, иначе пустое дерево команд затрёт команды frontend-процессов
+    if BOT_MODE != "poller":
+        await load_cogs()
+
+        # Синхронизация команд приложения
+        try:
+            synced = await bot.tree.sync(guild=discord.Object(id=GUILD_ID))
+            print(f"Synced {len(synced)} commands to the guild {GUILD_ID}")
+        except Exception as e:
+            print(f"Failed to sync commands: {e}")
+
+    # Запускаем фоновые задачи мониторинга для каждой сети
+    global monitoring_started
+    if not monitoring_started:
+        monitoring_started = True
+        from utils.loop_watchdog import watchdog
+        bot.loop.create_task(watchdog.heartbeat())
+        await start_http_api_safely()
+        if BOT_MODE == "standalone":
+            await start_monitoring()
+        elif BOT_MODE == "poller":
+            from utils.snapshot_store import run_leader_election
+            bot.loop.create_task(run_leader_election(start_monitoring))
+        elif BOT_MODE == "frontend":
+            from utils.snapshot_store import follow_snapshots
+            for network in networks.values():
+                bot.loop.create_task(follow_snapshots(network.name))
+        else:
+            print(f"Unknown BOT_MODE {BOT_MODE}, background tasks are not started")
 
-    # Запускаем фоновую задачу мониторинга
-    bot.loop.create_task(background_validator_cache_updater())
-    bot.loop.create_task(start_monitoring())
+# Локальный HTTP-эндпоинт (state sync и т.п.); несколько процессов на одном сервере
+# не могут занять один порт — это не повод останавливать бота
+async def start_http_api_safely():
+    from utils.http_api import start_http_api
+    try:
+        await start_http_api()
+    except OSError as e:
+        print(f"Failed to start HTTP API: {e}")
 
 # Функция для загрузки когов
 async def load_cogs():
@@ -58,11 +82,37 @@ async def load_cogs():
         except Exception as e:
             print(f'Failed to load {cog}: {e}')
 
-# Задача для мониторинга валидаторов
+# Задача для мониторинга валидаторов: отдельный кэш и обновление для каждой сети,
+# общий HTTP-пул и общий Discord-клиент
 async def start_monitoring():
-    from utils.validator_monitor import monitor_validators
-    channel_id = int(os.getenv("CHANNEL_ID"))
-    bot.loop.create_task(monitor_validators(bot, channel_id))
+    from utils.validator_monitor import monitor_validators, previous_states
+    from utils.peer_prober import run_peer_prober
+    from utils.state_sync import run_state_sync_refresher
+    from utils.snapshot_catalog import run_snapshot_catalog_refresher
+    from utils.snapshot_store import store, load_snapshot
+    from utils.fleet_monitor import fleet, run_fleet_monitor
+    from utils.jail_predictor import run_jail_fast_checker
+    from utils.alert_policy import run_alert_digest
+    from utils.outbox import run_outbox_worker
+    from utils.webhooks import load_webhook_targets
+    load_webhook_targets()
+    tasks = [bot.loop.create_task(run_outbox_worker(bot))]
+    for network in networks.values():
+        if store is not None:
+            # Новый лидер продолжает с последнего опубликованного снимка, чтобы
+            # не пропустить изменения, случившиеся во время смены лидера
+            await load_snapshot(network.name)
+            previous_states[network.name] = dict(get_validator_cache(network.name)["data"])
+        tasks.append(bot.loop.create_task(monitor_validators(bot, network)))
+        tasks.append(bot.loop.create_task(run_peer_prober(network)))
+        tasks.append(bot.loop.create_task(run_state_sync_refresher(network)))
+        tasks.append(bot.loop.create_task(run_snapshot_catalog_refresher(network)))
+        tasks.append(bot.loop.create_task(run_jail_fast_checker(bot, network)))
+        tasks.append(bot.loop.create_task(run_alert_digest(bot, network)))
+    # Узлы оператора всех сетей опрашиваются одной задачей
+    if fleet:
+        tasks.append(bot.loop.create_task(run_fleet_monitor(bot)))
+    return tasks
 
 # Запуск бота
 if __name__ == "__main__":
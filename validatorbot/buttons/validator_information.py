@@ -1,22 +1,176 @@
 # buttons/validator_information.py
 
+import asyncio
 import discord
 import logging
+import os
+import time
+import bech32
+from dotenv import load_dotenv
 from utils.api import fetch_validator_info
-from utils.embeds import create_validator_embed
-from utils.cache import validator_cache
-from utils.cache import selected_validators
+from utils.embeds import create_validator_detail_embed
+from utils.cache import get_validator_cache
+from utils.http import fetch_json
+from utils.networks import get_network
+from utils.voting_power import get_voting_power_index
 
+load_dotenv()
 logger = logging.getLogger(__name__)
 
-async def get_validator_information(validator_address: str):
+# Сколько ждать каждый дополнительный раздел карточки валидатора
+DETAIL_SECTION_TIMEOUT = float(os.getenv("DETAIL_SECTION_TIMEOUT", "8"))
+# Не чаще одного редактирования сообщения за столько секунд: разделы, пришедшие
+# почти одновременно, попадают в одно редактирование
+DETAIL_EDIT_INTERVAL = float(os.getenv("DETAIL_EDIT_INTERVAL", "0.5"))
+
+
+async def _lcd(network, path, params=None):
+    """GET к LCD сети с переходом на резервный API."""
+    for api_url in (network.api_url, network.reserve_api_url):
+        try:
+            data = await fetch_json(f"{api_url}{path}", params)
+        except Exception as e:
+            logger.warning(f"[{network.name}] Request to {api_url}{path} failed: {e}")
+            continue
+        if data is not None:
+            return data
+    raise LookupError(f"{path} is unavailable")
+
+
+def _account_address(operator_address, network):
+    """Адрес аккаунта оператора (story1...) для поиска самоделегирования."""
+    hrp, data = bech32.bech32_decode(operator_address)
+    if hrp != network.valoper_prefix or data is None:
+        return None
+    return bech32.bech32_encode(network.valoper_prefix.removesuffix("valoper"), data)
+
+
+def _coins(coins):
+    return ", ".join(f"{float(coin['amount']):,.0f} {coin['denom']}" for coin in coins) or "0"
+
+
+async def _profile(network, address, cached):
+    data = await fetch_validator_info(address, network)
+    validator = (data or {}).get("validator")
+    if not validator:
+        raise LookupError("validator not found")
+    description = validator.get("description", {})
+    rates = validator.get("commission", {}).get("commission_rates", {})
+    return "\n".join([
+        f"Moniker: {description.get('moniker', 'N/A')}",
+        f"Website: {description.get('website') or 'N/A'}",
+        f"Max Commission: {float(rates.get('max_rate', 0)) * 100:.2f}% "
+        f"(max change {float(rates.get('max_change_rate', 0)) * 100:.2f}%/day)",
+        f"Details: {(description.get('details') or 'N/A')[:300]}",
+    ])
+
+
+async def _delegators(network, address, cached):
+    data = await _lcd(network, f"/cosmos/staking/v1beta1/validators/{address}/delegations",
+                      {"pagination.limit": "1", "pagination.count_total": "true"})
+    return f"{int(data.get('pagination', {}).get('total') or 0):,}"
+
+
+async def _self_delegation(network, address, cached):
+    account = _account_address(address, network)
+    if account is None:
+        raise LookupError("unknown address format")
+    try:
+        data = await _lcd(network, f"/cosmos/staking/v1beta1/validators/{address}/delegations/{account}")
+    except LookupError:
+        return "None"
+    amount = int(float(data.get("delegation_response", {}).get("balance", {}).get("amount", 0)))
+    tokens = (cached or {}).get("tokens")
+    share = f" ({amount / tokens * 100:.2f}% of stake)" if tokens else ""
+    return f"{amount:,}{share}"
+
+
+async def _rewards(network, address, cached):
+    data = await _lcd(network, f"/cosmos/distribution/v1beta1/validators/{address}/outstanding_rewards")
+    return _coins(data.get("rewards", {}).get("rewards", []))
+
+
+async def _slashes(network, address, cached):
+    data = await _lcd(network, f"/cosmos/distribution/v1beta1/validators/{address}/slashes",
+                      {"starting_height": "1", "ending_height": str(2 ** 63 - 1), "pagination.reverse": "true"})
+    slashes = data.get("slashes", [])
+    if not slashes:
+        return "None"
+    latest = slashes[0]
+    return f"{len(slashes)} (latest at period {latest.get('validator_period')}, fraction {float(latest.get('fraction', 0)):.4f})"
+
+
+async def _signing_info(network, address, cached):
+    consensus_address = (cached or {}).get("consensus_address")
+    if not consensus_address:
+        raise LookupError("validator is not in the active set")
+    data = await _lcd(network, f"/cosmos/slashing/v1beta1/signing_infos/{consensus_address}")
+    info = data.get("val_signing_info", {})
+    return "\n".join([
+        f"Missed blocks: {info.get('missed_blocks_counter', 'N/A')}",
+        f"Start height: {info.get('start_height', 'N/A')}",
+        f"Tombstoned: {'Yes' if info.get('tombstoned') else 'No'}",
+    ])
+
+
+# Разделы карточки в порядке вывода: (название поля, загрузчик)
+DETAIL_SECTIONS = (
+    ("Profile", _profile),
+    ("Delegators", _delegators),
+    ("Self-Delegation", _self_delegation),
+    ("Outstanding Rewards", _rewards),
+    ("Slashing Events", _slashes),
+    ("Signing Info", _signing_info),
+)
+
+
+async def _load_section(name, loader, network, address, cached):
     try:
-        data = await fetch_validator_info(validator_address)
-        if data:
-            embed = create_validator_embed(data)
-            return embed
-        else:
-            return None
+        return name, await asyncio.wait_for(loader(network, address, cached), DETAIL_SECTION_TIMEOUT)
+    except asyncio.TimeoutError:
+        return name, "⚠️ Timed out"
     except Exception as e:
-        logger.error(f"Error fetching validator information: {e}")
-        return None
+        logger.warning(f"[{network.name}] Failed to load {name} of {address}: {e}")
+        return name, f"⚠️ Unavailable ({e})"
+
+
+async def show_validator_details(interaction, validator_address, network=None):
+    """Карточка валидатора: сразу из кэша, затем разделы дописываются по мере ответа LCD.
+
+    Все запросы запускаются одновременно, поэтому полная карточка готова за время самого
+    медленного из них. Ответ на взаимодействие должен быть уже отложен (defer).
+    """
+    network = network or get_network()
+    cached = get_validator_cache(network.name)["data"].get(validator_address)
+    voting_power = get_voting_power_index(network.name)
+    sections = {}
+    tasks = [asyncio.create_task(_load_section(name, loader, network, validator_address, cached))
+             for name, loader in DETAIL_SECTIONS]
+
+    message = await interaction.followup.send(
+        embed=create_validator_detail_embed(validator_address, cached, sections, DETAIL_SECTIONS, voting_power),
+        ephemeral=True, wait=True,
+    )
+    pending = set(tasks)
+    last_edit = time.monotonic()
+    changed = False
+    try:
+        while pending:
+            # Пока есть неотправленные разделы, ждём не дольше, чем до следующего разрешённого редактирования
+            timeout = max(0.0, DETAIL_EDIT_INTERVAL - (time.monotonic() - last_edit)) if changed else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if done:
+                sections.update(task.result() for task in done)
+                changed = True
+            if changed and (not pending or time.monotonic() - last_edit >= DETAIL_EDIT_INTERVAL):
+                await message.edit(embed=create_validator_detail_embed(validator_address, cached, sections, DETAIL_SECTIONS, voting_power))
+                last_edit = time.monotonic()
+                changed = False
+        if cached is None and sections.get("Profile", "").startswith("⚠️"):
+            await message.edit(content=f"Validator {validator_address} not found.", embed=None)
+    except discord.HTTPException as e:
+        # Сообщение удалено или токен взаимодействия истёк — дописывать некуда
+        logger.warning(f"Stopped updating details of {validator_address}: {e}")
+    finally:
+        for task in pending:
+            task.cancel()
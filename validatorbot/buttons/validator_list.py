@@ -2,42 +2,34 @@
 
 import discord
 import asyncio
-import aiohttp
 import json
-import base64
-import hashlib
-import bech32
 import logging
-from dotenv import load_dotenv
-import os
-from Crypto.Hash import RIPEMD160
-from utils.cache import validator_cache
+from utils.cache import get_validator_cache
 from utils.cache import selected_validators
-
-# Загрузка переменных окружения
-load_dotenv()
-
-COSMOS_RPC_URL = os.getenv("COSMOS_RPC_URL")
-COSMOS_RESERVE_RPC_URL = os.getenv("COSMOS_RESERVE_RPC_URL")
-COSMOS_API_URL = os.getenv("COSMOS_API_URL")
-COSMOS_RESERVE_API_URL = os.getenv("COSMOS_RESERVE_API_URL")
+from utils.networks import networks, get_network
+from utils.voting_power import get_voting_power_index
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Проверка, что все переменные окружения установлены
-required_env_vars = ["COSMOS_RPC_URL", "COSMOS_RESERVE_RPC_URL", "COSMOS_API_URL", "COSMOS_RESERVE_API_URL"]
-missing_env_vars = [var for var in required_env_vars if os.getenv(var) is None]
+# Проверка, что для каждой сети заданы все эндпоинты
+missing_endpoints = [
+    f"{name}.{attr}"
+    for name, profile in networks.items()
+    for attr in ("api_url", "reserve_api_url", "rpc_url", "reserve_rpc_url")
+    if not getattr(profile, attr)
+]
 
-if missing_env_vars:
-    logger.error(f"One or more required environment variables are not set: {', '.join(missing_env_vars)}")
+if missing_endpoints:
+    logger.error(f"One or more required network endpoints are not set: {', '.join(missing_endpoints)}")
     exit(1)
 else:
-    for var in required_env_vars:
-        logger.info(f"{var} is set to {os.getenv(var)}")
+    for profile in networks.values():
+        logger.info(f"Network {profile.name}: API {profile.api_url}, RPC {profile.rpc_url}")
 
-async def handle_validator_list(interaction: discord.Interaction):
+async def handle_validator_list(interaction: discord.Interaction, network=None):
     """Возвращаем данные о валидаторах из кэша."""
+    validator_cache = get_validator_cache((network or get_network()).name)
     validator_data = validator_cache.get("data", {})
     summary = validator_cache.get("summary", {})
     
@@ -45,15 +37,19 @@ async def handle_validator_list(interaction: discord.Interaction):
         await interaction.response.send_message("Validator data is not available at the moment.", ephemeral=True)
         return
 
-    await send_embed(interaction, validator_data, summary)
+    await send_embed(interaction, validator_data, summary, get_voting_power_index((network or get_network()).name))
 
 
-async def send_embed(interaction, validator_data, summary):
+async def send_embed(interaction, validator_data, summary, voting_power):
     try:
         await interaction.response.defer(ephemeral=True)  # Отложить ответ
 
         lines = []
-        for operator_address, data in validator_data.items():
+        # Активные валидаторы по убыванию голосующей силы; порядок уже поддерживается индексом
+        for rank, (operator_address, tokens) in enumerate(voting_power.top(), 1):
+            data = validator_data.get(operator_address)
+            if data is None:
+                continue
             status = data.get('status')
             jailed = data.get('jailed', False)
             moniker = data.get('moniker', 'Unknown')
@@ -73,7 +69,8 @@ async def send_embed(interaction, validator_data, summary):
                 else:
                     color = "⚫"
 
-                lines.append(f"{color} **{moniker}**: {uptime}%")
+                share = tokens / voting_power.total * 100
+                lines.append(f"{color} #{rank} **{moniker}**: {uptime}% · {share:.2f}% VP")
 
         footer_text = (
             "\n\n**Legend:**\n"
@@ -87,6 +84,7 @@ async def send_embed(interaction, validator_data, summary):
             f"\nActive validators: {summary['active']}"
             f"\nInactive validators: {summary['inactive']}"
             f"\nJailed validators: {summary['jailed']}"
+            f"\nNakamoto coefficient: {voting_power.nakamoto()}"
         )
 
         # Разбиваем список lines на части так, чтобы каждая часть не превышала 4000 символов
@@ -116,19 +114,3 @@ async def send_embed(interaction, validator_data, summary):
 
     except discord.errors.NotFound:
         logger.error("Interaction not found or already timed out.")
-
-async def update_validator_cache():
-    """Фоновая задача для обновления кэша списка валидаторов и аптайма."""
-    try:
-        logger.info("Updating validator cache...")
-
-        # Запрос списка валидаторов и аптайма
-        validator_data, summary = await get_validator_uptimes(COSMOS_API_URL)
-
-        validator_cache["data"] = validator_data
-        validator_cache["summary"] = summary
-        validator_cache["last_updated"] = discord.utils.utcnow()
-
-        logger.info("Validator cache updated successfully.")
-    except Exception as e:
-        logger.error(f"Error updating validator cache: {e}")
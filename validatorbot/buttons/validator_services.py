@@ -1,12 +1,17 @@
 # buttons/validator_services.py
 
 import discord
-import aiohttp
-import random
-from utils.cache import selected_validators
+import time
+from utils.cache import selected_validators, get_validator_cache
+from utils.networks import get_network
+from utils.snapshot_catalog import format_size, format_age, estimate_download_time
 
-async def get_state_sync_info():
+LIVE_PEERS_COUNT = 10
+
+async def get_state_sync_info(network=None):
     """Returns an embed with State Sync instructions."""
+    network = network or get_network()
+    trust_point = get_validator_cache(network.name).get("state_sync")
     embed = discord.Embed(
         title="State Sync",
         description=(
@@ -30,31 +35,53 @@ async def get_state_sync_info():
         inline=False
     )
 
-    # Step 2: Get and configure the state sync information
-    embed.add_field(
-        name="2. Get and configure the state sync information",
-        value=(
-            "```bash\n"
-            "STATE_SYNC_RPC=https://story-testnet-rpc.stake-take.com:443\n"
-            "LATEST_HEIGHT=$(curl -s $STATE_SYNC_RPC/block | jq -r .result.block.header.height)\n"
-            "SYNC_BLOCK_HEIGHT=$(echo \"$LATEST_HEIGHT\" | awk '{printf \"%d000\\n\", $0 / 1000}')\n"
-            "SYNC_BLOCK_HASH=$(curl -s \"$STATE_SYNC_RPC/block?height=$SYNC_BLOCK_HEIGHT\" | jq -r .result.block_id.hash)\n"
-            "\n"
-            "echo $LATEST_HEIGHT $SYNC_BLOCK_HEIGHT $SYNC_BLOCK_HASH && sleep 1\n"
-            "\n"
-            "sed -i \\\n"
-            "  -e \"s|^enable *=.*|enable = true|\" \\\n"
-            "  -e \"s|^rpc_servers *=.*|rpc_servers = \\\"$STATE_SYNC_RPC,$STATE_SYNC_RPC\\\"|\" \\\n"
-            "  -e \"s|^trust_height *=.*|trust_height = $SYNC_BLOCK_HEIGHT|\" \\\n"
-            "  -e \"s|^trust_hash *=.*|trust_hash = \\\"$SYNC_BLOCK_HASH\\\"|\" \\\n"
-            "  -e \"s|^persistent_peers *=.*|persistent_peers = \\\"$STATE_SYNC_PEER\\\"|\" \\\n"
-            "  $HOME/.story/story/config/config.toml\n"
-            "\n"
-            "mv $HOME/.story/story/priv_validator_state.json.backup $HOME/.story/story/data/priv_validator_state.json\n"
-            "```"
-        ),
-        inline=False
-    )
+    # Step 2: Configure the state sync information
+    if trust_point:
+        # Точка доверия уже вычислена и сверена ботом (utils/state_sync.py) — готовый конфиг
+        age_minutes = int((time.time() - trust_point["updated"]) // 60)
+        rpc_servers = ",".join(trust_point["rpc_servers"])
+        embed.add_field(
+            name="2. Configure state sync",
+            value=(
+                f"Trust point verified by {trust_point['verified_by']} RPC(s), updated {age_minutes} min ago.\n"
+                "```bash\n"
+                "sed -i \\\n"
+                "  -e \"s|^enable *=.*|enable = true|\" \\\n"
+                f"  -e \"s|^rpc_servers *=.*|rpc_servers = \\\"{rpc_servers}\\\"|\" \\\n"
+                f"  -e \"s|^trust_height *=.*|trust_height = {trust_point['trust_height']}|\" \\\n"
+                f"  -e \"s|^trust_hash *=.*|trust_hash = \\\"{trust_point['trust_hash']}\\\"|\" \\\n"
+                "  $HOME/.story/story/config/config.toml\n"
+                "\n"
+                "mv $HOME/.story/story/priv_validator_state.json.backup $HOME/.story/story/data/priv_validator_state.json\n"
+                "```"
+            ),
+            inline=False
+        )
+    else:
+        embed.add_field(
+            name="2. Get and configure the state sync information",
+            value=(
+                "```bash\n"
+                "STATE_SYNC_RPC=https://story-testnet-rpc.stake-take.com:443\n"
+                "LATEST_HEIGHT=$(curl -s $STATE_SYNC_RPC/block | jq -r .result.block.header.height)\n"
+                "SYNC_BLOCK_HEIGHT=$(echo \"$LATEST_HEIGHT\" | awk '{printf \"%d000\\n\", $0 / 1000}')\n"
+                "SYNC_BLOCK_HASH=$(curl -s \"$STATE_SYNC_RPC/block?height=$SYNC_BLOCK_HEIGHT\" | jq -r .result.block_id.hash)\n"
+                "\n"
+                "echo $LATEST_HEIGHT $SYNC_BLOCK_HEIGHT $SYNC_BLOCK_HASH && sleep 1\n"
+                "\n"
+                "sed -i \\\n"
+                "  -e \"s|^enable *=.*|enable = true|\" \\\n"
+                "  -e \"s|^rpc_servers *=.*|rpc_servers = \\\"$STATE_SYNC_RPC,$STATE_SYNC_RPC\\\"|\" \\\n"
+                "  -e \"s|^trust_height *=.*|trust_height = $SYNC_BLOCK_HEIGHT|\" \\\n"
+                "  -e \"s|^trust_hash *=.*|trust_hash = \\\"$SYNC_BLOCK_HASH\\\"|\" \\\n"
+                "  -e \"s|^persistent_peers *=.*|persistent_peers = \\\"$STATE_SYNC_PEER\\\"|\" \\\n"
+                "  $HOME/.story/story/config/config.toml\n"
+                "\n"
+                "mv $HOME/.story/story/priv_validator_state.json.backup $HOME/.story/story/data/priv_validator_state.json\n"
+                "```"
+            ),
+            inline=False
+        )
 
     # Step 3: Restart the service and check the log
     embed.add_field(
@@ -69,14 +96,38 @@ async def get_state_sync_info():
 
     return embed
 
-async def get_snapshot_info():
+async def get_snapshot_info(network=None):
     """Returns an embed with Snapshot instructions."""
+    network = network or get_network()
+    base_url = network.snapshot_base_url
     embed = discord.Embed(
         title="Snapshots",
         description="Instructions to update your node using snapshots.",
         color=discord.Color.green()
     )
 
+    # Каталог снимков обновляется в фоне (utils/snapshot_catalog.py)
+    catalog = get_validator_cache(network.name).get("snapshots")
+    if catalog:
+        lines = []
+        for snapshot in catalog:
+            line = (
+                f"**{snapshot['name']}** — {format_size(snapshot['size'])}, "
+                f"updated {format_age(snapshot['last_modified'])}"
+            )
+            if snapshot.get("height"):
+                line += f", height {snapshot['height']}"
+            if snapshot.get("sha256"):
+                line += f"\nsha256 `{snapshot['sha256']}`"
+            lines.append(line)
+        total_size = sum(snapshot["size"] or 0 for snapshot in catalog)
+        lines.append(
+            f"\nTotal {format_size(total_size)}: {estimate_download_time(total_size, 100)} at 100 Mbit/s, "
+            f"{estimate_download_time(total_size, 1000)} at 1 Gbit/s. "
+            "State Sync is usually faster if your link is slow."
+        )
+        embed.add_field(name="Available Snapshots", value="\n".join(lines)[:1024], inline=False)
+
     # Добавляем установку необходимых инструментов
     embed.add_field(
         name="Prerequisites",
@@ -134,10 +185,10 @@ async def get_snapshot_info():
         value=(
             "```bash\n"
             "# Download and extract geth snapshot\n"
-            "curl -L https://story.snapshot.stake-take.com/snapshot_geth.tar.lz4 | tar -Ilz4 -xf - -C $HOME/.story/geth\n"
+            f"curl -L {base_url}/snapshot_geth.tar.lz4 | tar -Ilz4 -xf - -C $HOME/.story/geth\n"
             "\n"
             "# Download and extract consensus snapshot\n"
-            "curl -L https://story.snapshot.stake-take.com/snapshot_consensus.tar.lz4 | tar -Ilz4 -xf - -C $HOME/.story/story\n"
+            f"curl -L {base_url}/snapshot_consensus.tar.lz4 | tar -Ilz4 -xf - -C $HOME/.story/story\n"
             "```"
         ),
         inline=False
@@ -208,34 +259,29 @@ async def get_fresh_addrbook_info():
 
     return embed
 
-async def get_live_peers_info():
+async def get_live_peers_info(network=None):
     """Returns an embed with live peers information and instructions to update persistent_peers."""
+    network = network or get_network()
     embed = discord.Embed(
         title="🌐 Live Peers",
-        description="Below is a list of random live peers. Follow the instructions to update your `persistent_peers`.",
+        description="Below is a list of the fastest live peers, ranked by measured latency. Follow the instructions to update your `persistent_peers`.",
         color=discord.Color.green()
     )
 
-    # Fetch live peers data
+    # Таблицу пиров заполняет фоновая проверка (utils/peer_prober.py), здесь только чтение из кэша
     try:
-        peers_list = []
-        async with aiohttp.ClientSession() as session:
-            async with session.get('https://story-testnet-rpc.stake-take.com/net_info') as response:
-                data = await response.json()
-                peers = data.get('result', {}).get('peers', [])
-                if not peers:
-                    embed.add_field(name="No Peers Found", value="No live peers could be found at this time.", inline=False)
-                else:
-                    for peer in peers:
-                        node_id = peer.get('node_info', {}).get('id', '')
-                        remote_ip = peer.get('remote_ip', '')
-                        if node_id and remote_ip:
-                            peers_list.append(f"{node_id}@{remote_ip}:26656")
+        validator_cache = get_validator_cache(network.name)
+        top_peers = validator_cache.get("peers", [])[:LIVE_PEERS_COUNT]
+        peers_list = [p["peer"] for p in top_peers]
 
         if peers_list:
-            # Select random 10 peers
-            random_peers = random.sample(peers_list, min(10, len(peers_list)))
-            peers_str = ",".join(random_peers)
+            peers_str = ",".join(peers_list)
+            age_minutes = int((time.time() - validator_cache.get("peers_updated", time.time())) // 60)
+            embed.add_field(
+                name="Latency",
+                value=f"{top_peers[0]['latency_ms']} – {top_peers[-1]['latency_ms']} ms, checked {age_minutes} min ago",
+                inline=False
+            )
 
             instructions = (
                 f"Set the `PEERS` variable:\n"
@@ -253,7 +299,7 @@ async def get_live_peers_info():
             )
             embed.add_field(name="Instructions", value=instructions, inline=False)
         else:
-            embed.add_field(name="No Peers Available", value="Could not find any live peers at this time.", inline=False)
+            embed.add_field(name="No Peers Available", value="No reachable peers have been found yet. Please try again in a few minutes.", inline=False)
 
     except Exception as e:
         embed.add_field(name="Error", value="Unable to fetch live peers.", inline=False)
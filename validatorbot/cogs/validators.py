@@ -2,15 +2,27 @@
 
 import asyncio
 import os
+import time
 import discord
 import logging
 from dotenv import load_dotenv
 from discord.ext import commands
 from discord.ui import View, Button
-from buttons.validator_information import get_validator_information
+from buttons.validator_information import show_validator_details
 from buttons.validator_list import handle_validator_list
 from discord import app_commands
-from utils.cache import selected_validators
+from utils.cache import selected_validators, get_validator_cache
+from utils.snapshot_store import save_selection
+from utils.metrics import histograms, observe_latency
+from utils.loop_watchdog import watchdog
+from utils.ratelimit import interaction_limiter
+from utils.networks import networks, get_network
+from utils.alert_rules import RULE_KINDS, add_rule, remove_rule, rule_index, sync_alert_rules
+from utils.dm_alerts import dm_channels, set_dm_alerts
+from utils.search_index import get_search_index
+from utils.voting_power import get_voting_power_index
+from utils.embeds import create_network_stats_embed
+from utils.export import EXPORT_FORMATS, export_validators, history_available
 from buttons.blockchain_params import (
     fetch_staking_params,
     fetch_slashing_params,
@@ -26,7 +38,6 @@ from buttons.validator_services import (
     get_useful_links,
     get_useful_commands
 )
-from buttons.validator_information import get_validator_information
 
 load_dotenv()
 GUILD_ID = int(os.getenv('GUILD_ID'))
@@ -34,9 +45,124 @@ GUILD_ID = int(os.getenv('GUILD_ID'))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+async def respond(interaction, **kwargs):
+    """Отвечает на взаимодействие: follow-up, если ответ уже отложен, иначе обычный ответ."""
+    if interaction.response.is_done():
+        await interaction.followup.send(**kwargs)
+    else:
+        await interaction.response.send_message(**kwargs)
+
+
+async def check_rate_limit(interaction):
+    """Проверяет лимиты пользователя и общий лимит; при превышении сразу отвечает пользователю."""
+    allowed, retry_after = interaction_limiter.check(interaction.user.id)
+    if not allowed:
+        await interaction.response.send_message(
+            f"Too many requests, please try again in {max(1, round(retry_after))}s.", ephemeral=True
+        )
+    return allowed
+
+
+class ComponentHandler:
+    """Handler of one custom_id. Network-bound handlers defer first and answer with a follow-up;
+    rate-limited handlers are checked against the per-user and global token buckets."""
+
+    def __init__(self, callback, defer=False, rate_limited=False):
+        self.callback = callback
+        self.defer = defer
+        self.rate_limited = rate_limited
+
+    async def __call__(self, interaction):
+        custom_id = interaction.data['custom_id']
+        start = time.perf_counter()
+        try:
+            if self.rate_limited and not await check_rate_limit(interaction):
+                return
+            if self.defer:
+                # Подтверждаем взаимодействие сразу, чтобы медленный API не превысил 3 секунды Discord
+                await interaction.response.defer(ephemeral=True, thinking=True)
+                observe_latency(f"{custom_id}.ack", time.perf_counter() - start)
+            await self.callback(interaction)
+        except Exception as e:
+            logger.error(f"Error handling interaction {custom_id}: {e}")
+            if self.defer:
+                # Иначе пользователь так и будет видеть «бот думает...»
+                try:
+                    await interaction.followup.send("Something went wrong, please try again.", ephemeral=True)
+                except discord.HTTPException:
+                    pass
+        finally:
+            elapsed = time.perf_counter() - start
+            observe_latency(custom_id, elapsed)
+            if not self.defer and elapsed > 2.5:
+                logger.warning(f"Interaction {custom_id} took {elapsed:.2f}s without deferring")
+
+
+def _resolve_network(name):
+    """Сеть из параметра команды: по умолчанию, если имя не задано; None, если такой сети нет."""
+    if not name:
+        return get_network()
+    return networks.get(name)
+
+
+async def resolve_network_or_reply(interaction, name):
+    """Как _resolve_network, но о неизвестной сети сразу сообщает пользователю (как /alert_add)."""
+    network = _resolve_network(name)
+    if network is None:
+        await interaction.response.send_message(f"Unknown network {name}.", ephemeral=True)
+    return network
+
+
+async def report_failure(interaction, action, error):
+    """Ошибка после defer: пишем пользователю, иначе он так и будет видеть «бот думает...»."""
+    logger.error(f"Error {action}: {error}")
+    try:
+        await interaction.followup.send("Something went wrong, please try again.", ephemeral=True)
+    except discord.HTTPException:
+        pass
+
+
+async def validator_autocomplete(interaction: discord.Interaction, current: str):
+    """Подсказки по моникеру или адресу; индекс в памяти, поэтому ответ укладывается в дедлайн Discord."""
+    network = _resolve_network(getattr(interaction.namespace, "network", None))
+    if network is None:
+        return []
+    return [
+        app_commands.Choice(name=f"{moniker} — {address}"[:100], value=address)
+        for address, moniker in get_search_index(network.name).search(current)
+    ]
+
+
 class ValidatorsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Обработчики кнопок по custom_id; обработчики, которые ходят в сеть, откладывают ответ
+        # (defer=True) и ограничены лимитами запросов (rate_limited=True)
+        self.handlers = {
+            "validators_menu": ComponentHandler(self.show_validators_menu),
+            "info": ComponentHandler(self.show_info),
+            "validator_list": ComponentHandler(handle_validator_list),
+            "validator_information": ComponentHandler(self.show_validator_info_modal),
+            "select_validator": ComponentHandler(self.show_select_validator_modal),
+            "check_selected_validator": ComponentHandler(self.check_selected_validator, defer=True, rate_limited=True),
+            "network_stats": ComponentHandler(self.show_network_stats),
+            "validator_services": ComponentHandler(self.show_validator_services_menu),
+            "snapshot": ComponentHandler(self.show_snapshot_info),
+            "state_sync": ComponentHandler(self.show_state_sync_info),
+            "fresh_addrbook": ComponentHandler(self.show_addrbook_info),
+            "live_peers": ComponentHandler(self.show_live_peers_info),
+            "useful_links": ComponentHandler(self.show_useful_links),
+            "useful_commands": ComponentHandler(self.show_useful_commands),
+            "blockchain_params": ComponentHandler(self.show_blockchain_params_menu),
+            "staking_params": ComponentHandler(self.send_staking_params, defer=True, rate_limited=True),
+            "slashing_params": ComponentHandler(self.send_slashing_params, defer=True, rate_limited=True),
+            "inflation": ComponentHandler(self.send_inflation, defer=True, rate_limited=True),
+            "genesis": ComponentHandler(self.send_genesis, defer=True, rate_limited=True),
+            "mint_params": ComponentHandler(self.send_mint_params, defer=True, rate_limited=True),
+            "back": ComponentHandler(self.show_main_menu),
+            "exit": ComponentHandler(self.close_menu),
+        }
+
     @app_commands.command(name="start", description="Starts the bot menu.")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def start(self, interaction: discord.Interaction):
@@ -60,52 +186,176 @@ class ValidatorsCog(commands.Cog):
     async def on_interaction(self, interaction: discord.Interaction):
         if interaction.type == discord.InteractionType.component:
             custom_id = interaction.data['custom_id']
-            if custom_id == "validators_menu":
-                await self.show_validators_menu(interaction)
-            elif custom_id == "info":
-                await self.show_info(interaction)
-            elif custom_id == "validator_list":
-                await handle_validator_list(interaction)
-            elif custom_id == "validator_information":
-                await self.show_validator_info_modal(interaction)
-            elif custom_id == "select_validator":
-                await self.show_select_validator_modal(interaction)
-            elif custom_id == "check_selected_validator":
-                await self.check_selected_validator(interaction)
-            elif custom_id == "validator_services":
-                await self.show_validator_services_menu(interaction)
-            elif custom_id == "snapshot":
-                await self.show_snapshot_info(interaction)
-            elif custom_id == "state_sync":
-                await self.show_state_sync_info(interaction)
-            elif custom_id == "fresh_addrbook":
-                await self.show_addrbook_info(interaction)
-            elif custom_id == "live_peers":
-                await self.show_live_peers_info(interaction)
-            elif custom_id == "useful_links":
-                await self.show_useful_links(interaction)
-            elif custom_id == "useful_commands":
-                await self.show_useful_commands(interaction)
-            elif custom_id == "blockchain_params":
-                await self.show_blockchain_params_menu(interaction)
-            elif custom_id == "staking_params":
-                await self.send_staking_params(interaction)
-            elif custom_id == "slashing_params":
-                await self.send_slashing_params(interaction)
-            elif custom_id == "inflation":
-                await self.send_inflation(interaction)
-            elif custom_id == "genesis":
-                await self.send_genesis(interaction)
-            elif custom_id == "mint_params":
-                await self.send_mint_params(interaction)
-            elif custom_id == "back":
-                await self.show_main_menu(interaction)
-            elif custom_id == "exit":
-                try:
-                    await interaction.message.delete()
-                except discord.errors.NotFound:
-                    pass
-                await interaction.response.send_message("Menu closed.", ephemeral=True)
+            handler = self.handlers.get(custom_id)
+            if handler:
+                await handler(interaction)
+
+    async def close_menu(self, interaction):
+        try:
+            await interaction.message.delete()
+        except discord.errors.NotFound:
+            pass
+        await interaction.response.send_message("Menu closed.", ephemeral=True)
+
+    @app_commands.command(name="latency", description="Shows interaction latency per button.")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    async def latency(self, interaction: discord.Interaction):
+        """Shows interaction latency per button."""
+        lines = [histograms[name].summary() for name in sorted(histograms)]
+        slow_spots = watchdog.top_slow_spots(5)
+        if slow_spots:
+            lines.append("")
+            lines.append("Event loop stalls (last hour):")
+            lines.extend(f"{total:.2f}s in {count} stall(s), max {longest:.2f}s: {location}"
+                         for location, count, total, longest in slow_spots)
+        description = "\n".join(lines) if lines else "No interactions recorded yet."
+        embed = discord.Embed(title="Interaction Latency", description=f"```\n{description[:4000]}\n```", color=discord.Color.blue())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="alert_add", description="Adds a personal alert rule.")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.describe(
+        kind="What to alert on",
+        validator="Validator operator address (leave empty for all validators)",
+        threshold="Percent for uptime_below, uptime_above and tokens_drop",
+        network="Network name (default network if empty)",
+    )
+    @app_commands.choices(kind=[app_commands.Choice(name=kind, value=kind) for kind in RULE_KINDS])
+    async def alert_add(self, interaction: discord.Interaction, kind: app_commands.Choice[str],
+                        validator: str = None, threshold: float = None, network: str = None):
+        """Adds a personal alert rule."""
+        if network is not None and network not in networks:
+            await interaction.response.send_message(f"Unknown network {network}.", ephemeral=True)
+            return
+        await sync_alert_rules()
+        rule = await add_rule(interaction.user.id, network or get_network().name, validator, kind.value, threshold)
+        if isinstance(rule, str):
+            await interaction.response.send_message(rule, ephemeral=True)
+            return
+        await interaction.response.send_message(f"Alert rule added: {rule}", ephemeral=True)
+
+    @app_commands.command(name="alert_list", description="Lists your alert rules.")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    async def alert_list(self, interaction: discord.Interaction):
+        """Lists your alert rules."""
+        await sync_alert_rules()
+        rules = rule_index.for_user(interaction.user.id)
+        description = "\n".join(str(rule) for rule in rules) if rules else "You have no alert rules. Use /alert_add to create one."
+        embed = discord.Embed(title="Your Alert Rules", description=description[:4000], color=discord.Color.blue())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="alert_remove", description="Removes one of your alert rules.")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.describe(rule_id="Rule number from /alert_list")
+    async def alert_remove(self, interaction: discord.Interaction, rule_id: int):
+        """Removes one of your alert rules."""
+        await sync_alert_rules()
+        rule = await remove_rule(interaction.user.id, rule_id)
+        if rule is None:
+            await interaction.response.send_message(f"You have no rule #{rule_id}.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"Alert rule removed: {rule}", ephemeral=True)
+
+    @app_commands.command(name="validator", description="Shows a validator found by moniker or address.")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.describe(query="Validator moniker or operator address", network="Network name (default network if empty)")
+    @app_commands.autocomplete(query=validator_autocomplete)
+    async def validator(self, interaction: discord.Interaction, query: str, network: str = None):
+        """Shows a validator found by moniker or address."""
+        if not await check_rate_limit(interaction):
+            return
+        network = await resolve_network_or_reply(interaction, network)
+        if network is None:
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        address = get_search_index(network.name).resolve(query) or query.strip()
+        try:
+            await show_validator_details(interaction, address, network)
+        except Exception as e:
+            await report_failure(interaction, f"showing validator {address}", e)
+
+    @app_commands.command(name="watch", description="Follow a validator found by moniker or address.")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.describe(validator="Validator moniker or operator address", network="Network name (default network if empty)")
+    @app_commands.autocomplete(validator=validator_autocomplete)
+    async def watch(self, interaction: discord.Interaction, validator: str, network: str = None):
+        """Follow a validator found by moniker or address."""
+        network = await resolve_network_or_reply(interaction, network)
+        if network is None:
+            return
+        operator_address = get_search_index(network.name).resolve(validator)
+        if operator_address is None:
+            await interaction.response.send_message(f"No single validator matches {validator}. Pick one from the "
+                                                    f"suggestions or use the operator address.", ephemeral=True)
+            return
+        await follow_validator(interaction, operator_address.lower(), network)
+
+    @app_commands.command(name="export", description="Exports the validator table as a file.")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.describe(
+        file_format="File format",
+        history="Include stored earlier snapshots, not only the current one",
+        network="Network name (default network if empty)",
+    )
+    @app_commands.choices(file_format=[app_commands.Choice(name=fmt, value=fmt) for fmt in EXPORT_FORMATS])
+    async def export(self, interaction: discord.Interaction, file_format: app_commands.Choice[str] = None,
+                     history: bool = False, network: str = None):
+        """Exports the validator table as a file."""
+        if not await check_rate_limit(interaction):
+            return
+        network = await resolve_network_or_reply(interaction, network)
+        if network is None:
+            return
+        if not get_validator_cache(network.name)["data"]:
+            await interaction.response.send_message("Validator data is not available at the moment.", ephemeral=True)
+            return
+        if history and not history_available():
+            await interaction.response.send_message("History is unavailable in standalone mode: earlier snapshots "
+                                                    "are not stored. Export without history.", ephemeral=True)
+            return
+        fmt = file_format.value if file_format else "csv"
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            buffer, size, history_written = await export_validators(network.name, fmt, history)
+        except Exception as e:
+            await report_failure(interaction, f"exporting {network.name} validators", e)
+            return
+        try:
+            limit = interaction.guild.filesize_limit if interaction.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+            if size > limit:
+                await respond(interaction, content=f"The export is {size / 1024 / 1024:.1f} MB, more than the "
+                                                   f"{limit / 1024 / 1024:.0f} MB upload limit. Try without history.",
+                              ephemeral=True)
+                return
+            filename = f"validators_{network.name}{'_history' if history_written else ''}.{fmt}"
+            note = "No snapshots are stored yet, so only the current table is exported." if history and not history_written else None
+            await respond(interaction, content=note, file=discord.File(buffer, filename=filename), ephemeral=True)
+        except discord.HTTPException as e:
+            await report_failure(interaction, f"uploading {network.name} export", e)
+        finally:
+            buffer.close()
+
+    @app_commands.command(name="dm_alerts", description="Receive alerts about your validator in direct messages.")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.describe(enabled="Send alerts by DM instead of mentioning you in the alert channel")
+    async def dm_alerts(self, interaction: discord.Interaction, enabled: bool):
+        """Turns direct-message alert delivery on or off."""
+        user = interaction.user
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        if enabled:
+            # Проверяем сразу, открыты ли личные сообщения, чтобы не включить доставку в никуда
+            try:
+                message = await user.send("You will now receive validator alerts here. Use /dm_alerts to turn them off.")
+            except discord.HTTPException:
+                await respond(interaction, content="I can't send you direct messages. "
+                                                   "Allow DMs from server members and try again.", ephemeral=True)
+                return
+            dm_channels[user.id] = message.channel
+        await set_dm_alerts(user.id, enabled)
+        logger.info(f"User {user.id} turned DM alerts {'on' if enabled else 'off'}")
+        text = "Alerts will be sent to your direct messages." if enabled else \
+            "DM alerts turned off, you will be mentioned in the alert channel again."
+        await respond(interaction, content=text, ephemeral=True)
 
     async def show_main_menu(self, interaction):
         embed = discord.Embed(
@@ -170,6 +420,7 @@ class ValidatorsCog(commands.Cog):
         embed.add_field(name="Validator Information", value="Get detailed information about a specific validator", inline=False)
         embed.add_field(name="Select Validator", value="Select a validator to follow", inline=False)
         embed.add_field(name="Check Selected Validator", value="View information on the validator you're following", inline=False)
+        embed.add_field(name="Network Stats", value="Voting power distribution and Nakamoto coefficient", inline=False)
         embed.set_footer(text="Powered by Stake-Take")
     
         view = ValidatorsMenu()
@@ -195,37 +446,37 @@ class ValidatorsCog(commands.Cog):
     async def send_staking_params(self, interaction):
         embed = await fetch_staking_params()
         if embed:
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await respond(interaction, embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message("Failed to fetch staking params.", ephemeral=True)
+            await respond(interaction, content="Failed to fetch staking params.", ephemeral=True)
 
     async def send_slashing_params(self, interaction):
         embed = await fetch_slashing_params()
         if embed:
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await respond(interaction, embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message("Failed to fetch slashing params.", ephemeral=True)
+            await respond(interaction, content="Failed to fetch slashing params.", ephemeral=True)
 
     async def send_inflation(self, interaction):
         embed = await fetch_inflation()
         if embed:
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await respond(interaction, embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message("Failed to fetch inflation data.", ephemeral=True)
+            await respond(interaction, content="Failed to fetch inflation data.", ephemeral=True)
 
     async def send_mint_params(self, interaction):
         embed = await fetch_mint_params()
         if embed:
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await respond(interaction, embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message("Failed to fetch mint params.", ephemeral=True)
+            await respond(interaction, content="Failed to fetch mint params.", ephemeral=True)
 
     async def send_genesis(self, interaction):
         embed = await fetch_genesis()
         if embed:
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await respond(interaction, embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message("Failed to fetch genesis data.", ephemeral=True)
+            await respond(interaction, content="Failed to fetch genesis data.", ephemeral=True)
 
     async def show_validator_info_modal(self, interaction):
         modal = ValidatorInfoModal()
@@ -237,39 +488,45 @@ class ValidatorsCog(commands.Cog):
     
     async def show_snapshot_info(self, interaction):
         embed = await get_snapshot_info()
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await respond(interaction, embed=embed, ephemeral=True)
 
     async def show_state_sync_info(self, interaction):
         embed = await get_state_sync_info()
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await respond(interaction, embed=embed, ephemeral=True)
 
     async def show_addrbook_info(self, interaction):
         embed = await get_fresh_addrbook_info()
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await respond(interaction, embed=embed, ephemeral=True)
 
     async def show_live_peers_info(self, interaction):
         embed = await get_live_peers_info()
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await respond(interaction, embed=embed, ephemeral=True)
 
     async def show_useful_links(self, interaction):
         embed = await get_useful_links()
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await respond(interaction, embed=embed, ephemeral=True)
 
     async def show_useful_commands(self, interaction):
         embed = await get_useful_commands()
+        await respond(interaction, embed=embed, ephemeral=True)
+
+    async def show_network_stats(self, interaction):
+        network = get_network()
+        voting_power = get_voting_power_index(network.name)
+        if not voting_power.ranked:
+            await interaction.response.send_message("Validator data is not available at the moment.", ephemeral=True)
+            return
+        summary = get_validator_cache(network.name)["summary"]
+        embed = create_network_stats_embed(network.name, summary, voting_power)
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     async def check_selected_validator(self, interaction):
         user_id = interaction.user.id
         if user_id in selected_validators:
-            validator_address = selected_validators[user_id]
-            embed = await get_validator_information(validator_address)
-            if embed:
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-            else:
-                await interaction.response.send_message(f"Validator {validator_address} not found.", ephemeral=True)
+            network_name, operator_address = selected_validators[user_id]
+            await show_validator_details(interaction, operator_address, networks.get(network_name))
         else:
-            await interaction.response.send_message("You have not selected a validator. Use the select_validator command first.", ephemeral=True)
+            await respond(interaction, content="You have not selected a validator. Use the select_validator command first.", ephemeral=True)
 
 class MainMenu(View):
     def __init__(self):
@@ -287,6 +544,7 @@ class ValidatorsMenu(View):
         self.add_item(Button(label="Validator Information", style=discord.ButtonStyle.primary, custom_id="validator_information", emoji="ℹ️"))
         self.add_item(Button(label="Select Validator", style=discord.ButtonStyle.primary, custom_id="select_validator", emoji="✅"))
         self.add_item(Button(label="Check Selected Validator", style=discord.ButtonStyle.primary, custom_id="check_selected_validator", emoji="🔍"))
+        self.add_item(Button(label="Network Stats", style=discord.ButtonStyle.primary, custom_id="network_stats", emoji="📊"))
         self.add_item(Button(label="Back", style=discord.ButtonStyle.secondary, custom_id="back", emoji="⬅️"))
         self.add_item(Button(label="Exit", style=discord.ButtonStyle.danger, custom_id="exit", emoji="❌"))
 
@@ -314,24 +572,38 @@ class BlockchainParamsMenu(View):
         self.add_item(Button(label="Exit", style=discord.ButtonStyle.danger, custom_id="exit", emoji="❌"))
 
 class ValidatorInfoModal(discord.ui.Modal, title="Enter Validator Address"):
-    validator_address = discord.ui.TextInput(label="Validator Address", placeholder="storyvaloper1...")
+    validator_address = discord.ui.TextInput(label="Validator Address", placeholder="storyvaloper1... or moniker")
 
     async def on_submit(self, interaction: discord.Interaction):
-        embed = await get_validator_information(self.validator_address.value)
-        if embed:
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-        else:
-            await interaction.response.send_message("Validator not found.", ephemeral=True)
+        if not await check_rate_limit(interaction):
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # Можно ввести и моникер: адрес подставляется из поискового индекса
+        value = self.validator_address.value
+        address = get_search_index(get_network().name).resolve(value) or value.strip()
+        try:
+            await show_validator_details(interaction, address)
+        except Exception as e:
+            await report_failure(interaction, f"showing validator {address}", e)
 
 class SelectValidatorModal(discord.ui.Modal, title="Select Validator"):
-    validator_address = discord.ui.TextInput(label="Validator Address", placeholder="storyvaloper1...")
+    validator_address = discord.ui.TextInput(label="Validator Address", placeholder="storyvaloper1... or moniker")
 
     async def on_submit(self, interaction: discord.Interaction):
-        user_id = interaction.user.id
-        operator_address = self.validator_address.value.strip().lower()
-        selected_validators[user_id] = operator_address
-        logger.info(f"User {user_id} selected validator {operator_address}")
-        await interaction.response.send_message(f"You are now following validator {operator_address}.", ephemeral=True)
+        value = self.validator_address.value
+        operator_address = get_search_index(get_network().name).resolve(value) or value.strip()
+        await follow_validator(interaction, operator_address.lower())
+
+
+async def follow_validator(interaction, operator_address, network=None):
+    """Запоминает выбор пользователя вместе с сетью: адреса storyvaloper одинаковы во всех сетях."""
+    network = network or get_network()
+    user_id = interaction.user.id
+    selected_validators[user_id] = (network.name, operator_address)
+    await save_selection(user_id, network.name, operator_address)
+    logger.info(f"User {user_id} selected validator {operator_address} ({network.name})")
+    await interaction.response.send_message(f"You are now following validator {operator_address} on {network.name}.",
+                                            ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(ValidatorsCog(bot))
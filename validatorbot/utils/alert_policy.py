@@ -0,0 +1,143 @@
+# utils/alert_policy.py
+
+import asyncio
+import logging
+import os
+import time
+import discord
+from discord import Embed
+from dotenv import load_dotenv
+from utils.outbox import alert_targets, enqueue_alert, make_key, outbox
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+UPTIME_THRESHOLDS = (95, 90, 80, 70, 60, 50)
+# Аптайм, упавший ниже порога, считается восстановившимся только выше порог + UPTIME_HYSTERESIS
+UPTIME_HYSTERESIS = float(os.getenv("UPTIME_HYSTERESIS", "2"))
+# Не чаще одного алерта одного типа на валидатора за ALERT_COOLDOWN секунд
+ALERT_COOLDOWN = int(os.getenv("ALERT_COOLDOWN", "1800"))
+# Раз в ALERT_DIGEST_INTERVAL секунд некритичные алерты отправляются одной сводкой; 0 — сразу
+ALERT_DIGEST_INTERVAL = int(os.getenv("ALERT_DIGEST_INTERVAL", "900"))
+
+# Джейл и смена активности уходят сразу и без cooldown
+IMMEDIATE_ALERTS = {"jailed", "inactive_jailed", "inactive_insufficient", "unjailed_active", "unjailed_inactive", "active"}
+# То же для пользовательских правил (тип алерта "rule:<kind>:<id>"): status_change — это тоже джейл и активность
+IMMEDIATE_RULE_KINDS = {"status_change"}
+DIGEST_ALERTS = {"commission", "uptime_recovery", "new_validator"}
+
+uptime_levels = {}  # {(network_name, operator_address): сколько порогов аптайм сейчас ниже}
+last_sent = {}      # {(network_name, operator_address, alert_type): (time, уровень аптайма или None)}
+
+
+def check_uptime_alert(network_name, moniker, uptime, operator_address):
+    """Алерт о пересечении порогов аптайма с гистерезисом: ('uptime' | 'uptime_recovery', text) или None.
+
+    Падение ниже порога фиксируется сразу, а восстановление — только когда аптайм
+    поднимется выше порога на UPTIME_HYSTERESIS, поэтому колебания около порога не шумят.
+    """
+    key = (network_name, operator_address)
+    below = sum(1 for threshold in UPTIME_THRESHOLDS if uptime < threshold)
+    below_with_band = sum(1 for threshold in UPTIME_THRESHOLDS if uptime < threshold + UPTIME_HYSTERESIS)
+    previous = uptime_levels.get(key)
+    if previous is None:
+        uptime_levels[key] = below
+        return None
+
+    if below > previous:
+        uptime_levels[key] = below
+        return 'uptime', f"⚠️ **{moniker}** uptime has dropped below {UPTIME_THRESHOLDS[below - 1]}%: now at {uptime}%."
+    if below_with_band < previous:
+        uptime_levels[key] = below_with_band
+        return 'uptime_recovery', (f"🟢 **{moniker}** uptime has risen above "
+                                   f"{UPTIME_THRESHOLDS[below_with_band]}%: now at {uptime}%.")
+    return None
+
+
+def reset_uptime_level(network_name, operator_address):
+    """Валидатор вышел из активного набора: после возвращения уровень аптайма определяется заново."""
+    uptime_levels.pop((network_name, operator_address), None)
+
+
+def _is_immediate(alert_type):
+    prefix, _, rest = alert_type.partition(":")
+    if prefix == "rule":
+        return rest.partition(":")[0] in IMMEDIATE_RULE_KINDS
+    return alert_type in IMMEDIATE_ALERTS
+
+
+async def route_alert(network_name, operator_address, alert_type, alert, now=None):
+    """Решает судьбу алерта: 'send' — отправить сразу, 'digest' — в сводку, None — подавлен cooldown.
+
+    Алерт для сводки сразу записывается в SQLite рядом с outbox: previous_states уже
+    ушли вперёд, и при перезапуске до отправки сводки он иначе потерялся бы.
+    """
+    if _is_immediate(alert_type):
+        return "send"
+    now = now or time.time()
+    key = (network_name, operator_address, alert_type)
+    # Падение аптайма ниже следующего порога — новое событие, а не повтор: cooldown его не глушит.
+    # check_uptime_alert уже сдвинул уровень, так что подавленное падение больше не повторится.
+    level = uptime_levels.get((network_name, operator_address)) if alert_type == "uptime" else None
+    sent = last_sent.get(key)
+    if sent and now - sent[0] < ALERT_COOLDOWN and not (level is not None and level > sent[1]):
+        logger.debug(f"Alert suppressed by cooldown: {alert}")
+        return None
+    last_sent[key] = (now, level)
+    if ALERT_DIGEST_INTERVAL and alert_type in DIGEST_ALERTS:
+        await asyncio.to_thread(outbox.add_to_digest, network_name, alert)
+        return "digest"
+    return "send"
+
+
+def build_digest_embeds(network_name, alerts):
+    """Сводка в одном или нескольких embed (лимит описания Discord — 4096 символов)."""
+    embeds = []
+    lines = []
+    length = 0
+    for alert in alerts:
+        if lines and length + len(alert) + 1 > 4000:
+            embeds.append(lines)
+            lines, length = [], 0
+        lines.append(alert)
+        length += len(alert) + 1
+    if lines:
+        embeds.append(lines)
+    return [
+        Embed(title=f"Validator Alert Digest ({network_name}, {len(alerts)})" if index == 0
+              else f"Validator Alert Digest ({network_name}, cont.)",
+              description="\n".join(chunk), color=discord.Color.gold())
+        for index, chunk in enumerate(embeds)
+    ]
+
+
+async def flush_digest(bot, network):
+    """Ставит накопленную сводку в outbox и только после этого удаляет её алерты из таблицы.
+
+    Ключ идемпотентности — последний id в сводке, поэтому сбой между постановкой в outbox
+    и удалением не приведёт к повторной отправке той же сводки.
+    """
+    rows = await asyncio.to_thread(outbox.pending_digest, network.name)
+    if not rows:
+        return
+    last_id = rows[-1][0]
+    targets = alert_targets(network)
+    if targets:
+        alerts = [alert for _, alert in rows]
+        for index, embed in enumerate(build_digest_embeds(network.name, alerts)):
+            await enqueue_alert(targets, embed, make_key(network.name, "digest", last_id, index))
+        logger.info(f"[{network.name}] Queued alert digest with {len(alerts)} alert(s).")
+    # Без канала и вебхуков сводку отправлять некуда (личные сообщения уходят сразу)
+    await asyncio.to_thread(outbox.clear_digest, network.name, last_id)
+
+
+async def run_alert_digest(bot, network):
+    """Фоновая задача: отправляет накопленную сводку некритичных алертов."""
+    if not ALERT_DIGEST_INTERVAL:
+        return
+    while True:
+        await asyncio.sleep(ALERT_DIGEST_INTERVAL)
+        try:
+            await flush_digest(bot, network)
+        except Exception as e:
+            logger.error(f"[{network.name}] Error sending alert digest: {e}")
@@ -0,0 +1,209 @@
+# utils/alert_rules.py
+
+import itertools
+import logging
+import os
+from dotenv import load_dotenv
+from utils.snapshot_store import save_alert_rule, delete_alert_rule, load_alert_rules
+from utils.dm_alerts import dm_subscribers
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+MAX_RULES_PER_USER = int(os.getenv("MAX_RULES_PER_USER", "25"))
+WILDCARD = "*"  # правило для всех валидаторов сети
+
+
+def _uptime_below(rule, prev, cur):
+    return prev["uptime"] >= rule.threshold > cur["uptime"]
+
+
+def _uptime_above(rule, prev, cur):
+    return prev["uptime"] < rule.threshold <= cur["uptime"]
+
+
+def _commission_change(rule, prev, cur):
+    return prev.get("commission") != cur.get("commission")
+
+
+def _tokens_drop(rule, prev, cur):
+    prev_tokens, cur_tokens = prev.get("tokens"), cur.get("tokens")
+    if not prev_tokens or cur_tokens is None:
+        return False
+    return (prev_tokens - cur_tokens) / prev_tokens * 100 > rule.threshold
+
+
+def _status_change(rule, prev, cur):
+    return prev.get("status") != cur.get("status") or prev.get("jailed") != cur.get("jailed")
+
+
+def _status_text(validator):
+    status = validator.get("status", "").replace("BOND_STATUS_", "").lower()
+    return f"{status}, jailed" if validator.get("jailed") else status
+
+
+# Тип правила: (поля валидатора, при изменении которых правило проверяется,
+#               условие срабатывания, текст алерта, нужен ли порог)
+RULE_KINDS = {
+    "uptime_below": (
+        ("uptime",), _uptime_below,
+        lambda r, p, c: f"uptime dropped below {r.threshold:g}%: now at {c['uptime']}%", True,
+    ),
+    "uptime_above": (
+        ("uptime",), _uptime_above,
+        lambda r, p, c: f"uptime rose above {r.threshold:g}%: now at {c['uptime']}%", True,
+    ),
+    "commission_change": (
+        ("commission",), _commission_change,
+        lambda r, p, c: f"commission changed from {p['commission'] * 100:.2f}% to {c['commission'] * 100:.2f}%", False,
+    ),
+    "tokens_drop": (
+        ("tokens",), _tokens_drop,
+        lambda r, p, c: f"stake dropped by {(p['tokens'] - c['tokens']) / p['tokens'] * 100:.1f}% "
+                        f"(more than {r.threshold:g}%)", True,
+    ),
+    "status_change": (
+        ("status", "jailed"), _status_change,
+        lambda r, p, c: f"status changed from {_status_text(p)} to {_status_text(c)}", False,
+    ),
+}
+
+# Поля, изменения которых вообще могут затронуть какое-либо правило
+WATCHED_FIELDS = tuple(sorted({field for fields, *_ in RULE_KINDS.values() for field in fields}))
+
+
+class AlertRule:
+    """One user's alert rule for a validator (or every validator) of a network."""
+
+    def __init__(self, rule_id, user_id, network, validator, kind, threshold=None):
+        self.rule_id = rule_id
+        self.user_id = user_id
+        self.network = network
+        self.validator = validator
+        self.kind = kind
+        self.threshold = threshold
+        self.fields, self.condition, self.describe, _ = RULE_KINDS[kind]
+
+    def matches(self, prev, cur):
+        try:
+            return self.condition(self, prev, cur)
+        except (KeyError, TypeError):
+            return False
+
+    def __str__(self):
+        target = "all validators" if self.validator == WILDCARD else self.validator
+        threshold = f" {self.threshold:g}" if self.threshold is not None else ""
+        return f"#{self.rule_id} {self.kind}{threshold} on {target} ({self.network})"
+
+
+class RuleIndex:
+    """Rules indexed by (network, validator, field) plus per-field wildcard rules.
+
+    An update only looks up rules for the fields that actually changed on a validator,
+    so the cost depends on the number of changes, not on the number of rules.
+    """
+
+    def __init__(self):
+        self.rules = {}     # {rule_id: AlertRule}
+        self.by_key = {}    # {(network, validator, field): [AlertRule]}
+        self.wildcard = {}  # {(network, field): [AlertRule]}
+
+    def _buckets(self, rule):
+        for field in rule.fields:
+            if rule.validator == WILDCARD:
+                yield self.wildcard.setdefault((rule.network, field), [])
+            else:
+                yield self.by_key.setdefault((rule.network, rule.validator, field), [])
+
+    def add(self, rule):
+        self.rules[rule.rule_id] = rule
+        for bucket in self._buckets(rule):
+            bucket.append(rule)
+
+    def remove(self, rule_id):
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return None
+        for bucket in self._buckets(rule):
+            bucket.remove(rule)
+        return rule
+
+    def rebuild(self, rules):
+        self.rules.clear()
+        self.by_key.clear()
+        self.wildcard.clear()
+        for rule in rules:
+            self.add(rule)
+
+    def for_user(self, user_id):
+        return [rule for rule in self.rules.values() if rule.user_id == user_id]
+
+    def evaluate(self, network, changes):
+        """changes: {operator_address: (previous, current, changed_fields)}.
+
+        Возвращает [(rule, operator_address, moniker, text), ...] для сработавших правил.
+        """
+        fired = []
+        for operator_address, (prev, cur, changed_fields) in changes.items():
+            candidates = {}
+            for field in changed_fields:
+                for rule in itertools.chain(self.by_key.get((network, operator_address, field), ()),
+                                            self.wildcard.get((network, field), ())):
+                    candidates[rule.rule_id] = rule
+            for rule in candidates.values():
+                if rule.matches(prev, cur):
+                    fired.append((rule, operator_address, cur.get("moniker", operator_address),
+                                  rule.describe(rule, prev, cur)))
+        return fired
+
+
+rule_index = RuleIndex()
+
+
+def changed_fields(prev, cur):
+    return [field for field in WATCHED_FIELDS if prev.get(field) != cur.get(field)]
+
+
+def format_rule_alert(rule, moniker, text):
+    mention = "" if rule.user_id in dm_subscribers else f" <@{rule.user_id}>"
+    return f"🔔 **{moniker}** {text}. Rule #{rule.rule_id}{mention}"
+
+
+async def add_rule(user_id, network, validator, kind, threshold=None):
+    """Создаёт правило пользователя. Возвращает AlertRule или строку с ошибкой."""
+    if kind not in RULE_KINDS:
+        return f"Unknown rule type {kind}."
+    if RULE_KINDS[kind][3] and threshold is None:
+        return f"Rule type {kind} needs a threshold."
+    if not RULE_KINDS[kind][3]:
+        threshold = None
+    if len(rule_index.for_user(user_id)) >= MAX_RULES_PER_USER:
+        return f"You already have {MAX_RULES_PER_USER} rules, remove some first."
+
+    validator = (validator or WILDCARD).strip().lower()
+    rule_id = await save_alert_rule(user_id, network, validator, kind, threshold)
+    rule = AlertRule(rule_id, user_id, network, validator, kind, threshold)
+    rule_index.add(rule)
+    logger.info(f"User {user_id} added alert rule {rule}")
+    return rule
+
+
+async def remove_rule(user_id, rule_id):
+    rule = rule_index.rules.get(rule_id)
+    if rule is None or rule.user_id != user_id:
+        return None
+    await delete_alert_rule(rule_id)
+    return rule_index.remove(rule_id)
+
+
+async def sync_alert_rules():
+    """Перечитывает правила из хранилища (их добавляют frontend-процессы) и пересобирает индекс.
+
+    В standalone так же подхватываются правила, сохранённые до перезапуска.
+    """
+    rows = await load_alert_rules()
+    rules = []
+    for rule_id, user_id, network, validator, kind, threshold in rows:
+        if kind in RULE_KINDS:
+            rules.append(AlertRule(rule_id, user_id, network, validator, kind, threshold))
+    rule_index.rebuild(rules)
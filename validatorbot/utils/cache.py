@@ -1,7 +1,23 @@
 # utils/cache.py
-validator_cache = {
-    "data": {},
-    "summary": {},
-    "last_updated": None
+from utils.networks import NETWORK_NAMES
+
+# Отдельный кэш для каждой сети, чтобы данные testnet и mainnet не смешивались
+network_caches = {
+    name: {
+        "data": {},
+        "summary": {},
+        "last_updated": None
+    }
+    for name in NETWORK_NAMES
 }
-selected_validators = {}  # {user_id: validator_address}
\ No newline at end of file
+
+# Кэш сети по умолчанию (первая в NETWORKS)
+validator_cache = network_caches[NETWORK_NAMES[0]]
+selected_validators = {}  # {user_id: (network_name, validator_address)}
+
+
+def get_validator_cache(network_name=None):
+    """Возвращает кэш валидаторов указанной сети (по умолчанию — первой)."""
+    if network_name is None:
+        return validator_cache
+    return network_caches[network_name]
@@ -0,0 +1,40 @@
+# utils/coalesce.py
+
+import asyncio
+import time
+
+# Запросы, которые сейчас выполняются: {key: Future}
+_inflight = {}
+# Недавно полученные результаты: {key: (expires_at, result)}
+_recent = {}
+
+
+async def coalesce(key, factory, ttl=0):
+    """Выполняет factory() один раз для всех одновременных вызовов с одинаковым key.
+
+    Пока запрос выполняется, остальные вызовы ждут тот же Future; при ttl > 0
+    результат ещё ttl секунд отдаётся из памяти без нового запроса.
+    """
+    if ttl:
+        recent = _recent.get(key)
+        if recent is not None and recent[0] > time.monotonic():
+            return recent[1]
+
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(factory())
+        _inflight[key] = future
+
+        def _done(f):
+            _inflight.pop(key, None)
+            if ttl and not f.cancelled() and f.exception() is None:
+                now = time.monotonic()
+                if len(_recent) > 1000:
+                    for stale in [k for k, (expires_at, _) in _recent.items() if expires_at <= now]:
+                        del _recent[stale]
+                _recent[key] = (now + ttl, f.result())
+
+        future.add_done_callback(_done)
+
+    # shield: отмена одного ожидающего не должна отменять запрос для остальных
+    return await asyncio.shield(future)
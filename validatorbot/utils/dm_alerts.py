@@ -0,0 +1,86 @@
+# utils/dm_alerts.py
+
+import asyncio
+import logging
+import os
+import discord
+from discord import Embed
+from dotenv import load_dotenv
+from utils.cache import selected_validators
+from utils.outbox import PermanentDeliveryError, register_sender
+from utils.snapshot_store import set_dm_subscription, load_dm_subscribers
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Сколько личных сообщений отправляется одновременно. Лимиты маршрутов Discord соблюдает
+# сам discord.py, семафор лишь не даёт массовому событию открыть сотни запросов разом.
+DM_CONCURRENCY = int(os.getenv("DM_CONCURRENCY", "5"))
+
+dm_subscribers = set()  # user_id, включившие /dm_alerts: получают алерты в личку, а не упоминанием
+dm_channels = {}        # {user_id: DMChannel}
+_dm_semaphore = asyncio.Semaphore(DM_CONCURRENCY)
+
+
+def _followers(network_name, operator_address):
+    """Пользователи, выбравшие валидатора именно в этой сети: адреса storyvaloper во всех сетях одинаковы."""
+    target = (network_name, operator_address.lower())
+    return [user_id for user_id, selection in selected_validators.items() if selection == target]
+
+
+def dm_recipients(network_name, operator_address):
+    """Подписчики валидатора, которым алерт уходит в личные сообщения."""
+    return [user_id for user_id in _followers(network_name, operator_address) if user_id in dm_subscribers]
+
+
+def channel_mentions(network_name, operator_address):
+    """Упоминания для алерта в канале: все подписчики валидатора, кроме получающих его в личку."""
+    return " ".join(f"<@{user_id}>" for user_id in _followers(network_name, operator_address)
+                    if user_id not in dm_subscribers)
+
+
+def dm_targets(user_ids):
+    return [f"dm:{user_id}" for user_id in dict.fromkeys(user_ids)]
+
+
+async def set_dm_alerts(user_id, enabled):
+    if enabled:
+        dm_subscribers.add(user_id)
+    else:
+        dm_subscribers.discard(user_id)
+    await set_dm_subscription(user_id, enabled)
+
+
+async def sync_dm_subscribers():
+    """Перечитывает подписки из хранилища (их включают frontend-процессы; в standalone — сохранённые до перезапуска)."""
+    subscribers = await load_dm_subscribers()
+    dm_subscribers.clear()
+    dm_subscribers.update(subscribers)
+
+
+async def get_dm_channel(bot, user_id):
+    """Личный канал пользователя: из кэша клиента, и только при промахе — через REST."""
+    channel = dm_channels.get(user_id)
+    if channel is None:
+        user = bot.get_user(user_id) or await bot.fetch_user(user_id)
+        channel = user.dm_channel or await user.create_dm()
+        dm_channels[user_id] = channel
+    return channel
+
+
+async def send_dm(bot, address, payload, key):
+    user_id = int(address)
+    async with _dm_semaphore:
+        try:
+            channel = await get_dm_channel(bot, user_id)
+            await channel.send(embed=Embed.from_dict(payload["embed"]), nonce=key[:25])
+        except (discord.NotFound, discord.Forbidden) as e:
+            # Личные сообщения закрыты или пользователь удалён: повтор не поможет. Отключаем
+            # доставку в личку, чтобы следующие алерты снова упоминали его в канале.
+            dm_channels.pop(user_id, None)
+            await set_dm_alerts(user_id, False)
+            logger.warning(f"Disabled DM alerts for user {user_id}: {e}")
+            raise PermanentDeliveryError(str(e)) from e
+
+
+register_sender("dm", send_dm)
@@ -0,0 +1,148 @@
+# utils/el_monitor.py
+
+import aiohttp
+import asyncio
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from utils.http import get_session
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+EL_PROBE_TIMEOUT = float(os.getenv("EL_PROBE_TIMEOUT", "5"))
+# На сколько блоков разница EL и CL может уйти от исходной, прежде чем узел считается рассинхронизированным
+EL_MAX_DIVERGENCE = int(os.getenv("EL_MAX_DIVERGENCE", "20"))
+
+# Все вызовы уходят одним HTTP-запросом (JSON-RPC batch), id — индекс в списке
+EL_BATCH = ("eth_blockNumber", "eth_syncing", "net_peerCount", "txpool_status")
+
+# Исходная разница высот EL и CL каждого узла: {(network_name, node_name): offset}.
+# У story-geth и story нумерация блоков может не совпадать, поэтому сравниваем не высоты,
+# а изменение разницы между ними.
+el_baselines = {}
+el_states = {}  # {(network_name, node_name): status}
+
+el_status_labels = {
+    "ok": "🟢 in step with the consensus layer",
+    "down": "🔴 story-geth RPC is down",
+    "syncing": "⚠️ story-geth is syncing",
+    "diverged": "⚠️ story-geth has diverged from the consensus layer",
+}
+
+
+def _hex(value):
+    return int(value, 16) if isinstance(value, str) else None
+
+
+async def probe_el_node(node, semaphore):
+    """Один batch-запрос к story-geth узла. Ошибки не пробрасываются."""
+    result = {"name": node.name, "geth": node.geth_url, "block_number": None, "syncing": None,
+              "highest_block": None, "peers": None, "txpool_pending": None, "txpool_queued": None,
+              "latency_ms": None, "error": None}
+    payload = [{"jsonrpc": "2.0", "id": index, "method": method, "params": []}
+               for index, method in enumerate(EL_BATCH)]
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            session = get_session()
+            async with session.post(node.geth_url, json=payload,
+                                    timeout=aiohttp.ClientTimeout(total=EL_PROBE_TIMEOUT)) as response:
+                if response.status != 200:
+                    result["error"] = f"HTTP {response.status}"
+                    return result
+                replies = await response.json(content_type=None)
+        except asyncio.TimeoutError:
+            result["error"] = "timeout"
+            return result
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+            return result
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    if not isinstance(replies, list):
+        result["error"] = "batch requests are not supported"
+        return result
+    # Узел может вернуть ответы в любом порядке; txpool_status бывает отключён
+    answers = {reply.get("id"): reply.get("result") for reply in replies if isinstance(reply, dict)}
+    result["block_number"] = _hex(answers.get(0))
+    syncing = answers.get(1)
+    result["syncing"] = bool(syncing)
+    if isinstance(syncing, dict):
+        result["highest_block"] = _hex(syncing.get("highestBlock"))
+    result["peers"] = _hex(answers.get(2))
+    txpool = answers.get(3)
+    if isinstance(txpool, dict):
+        result["txpool_pending"] = _hex(txpool.get("pending"))
+        result["txpool_queued"] = _hex(txpool.get("queued"))
+    if result["block_number"] is None:
+        result["error"] = "no eth_blockNumber in response"
+    return result
+
+
+async def probe_el_fleet(nodes, semaphore):
+    """Опрашивает story-geth всех узлов, у которых он указан: [(node, result), ...]."""
+    el_nodes = [node for node in nodes if node.geth_url]
+    results = await asyncio.gather(*(probe_el_node(node, semaphore) for node in el_nodes))
+    return list(zip(el_nodes, results))
+
+
+def evaluate_el(network_name, el_result, cl_result):
+    """Сравнивает высоты EL и CL узла и возвращает статус EL."""
+    key = (network_name, el_result["name"])
+    cl_height = cl_result.get("height") if cl_result else None
+    el_result["cl_height"] = cl_height
+    el_result["offset"] = None
+    el_result["divergence"] = None
+
+    if el_result["error"] or el_result["syncing"] or cl_height is None or cl_result.get("catching_up"):
+        # Узел лежал или синхронизировался (например, восстановлен из снапшота): разница
+        # высот EL и CL после этого может стать другой, исходную определяем заново
+        el_baselines.pop(key, None)
+    if el_result["error"]:
+        return "down"
+    if el_result["syncing"]:
+        return "syncing"
+    if cl_height is None or cl_result.get("catching_up"):
+        # Без синхронизированного CL сравнивать не с чем
+        return "ok"
+
+    offset = el_result["block_number"] - cl_height
+    baseline = el_baselines.setdefault(key, offset)
+    el_result["offset"] = offset
+    el_result["divergence"] = offset - baseline
+    if abs(el_result["divergence"]) > EL_MAX_DIVERGENCE:
+        return "diverged"
+    return "ok"
+
+
+def format_el_alert(network_name, el_result, previous):
+    details = []
+    if el_result["error"]:
+        details.append(el_result["error"])
+    if el_result["block_number"] is not None:
+        details.append(f"EL block {el_result['block_number']}")
+    if el_result["cl_height"] is not None:
+        details.append(f"CL height {el_result['cl_height']}")
+    if el_result["divergence"]:
+        details.append(f"divergence {el_result['divergence']:+d} blocks")
+    text = (f"**{el_result['name']}** ({network_name}) is now {el_status_labels[el_result['status']]} "
+            f"(was {el_status_labels[previous]}).")
+    if details:
+        text += f" {', '.join(details)}."
+    return text
+
+
+def check_el_results(network_name, el_results, cl_results):
+    """Проставляет статусы EL и возвращает алерты о сменах статуса: [(text, healthy), ...]."""
+    cl_by_name = {result["name"]: result for result in cl_results}
+    alerts = []
+    for el_result in el_results:
+        el_result["status"] = evaluate_el(network_name, el_result, cl_by_name.get(el_result["name"]))
+        key = (network_name, el_result["name"])
+        previous = el_states.get(key)
+        el_states[key] = el_result["status"]
+        if previous is not None and previous != el_result["status"]:
+            alerts.append((format_el_alert(network_name, el_result, previous), el_result["status"] == "ok"))
+    return alerts
@@ -2,57 +2,67 @@
 
 import discord
 import logging
-from utils.cache import validator_cache
+from utils.cache import get_validator_cache
 from utils.cache import selected_validators
+from utils.voting_power import TOP_N
 
 logger = logging.getLogger(__name__)
 
-def create_validator_embed(validator):
-    try:
-        validator_data = validator.get('validator', {})
-        if not validator_data:
-            raise KeyError("Validator data is empty")
+def create_validator_detail_embed(operator_address, cached, sections, section_order, voting_power=None):
+    """Карточка валидатора: основные поля из кэша и дополнительные разделы по мере загрузки.
 
-        description = validator_data.get('description', {})
-        commission = validator_data.get('commission', {}).get('commission_rates', {})
+    sections — {название: текст} уже загруженных разделов, остальные из section_order
+    показываются как загружающиеся.
+    """
+    moniker = cached.get("moniker") if cached else None
+    embed = discord.Embed(title=f"Validator {moniker or operator_address}", color=discord.Color.orange())
+    embed.add_field(name="Address", value=operator_address, inline=False)
+    if cached:
+        embed.add_field(name="Status", value=cached.get("status", "N/A"), inline=True)
+        embed.add_field(name="Jailed", value="Yes" if cached.get("jailed") else "No", inline=True)
+        embed.add_field(name="Uptime", value=f"{cached.get('uptime', 0.0):.2f}%", inline=True)
+        embed.add_field(name="Tokens", value=f"{cached.get('tokens', 0):,}", inline=True)
+        embed.add_field(name="Commission Rate", value=f"{cached.get('commission', 0) * 100:.2f}%", inline=True)
+        rank = voting_power.rank(operator_address) if voting_power else None
+        if rank:
+            embed.add_field(name="Voting Power",
+                            value=f"#{rank} of {len(voting_power.ranked)} · {voting_power.share(operator_address) * 100:.2f}%",
+                            inline=True)
 
-        jailed = "Yes" if validator_data.get('jailed', False) else "No"
+    for name, _ in section_order:
+        embed.add_field(name=name, value=sections.get(name, "⏳ Loading...")[:1024], inline=False)
 
-        tokens = int(validator_data.get('tokens', '0'))
-        delegator_shares = float(validator_data.get('delegator_shares', '0'))
-        commission_rate = float(commission.get('rate', '0'))
-        max_commission_rate = float(commission.get('max_rate', '0'))
-        max_change_rate = float(commission.get('max_change_rate', '0'))
+    loaded = sum(1 for name, _ in section_order if name in sections)
+    footer = "Powered by Stake-Take"
+    if loaded < len(section_order):
+        footer = f"Loading {loaded}/{len(section_order)} sections... • {footer}"
+    embed.set_footer(text=footer)
+    return embed
 
-        embed = discord.Embed(
-            title=f"Validator {description.get('moniker', 'Unknown')}",
-            color=discord.Color.orange()
+def create_network_stats_embed(network_name, summary, voting_power):
+    """Распределение голосующей силы сети: концентрация у крупнейших и коэффициент Накамото."""
+    embed = discord.Embed(title=f"Network Stats ({network_name})", color=discord.Color.blue())
+    embed.add_field(name="Active Validators", value=f"{len(voting_power.ranked)} of {summary.get('total', 'N/A')}", inline=True)
+    embed.add_field(name="Bonded Tokens", value=f"{voting_power.total:,}", inline=True)
+    embed.add_field(name="Nakamoto Coefficient", value=f"{voting_power.nakamoto()} (>1/3 of voting power)", inline=False)
+    embed.add_field(name="Validators to Reach 2/3", value=str(voting_power.nakamoto(2 / 3)), inline=False)
+    embed.add_field(
+        name="Voting Power Concentration",
+        value="\n".join(f"Top {n}: {voting_power.concentration(n) * 100:.2f}%" for n in TOP_N),
+        inline=False,
+    )
+    largest = voting_power.top(5)
+    if largest:
+        validator_data = get_validator_cache(network_name)["data"]
+        embed.add_field(
+            name="Largest Validators",
+            value="\n".join(f"#{rank} {validator_data.get(address, {}).get('moniker', address)}: "
+                            f"{tokens / voting_power.total * 100:.2f}%"
+                            for rank, (address, tokens) in enumerate(largest, 1)),
+            inline=False,
         )
-        embed.add_field(name="Address", value=validator_data.get('operator_address', 'N/A'), inline=False)
-        embed.add_field(name="Status", value=validator_data.get('status', 'N/A'), inline=False)
-        embed.add_field(name="Jailed", value=jailed, inline=False)
-        embed.add_field(name="Tokens", value=f"{tokens}", inline=False)
-        embed.add_field(name="Delegator Shares", value=f"{delegator_shares:.2f}", inline=False)
-        embed.add_field(name="Commission Rate", value=f"{commission_rate * 100:.2f}%", inline=False)
-        embed.add_field(name="Max Commission Rate", value=f"{max_commission_rate * 100:.2f}%", inline=False)
-        embed.add_field(name="Max Change Rate", value=f"{max_change_rate * 100:.2f}%", inline=False)
-        embed.add_field(name="Website", value=description.get('website', 'N/A'), inline=False)
-        embed.add_field(name="Details", value=description.get('details', 'N/A'), inline=False)
-
-        # Добавляем аптайм
-        operator_address = validator_data.get('operator_address')
-        cached_validator = validator_cache["data"].get(operator_address)
-        if cached_validator:
-            uptime = cached_validator.get('uptime', 0.0)
-            embed.add_field(name="Uptime", value=f"{uptime:.2f}%", inline=False)
-        else:
-            embed.add_field(name="Uptime", value="N/A", inline=False)
-
-        embed.set_footer(text="Powered by Stake-Take")
-        return embed
-    except KeyError as e:
-        logger.error(f"KeyError: {e}, data: {validator}")
-        return None
+    embed.set_footer(text="Powered by Stake-Take")
+    return embed
 
 def create_validator_list_embed(validators):
     embed = discord.Embed(title="Validator List", color=discord.Color.orange())
@@ -0,0 +1,123 @@
+# utils/export.py
+
+import asyncio
+import csv
+import datetime
+import io
+import logging
+import os
+import tempfile
+from dotenv import load_dotenv
+from utils.cache import get_validator_cache
+from utils.snapshot_store import store
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet необязателен: без pyarrow доступен только CSV
+    pa = pq = None
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Файл собирается в памяти до этого размера, дальше SpooledTemporaryFile уходит на диск
+EXPORT_SPOOL_SIZE = int(os.getenv("EXPORT_SPOOL_SIZE", str(8 * 1024 * 1024)))
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))  # строк в одной группе Parquet
+
+EXPORT_COLUMNS = ("network", "snapshot_version", "snapshot_time", "operator_address", "moniker", "status",
+                  "jailed", "uptime", "commission", "tokens", "missed_blocks")
+EXPORT_FORMATS = ("csv", "parquet") if pq is not None else ("csv",)
+
+
+def _timestamp(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        return datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc).isoformat()
+    return value
+
+
+def _snapshot_rows(network_name, version, snapshot_time, validator_data):
+    snapshot_time = _timestamp(snapshot_time)
+    for operator_address, validator in validator_data.items():
+        yield (network_name, version, snapshot_time, operator_address, validator.get("moniker"),
+               validator.get("status"), validator.get("jailed"), validator.get("uptime"),
+               validator.get("commission"), validator.get("tokens"), validator.get("missed_blocks"))
+
+
+def export_rows(network_name, validator_data, last_updated, history=False):
+    """Строки выгрузки по одной: все хранимые версии снимка или только текущий кэш.
+
+    Последняя хранимая версия и есть текущий кэш, поэтому при выгрузке истории он отдельно не пишется.
+    """
+    if history and store is not None:
+        exported = False
+        for version, published_at, payload in store.iter_snapshots(network_name):
+            exported = True
+            yield from _snapshot_rows(network_name, version, published_at, payload.get("data", {}))
+        if exported:
+            return
+    yield from _snapshot_rows(network_name, None, last_updated, validator_data)
+
+
+def _write_csv(rows, buffer):
+    text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()  # буфер закрывает вызывающий, не обёртка
+
+
+def _write_parquet(rows, buffer):
+    schema = pa.schema([
+        ("network", pa.string()), ("snapshot_version", pa.int64()), ("snapshot_time", pa.string()),
+        ("operator_address", pa.string()), ("moniker", pa.string()), ("status", pa.string()),
+        ("jailed", pa.bool_()), ("uptime", pa.float64()), ("commission", pa.float64()),
+        ("tokens", pa.int64()), ("missed_blocks", pa.int64()),
+    ])
+    with pq.ParquetWriter(buffer, schema, compression="zstd") as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= EXPORT_BATCH_ROWS:
+                writer.write_table(pa.Table.from_pylist([dict(zip(EXPORT_COLUMNS, r)) for r in batch], schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist([dict(zip(EXPORT_COLUMNS, r)) for r in batch], schema))
+
+
+def build_export(network_name, validator_data, last_updated, fmt="csv", history=False):
+    """Пишет выгрузку в SpooledTemporaryFile и возвращает (buffer, размер). Вызывается вне event loop."""
+    buffer = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    try:
+        rows = export_rows(network_name, validator_data, last_updated, history)
+        if fmt == "parquet":
+            _write_parquet(rows, buffer)
+        else:
+            _write_csv(rows, buffer)
+        size = buffer.tell()
+        buffer.seek(0)
+        return buffer, size
+    except Exception:
+        buffer.close()
+        raise
+
+
+def history_available():
+    """Историю снимков хранит только общее хранилище (режимы poller и frontend)."""
+    return store is not None
+
+
+async def export_validators(network_name, fmt="csv", history=False):
+    """Выгрузка таблицы валидаторов сети; генерация идёт в пуле потоков.
+
+    Возвращает (buffer, размер, выгружена ли история): если сохранённых версий ещё нет,
+    выгружается только текущий кэш, и вызывающий не должен называть файл историей.
+    """
+    cache = get_validator_cache(network_name)
+    if history:
+        history = history_available() and await asyncio.to_thread(store.latest_version, network_name) > 0
+    # Кэш при обновлении заменяется новым словарём, поэтому поток читает неизменный снимок
+    buffer, size = await asyncio.to_thread(build_export, network_name, cache["data"], cache["last_updated"], fmt, history)
+    return buffer, size, history
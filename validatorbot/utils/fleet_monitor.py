@@ -0,0 +1,255 @@
+# utils/fleet_monitor.py
+
+import asyncio
+import json
+import logging
+import os
+import time
+import aiohttp
+import discord
+from discord import Embed
+from dotenv import load_dotenv
+from utils.cache import get_validator_cache
+from utils.el_monitor import probe_el_fleet, check_el_results
+from utils.http import fetch_json, get_session
+from utils.outbox import alert_targets, enqueue_alert, make_key
+from utils.networks import networks, NETWORK_NAMES, _env
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Узлы оператора задаются для каждой сети через <NETWORK>_FLEET_NODES (для первой сети
+# допускается FLEET_NODES): "node1=http://1.2.3.4:26657|http://1.2.3.4:8545,node2=...",
+# где часть после | — необязательный адрес story-geth. Либо JSON-файлом FLEET_CONFIG:
+# [{"name": "node1", "network": "testnet", "rpc": "http://...", "geth": "http://..."}]
+FLEET_CONFIG = os.getenv("FLEET_CONFIG")
+FLEET_PROBE_INTERVAL = int(os.getenv("FLEET_PROBE_INTERVAL", "60"))
+FLEET_PROBE_CONCURRENCY = int(os.getenv("FLEET_PROBE_CONCURRENCY", "50"))
+FLEET_PROBE_TIMEOUT = float(os.getenv("FLEET_PROBE_TIMEOUT", "5"))
+FLEET_MAX_LAG = int(os.getenv("FLEET_MAX_LAG", "10"))  # блоков
+FLEET_MIN_PEERS = int(os.getenv("FLEET_MIN_PEERS", "3"))
+
+# Последний известный статус каждого узла: {(network_name, node_name): status}
+fleet_states = {}
+
+status_labels = {
+    "ok": "🟢 healthy",
+    "down": "🔴 RPC is down",
+    "catching_up": "⚠️ catching up",
+    "lagging": "⚠️ lagging behind the network",
+    "low_peers": "⚠️ has too few peers",
+}
+
+
+class FleetNode:
+    """One operator-owned node: CometBFT RPC and, optionally, story-geth JSON-RPC."""
+
+    def __init__(self, name, network, rpc_url, geth_url=None):
+        self.name = name
+        self.network = network
+        self.rpc_url = rpc_url.rstrip("/")
+        self.geth_url = geth_url.rstrip("/") if geth_url else None
+
+    def __repr__(self):
+        return f"<FleetNode {self.network}/{self.name} rpc={self.rpc_url} geth={self.geth_url}>"
+
+
+def parse_fleet_nodes(value, network_name):
+    nodes = []
+    for entry in (e.strip() for e in value.split(",")):
+        if not entry:
+            continue
+        name, _, urls = entry.partition("=")
+        rpc_url, _, geth_url = urls.partition("|")
+        if not name or not rpc_url:
+            logger.error(f"Invalid fleet node entry: {entry}")
+            continue
+        nodes.append(FleetNode(name.strip(), network_name, rpc_url.strip(), geth_url.strip() or None))
+    return nodes
+
+
+def load_fleet():
+    """Собирает список узлов из <NETWORK>_FLEET_NODES и FLEET_CONFIG."""
+    nodes = []
+    for index, network_name in enumerate(NETWORK_NAMES):
+        nodes.extend(parse_fleet_nodes(_env(network_name, "FLEET_NODES", "", fallback=index == 0), network_name))
+    if FLEET_CONFIG:
+        try:
+            with open(FLEET_CONFIG) as f:
+                for entry in json.load(f):
+                    network_name = entry.get("network", NETWORK_NAMES[0])
+                    if network_name not in networks:
+                        logger.error(f"Fleet node {entry.get('name')} refers to unknown network {network_name}")
+                        continue
+                    nodes.append(FleetNode(entry["name"], network_name, entry["rpc"], entry.get("geth")))
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load fleet config {FLEET_CONFIG}: {e}")
+    logger.info(f"Loaded {len(nodes)} fleet node(s).")
+    return nodes
+
+
+fleet = load_fleet()
+
+
+async def _rpc_get(session, url, timeout):
+    async with session.get(url, timeout=timeout) as response:
+        if response.status != 200:
+            raise RuntimeError(f"{url.rsplit('/', 1)[-1]}: HTTP {response.status}")
+        return await response.json(content_type=None)
+
+
+async def probe_node(node, semaphore):
+    """Опрашивает /status и /net_info узла одновременно. Ошибки не пробрасываются.
+
+    Запросы идут напрямую через общую сессию со своим таймаутом, а не через fetch_json:
+    объединение запросов защищает их от отмены, и зависший узел держал бы соединение
+    пула до общего таймаута сессии уже после выхода из семафора.
+    """
+    result = {"name": node.name, "rpc": node.rpc_url, "height": None, "catching_up": None,
+              "peers": None, "latency_ms": None, "error": None}
+    timeout = aiohttp.ClientTimeout(total=FLEET_PROBE_TIMEOUT)
+    async with semaphore:
+        start = time.perf_counter()
+        session = get_session()
+        # return_exceptions: оба запроса завершаются внутри семафора, даже если один упал
+        status, net_info = await asyncio.gather(
+            _rpc_get(session, f"{node.rpc_url}/status", timeout),
+            _rpc_get(session, f"{node.rpc_url}/net_info", timeout),
+            return_exceptions=True,
+        )
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    if isinstance(status, BaseException):
+        result["error"] = "timeout" if isinstance(status, asyncio.TimeoutError) else str(status) or type(status).__name__
+        return result
+    # Неполный или испорченный ответ узла не должен сорвать весь цикл опроса
+    try:
+        sync_info = status['result']['sync_info']
+        result["height"] = int(sync_info['latest_block_height'])
+        result["catching_up"] = sync_info['catching_up']
+    except (KeyError, TypeError, ValueError) as e:
+        result["error"] = f"invalid /status response ({type(e).__name__}: {e})"
+        return result
+    result["latency_ms"] = latency_ms
+    try:
+        result["peers"] = int(net_info['result']['n_peers'])
+    except (KeyError, TypeError, ValueError):
+        pass  # /net_info недоступен или отключён — число пиров неизвестно
+    return result
+
+
+async def fetch_network_head(network):
+    """Высота сети по публичным RPC; недоступные RPC пропускаются."""
+    async def height(rpc_url):
+        try:
+            data = await fetch_json(f"{rpc_url}/status")
+            return int(data['result']['sync_info']['latest_block_height']) if data else None
+        except Exception as e:
+            logger.warning(f"[{network.name}] Failed to fetch head from {rpc_url}: {e}")
+            return None
+
+    heights = await asyncio.gather(*(height(url) for url in (network.rpc_url, network.reserve_rpc_url) if url))
+    return max((h for h in heights if h), default=None)
+
+
+def classify(result, head):
+    if result["error"] or result["height"] is None:
+        return "down"
+    if result["catching_up"]:
+        return "catching_up"
+    if head is not None and result["lag"] > FLEET_MAX_LAG:
+        return "lagging"
+    if result["peers"] is not None and result["peers"] < FLEET_MIN_PEERS:
+        return "low_peers"
+    return "ok"
+
+
+async def probe_fleet(nodes):
+    """Один цикл опроса всех узлов (CL и story-geth одновременно).
+
+    Возвращает ({network_name: head}, {network_name: [cl_result, ...]}, {network_name: [el_result, ...]}).
+    """
+    semaphore = asyncio.Semaphore(FLEET_PROBE_CONCURRENCY)
+    network_names = sorted({node.network for node in nodes})
+    heads, results, el_results = await asyncio.gather(
+        asyncio.gather(*(fetch_network_head(networks[name]) for name in network_names)),
+        asyncio.gather(*(probe_node(node, semaphore) for node in nodes)),
+        probe_el_fleet(nodes, semaphore),
+    )
+    heads = dict(zip(network_names, heads))
+
+    by_network = {name: [] for name in network_names}
+    for node, result in zip(nodes, results):
+        by_network[node.network].append(result)
+    el_by_network = {name: [] for name in network_names}
+    for node, result in el_results:
+        el_by_network[node.network].append(result)
+
+    for network_name, network_results in by_network.items():
+        # Если публичные RPC недоступны, голова сети — самый высокий из наших узлов
+        head = max(filter(None, [heads[network_name]] + [r["height"] for r in network_results]), default=None)
+        for result in network_results:
+            result["lag"] = head - result["height"] if head is not None and result["height"] is not None else None
+            result["status"] = classify(result, head)
+        heads[network_name] = head
+    return heads, by_network, el_by_network
+
+
+def format_fleet_alert(network_name, result, previous):
+    details = []
+    if result["error"]:
+        details.append(result["error"])
+    if result["lag"] is not None:
+        details.append(f"lag {result['lag']} blocks")
+    if result["peers"] is not None:
+        details.append(f"{result['peers']} peers")
+    text = f"**{result['name']}** ({network_name}) is now {status_labels[result['status']]} (was {status_labels[previous]})."
+    if details:
+        text += f" {', '.join(details)}."
+    return text
+
+
+async def send_fleet_alerts(bot, network, alerts):
+    now = time.time()
+    for alert, healthy in alerts:
+        embed = Embed(title=f"Node Alert ({network.name})", description=alert,
+                      color=discord.Color.green() if healthy else discord.Color.red())
+        await enqueue_alert(alert_targets(network), embed, make_key("fleet", now, alert), mention_users=False)
+        logger.info(f"Queued fleet alert: {alert}")
+
+
+async def check_fleet(bot, nodes):
+    heads, by_network, el_by_network = await probe_fleet(nodes)
+    for network_name, results in by_network.items():
+        alerts = check_el_results(network_name, el_by_network[network_name], results)
+
+        cache = get_validator_cache(network_name)
+        cache["fleet"] = sorted(results, key=lambda r: r["name"])
+        cache["fleet_el"] = sorted(el_by_network[network_name], key=lambda r: r["name"])
+        cache["fleet_head"] = heads[network_name]
+        cache["fleet_updated"] = time.time()
+
+        for result in results:
+            key = (network_name, result["name"])
+            previous = fleet_states.get(key)
+            fleet_states[key] = result["status"]
+            # Первый цикл только запоминает состояние, как и для валидаторов
+            if previous is not None and previous != result["status"]:
+                alerts.append((format_fleet_alert(network_name, result, previous), result["status"] == "ok"))
+
+        unhealthy = sum(1 for r in results if r["status"] != "ok")
+        logger.info(f"[{network_name}] Fleet probed: {len(results) - unhealthy} healthy, {unhealthy} unhealthy, "
+                    f"head {heads[network_name]}.")
+        if alerts:
+            await send_fleet_alerts(bot, networks[network_name], alerts)
+
+
+async def run_fleet_monitor(bot, nodes=None):
+    """Фоновая задача: опрашивает все узлы оператора одним циклом."""
+    nodes = fleet if nodes is None else nodes
+    while True:
+        try:
+            await check_fleet(bot, nodes)
+        except Exception as e:
+            logger.error(f"Error probing fleet nodes: {e}")
+        await asyncio.sleep(FLEET_PROBE_INTERVAL)
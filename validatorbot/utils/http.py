@@ -0,0 +1,45 @@
+# utils/http.py
+
+import aiohttp
+import logging
+import os
+from dotenv import load_dotenv
+from utils.coalesce import coalesce
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Сколько секунд отдавать уже полученный ответ без повторного запроса
+COALESCE_TTL = float(os.getenv("COALESCE_TTL", "5"))
+
+# Один пул соединений на весь процесс, общий для всех сетей и кнопок
+_session = None
+
+
+def get_session():
+    """Возвращает общий aiohttp.ClientSession, создавая его при первом обращении."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+        )
+    return _session
+
+
+async def _get_json(url, params):
+    session = get_session()
+    async with session.get(url, params=params) as response:
+        if response.status == 200:
+            return await response.json()
+        logger.error(f"Request to {url} failed: {response.status}")
+        return None
+
+
+async def fetch_json(url, params=None, ttl=COALESCE_TTL):
+    """GET-запрос через общий пул. Одинаковые одновременные запросы выполняются один раз.
+
+    Возвращает JSON или None, если сервер ответил не 200.
+    """
+    key = (url, tuple(sorted(params.items())) if params else None)
+    return await coalesce(key, lambda: _get_json(url, params), ttl=ttl)
@@ -0,0 +1,55 @@
+# utils/http_api.py
+
+import logging
+import os
+from aiohttp import web
+from dotenv import load_dotenv
+from utils.cache import get_validator_cache, network_caches
+from utils.metrics import render_prometheus
+from utils.loop_watchdog import watchdog
+from utils.networks import networks, get_network
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Локальный HTTP-эндпоинт для скриптов на серверах узлов (например, install_story_node.sh).
+# BOT_HTTP_PORT=0 отключает сервер.
+BOT_HTTP_HOST = os.getenv("BOT_HTTP_HOST", "127.0.0.1")
+BOT_HTTP_PORT = int(os.getenv("BOT_HTTP_PORT", "8787"))
+
+
+def _network_from_request(request):
+    name = request.query.get("network")
+    if name is not None and name not in networks:
+        raise web.HTTPNotFound(text=f"Unknown network {name}")
+    return get_network(name)
+
+
+async def handle_state_sync(request):
+    """GET /state_sync?network=<name> — проверенные trust_height, trust_hash и rpc_servers."""
+    network = _network_from_request(request)
+    trust_point = get_validator_cache(network.name).get("state_sync")
+    if not trust_point:
+        raise web.HTTPServiceUnavailable(text="State sync trust point is not available yet")
+    return web.json_response(trust_point)
+
+
+async def handle_metrics(request):
+    """GET /metrics — метрики узлов флота, story-geth и задержек бота для Prometheus."""
+    text = render_prometheus(network_caches, watchdog.lag, watchdog.top_slow_spots())
+    return web.Response(text=text, content_type="text/plain", charset="utf-8")
+
+
+async def start_http_api():
+    """Запускает HTTP-сервер в текущем event loop. Возвращает runner или None, если сервер отключён."""
+    if not BOT_HTTP_PORT:
+        return None
+    app = web.Application()
+    app.router.add_get("/state_sync", handle_state_sync)
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, BOT_HTTP_HOST, BOT_HTTP_PORT)
+    await site.start()
+    logger.info(f"HTTP API listening on {BOT_HTTP_HOST}:{BOT_HTTP_PORT}")
+    return runner
@@ -0,0 +1,203 @@
+# utils/jail_predictor.py
+
+import asyncio
+import logging
+import os
+import time
+import discord
+from discord import Embed
+from dotenv import load_dotenv
+from utils.cache import get_validator_cache
+from utils.dm_alerts import channel_mentions, dm_recipients, dm_targets
+from utils.http import fetch_json
+from utils.outbox import alert_targets, enqueue_alert, make_key
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Предупреждать, если до джейла по текущему темпу пропусков осталось меньше N минут
+JAIL_WARNING_HORIZON_MIN = float(os.getenv("JAIL_WARNING_HORIZON_MIN", "30"))
+# Валидаторы, которым до джейла меньше горизонта * JAIL_WATCH_FACTOR, проверяются чаще
+JAIL_WATCH_FACTOR = float(os.getenv("JAIL_WATCH_FACTOR", "4"))
+JAIL_FAST_CHECK_INTERVAL = int(os.getenv("JAIL_FAST_CHECK_INTERVAL", "30"))  # секунд
+JAIL_EMA_ALPHA = 0.5
+
+jail_state = {}    # {(network_name, operator_address): последний замер и сглаженные темпы}
+jail_warned = {}   # {network_name: {operator_address}} — уже предупреждённые
+jail_watch = {}    # {network_name: {operator_address}} — быстро деградирующие, проверяются по таймеру
+
+
+def _ema(previous, value):
+    return value if previous is None else JAIL_EMA_ALPHA * value + (1 - JAIL_EMA_ALPHA) * previous
+
+
+def update_prediction(network_name, operator_address, missed_blocks, index_offset, window_size, min_signed, now=None):
+    """Обновляет темп пропусков валидатора и прогнозирует, через сколько блоков и секунд он попадёт в джейл.
+
+    missed_blocks — missed_blocks_counter, index_offset — счётчик блоков валидатора из signing_info.
+    """
+    now = now or time.time()
+    key = (network_name, operator_address)
+    previous = jail_state.get(key)
+    state = {
+        "missed_blocks": missed_blocks,
+        "index_offset": index_offset,
+        "time": now,
+        "miss_rate": previous["miss_rate"] if previous else None,    # доля пропущенных блоков
+        "block_time": previous["block_time"] if previous else None,  # секунд на блок
+    }
+    if previous and index_offset > previous["index_offset"]:
+        blocks = index_offset - previous["index_offset"]
+        # Счётчик может и уменьшиться, когда старые пропуски выходят из окна
+        missed = max(0, missed_blocks - previous["missed_blocks"])
+        state["miss_rate"] = _ema(previous["miss_rate"], min(1.0, missed / blocks))
+        state["block_time"] = _ema(previous["block_time"], (now - previous["time"]) / blocks)
+    elif previous and index_offset == previous["index_offset"]:
+        # Новых блоков не было: оставляем прошлый замер как точку отсчёта
+        state.update(index_offset=previous["index_offset"], missed_blocks=previous["missed_blocks"],
+                     time=previous["time"])
+    jail_state[key] = state
+
+    max_missed = int(window_size * (1 - min_signed))
+    # Модуль slashing сажает в джейл, только когда пропусков больше max_missed:
+    # при missed == max_missed нужен ещё один пропуск
+    remaining = max(0, max_missed - missed_blocks + 1)
+    blocks_until_jail = None
+    seconds_until_jail = None
+    if remaining == 0:
+        blocks_until_jail = 0
+        seconds_until_jail = 0
+    elif state["miss_rate"]:
+        blocks_until_jail = max(remaining, int(remaining / state["miss_rate"]))
+        if state["block_time"]:
+            seconds_until_jail = blocks_until_jail * state["block_time"]
+    return {
+        "missed_blocks": missed_blocks,
+        "max_missed": max_missed,
+        "miss_rate": state["miss_rate"],
+        "blocks_until_jail": blocks_until_jail,
+        "seconds_until_jail": seconds_until_jail,
+    }
+
+
+def format_jail_warning(network_name, moniker, operator_address, prediction):
+    user_mentions = channel_mentions(network_name, operator_address)
+    minutes = prediction["seconds_until_jail"] / 60
+    when = "within the next block" if prediction["blocks_until_jail"] <= 1 else \
+        f"in ~{minutes:.0f} min (~{prediction['blocks_until_jail']} blocks)"
+    return (
+        f"🚨 **{moniker}** may be **jailed {when}**: missed {prediction['missed_blocks']} of "
+        f"{prediction['max_missed']} allowed blocks, missing {(prediction['miss_rate'] or 0) * 100:.0f}% "
+        f"of recent blocks. {user_mentions}"
+    )
+
+
+async def send_jail_warnings(bot, network, warnings):
+    """warnings: [(operator_address, text)]."""
+    now = time.time()
+    for operator_address, warning in warnings:
+        embed = Embed(title=f"Jail Warning ({network.name})", description=warning, color=discord.Color.dark_red())
+        targets = alert_targets(network) + dm_targets(dm_recipients(network.name, operator_address))
+        await enqueue_alert(targets, embed, make_key("jail_warning", network.name, now, warning))
+        logger.info(f"Queued jail warning: {warning}")
+
+
+def evaluate_validator(network_name, operator_address, validator, prediction):
+    """Обновляет списки наблюдения и возвращает текст предупреждения, если его пора отправить."""
+    warned = jail_warned.setdefault(network_name, set())
+    watch = jail_watch.setdefault(network_name, set())
+    horizon = JAIL_WARNING_HORIZON_MIN * 60
+    seconds = prediction["seconds_until_jail"]
+
+    if validator.get("jailed") or seconds is None:
+        warned.discard(operator_address)
+        watch.discard(operator_address)
+        return None
+    if seconds <= horizon * JAIL_WATCH_FACTOR:
+        watch.add(operator_address)
+    else:
+        watch.discard(operator_address)
+    if seconds <= horizon:
+        if operator_address not in warned:
+            warned.add(operator_address)
+            return format_jail_warning(network_name, validator["moniker"], operator_address, prediction)
+    elif seconds > horizon * 2:
+        # Повторное предупреждение — только после того, как валидатор заметно восстановился
+        warned.discard(operator_address)
+    return None
+
+
+async def check_jail_risk(bot, network, validator_data, summary):
+    """Прогноз джейла для всех активных валидаторов после обновления кэша."""
+    window_size = summary.get("signed_blocks_window")
+    min_signed = summary.get("min_signed_per_window")
+    if not window_size or min_signed is None:
+        return
+
+    now = time.time()
+    risk = {}
+    warnings = []
+    for operator_address, validator in validator_data.items():
+        if validator.get("missed_blocks") is None or validator.get("index_offset") is None:
+            continue
+        prediction = update_prediction(network.name, operator_address, validator["missed_blocks"],
+                                       validator["index_offset"], window_size, min_signed, now)
+        if prediction["seconds_until_jail"] is not None:
+            risk[operator_address] = prediction
+        warning = evaluate_validator(network.name, operator_address, validator, prediction)
+        if warning:
+            warnings.append((operator_address, warning))
+
+    get_validator_cache(network.name)["jail_risk"] = risk
+    if warnings:
+        await send_jail_warnings(bot, network, warnings)
+
+
+async def fetch_signing_info(network, consensus_address):
+    for api_url in (network.api_url, network.reserve_api_url):
+        data = await fetch_json(f"{api_url}/cosmos/slashing/v1beta1/signing_infos/{consensus_address}", ttl=0)
+        if data:
+            return data.get("val_signing_info")
+    return None
+
+
+async def fast_check(bot, network):
+    """Перепроверяет только быстро деградирующих валидаторов по их signing_info."""
+    watch = jail_watch.get(network.name)
+    if not watch:
+        return
+    cache = get_validator_cache(network.name)
+    summary = cache["summary"]
+    watched = [(addr, cache["data"][addr]) for addr in list(watch) if addr in cache["data"]]
+    infos = await asyncio.gather(
+        *(fetch_signing_info(network, validator["consensus_address"]) for _, validator in watched),
+        return_exceptions=True,
+    )
+
+    warnings = []
+    for (operator_address, validator), info in zip(watched, infos):
+        if isinstance(info, Exception) or not info:
+            logger.warning(f"[{network.name}] Failed to re-check signing info of {validator['moniker']}: {info}")
+            continue
+        prediction = update_prediction(
+            network.name, operator_address, int(info.get("missed_blocks_counter", 0)),
+            int(info.get("index_offset", 0)), summary["signed_blocks_window"], summary["min_signed_per_window"],
+        )
+        if prediction["seconds_until_jail"] is not None:
+            cache.setdefault("jail_risk", {})[operator_address] = prediction
+        warning = evaluate_validator(network.name, operator_address, validator, prediction)
+        if warning:
+            warnings.append((operator_address, warning))
+
+    if warnings:
+        await send_jail_warnings(bot, network, warnings)
+
+
+async def run_jail_fast_checker(bot, network):
+    """Фоновая задача: раз в JAIL_FAST_CHECK_INTERVAL секунд перепроверяет валидаторов из списка наблюдения."""
+    while True:
+        try:
+            await fast_check(bot, network)
+        except Exception as e:
+            logger.error(f"[{network.name}] Error in jail fast check: {e}")
+        await asyncio.sleep(JAIL_FAST_CHECK_INTERVAL)
@@ -0,0 +1,109 @@
+# utils/loop_watchdog.py
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dotenv import load_dotenv
+from utils.metrics import observe_latency
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+WATCHDOG_INTERVAL = float(os.getenv("WATCHDOG_INTERVAL", "0.1"))    # секунд между heartbeat
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.25"))  # зависание дольше — снимаем стек
+WATCHDOG_TOP_N = int(os.getenv("WATCHDOG_TOP_N", "10"))
+WATCHDOG_WINDOW = int(os.getenv("WATCHDOG_WINDOW", "3600"))  # за сколько секунд считать топ зависаний
+WATCHDOG_STACK_DEPTH = 15
+
+# Код бота: место зависания — самый глубокий кадр из этого каталога, а не из asyncio или библиотек
+BOT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _location(stack):
+    for frame in reversed(stack):
+        if frame.filename.startswith(BOT_ROOT) and frame.filename != __file__:
+            return f"{os.path.relpath(frame.filename, BOT_ROOT)}:{frame.lineno} {frame.name}"
+    frame = stack[-1]
+    return f"{frame.filename}:{frame.lineno} {frame.name}"
+
+
+class LoopWatchdog:
+    """Detects event loop stalls and samples what the loop thread was doing.
+
+    A coroutine beats every WATCHDOG_INTERVAL; a daemon thread notices when the beats
+    stop and takes the loop thread's stack from sys._current_frames(). Code that holds
+    the GIL the whole time (a large json.loads, for example) is sampled only once it
+    lets go, so the stack may point just past the real culprit.
+    """
+
+    def __init__(self):
+        self.last_beat = time.monotonic()
+        self.lag = 0.0
+        self.loop_thread = None
+        self.stall = None                # текущее зависание: (заблокирован с, место, стек)
+        self.stalls = deque(maxlen=1000)  # [(time, место, длительность, стек)]
+        self.lock = threading.Lock()
+
+    async def heartbeat(self):
+        """Фоновая задача event loop: задержка пробуждения и отметка «loop жив» для потока-наблюдателя."""
+        loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.last_beat = time.monotonic()
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        logger.info(f"Event loop watchdog started (threshold {LOOP_LAG_THRESHOLD * 1000:.0f} ms).")
+        while True:
+            start = loop.time()
+            await asyncio.sleep(WATCHDOG_INTERVAL)
+            self.lag = max(0.0, loop.time() - start - WATCHDOG_INTERVAL)
+            observe_latency("event_loop.lag", self.lag)
+            self.last_beat = time.monotonic()
+
+    def _watch(self):
+        while True:
+            time.sleep(WATCHDOG_INTERVAL)
+            last_beat = self.last_beat
+            blocked = time.monotonic() - last_beat - WATCHDOG_INTERVAL
+            if self.stall is None:
+                if blocked >= LOOP_LAG_THRESHOLD:
+                    self._sample(last_beat, blocked)
+            elif last_beat > self.stall[0]:
+                self._finish(last_beat)
+
+    def _sample(self, blocked_since, blocked):
+        frame = sys._current_frames().get(self.loop_thread)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)[-WATCHDOG_STACK_DEPTH:]
+        del frame
+        location = _location(stack)
+        self.stall = (blocked_since, location, stack)
+        logger.warning(f"Event loop blocked for {blocked * 1000:.0f} ms at {location}:\n"
+                       f"{''.join(traceback.format_list(stack))}")
+
+    def _finish(self, resumed_at):
+        blocked_since, location, stack = self.stall
+        duration = max(0.0, resumed_at - blocked_since - WATCHDOG_INTERVAL)
+        with self.lock:
+            self.stalls.append((time.time(), location, duration, stack))
+        self.stall = None
+        logger.warning(f"Event loop was blocked for {duration * 1000:.0f} ms at {location}")
+
+    def top_slow_spots(self, count=WATCHDOG_TOP_N):
+        """[(место, число зависаний, суммарно секунд, максимум секунд)] за WATCHDOG_WINDOW, худшие первыми."""
+        since = time.time() - WATCHDOG_WINDOW
+        spots = {}
+        with self.lock:
+            stalls = [stall for stall in self.stalls if stall[0] >= since]
+        for _, location, duration, _ in stalls:
+            stall_count, total, longest = spots.get(location, (0, 0.0, 0.0))
+            spots[location] = (stall_count + 1, total + duration, max(longest, duration))
+        ranked = sorted(spots.items(), key=lambda item: item[1][1], reverse=True)[:count]
+        return [(location, stall_count, total, longest) for location, (stall_count, total, longest) in ranked]
+
+
+watchdog = LoopWatchdog()
@@ -0,0 +1,143 @@
+# utils/metrics.py
+
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин в секундах; Discord ждёт подтверждения взаимодействия не дольше 3 с
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate quantiles."""
+
+    def __init__(self, name, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # последняя корзина — всё, что больше
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Верхняя граница корзины, в которую попадает квантиль q (0..1)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return f"{self.name}: no samples"
+        return (
+            f"{self.name}: n={self.count} avg={self.total / self.count * 1000:.0f}ms "
+            f"p50<={self.quantile(0.5) * 1000:.0f}ms p99<={self.quantile(0.99) * 1000:.0f}ms "
+            f"max={self.max * 1000:.0f}ms"
+        )
+
+
+histograms = {}  # {name: LatencyHistogram}
+
+
+def observe_latency(name, seconds):
+    """Записывает замер в гистограмму с указанным именем, создавая её при необходимости."""
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = LatencyHistogram(name)
+    histogram.observe(seconds)
+
+
+def _labels(labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+def _metric(lines, name, help_text, metric_type, samples):
+    """Добавляет метрику в текстовом формате Prometheus. samples: [(suffix, labels, value), ...]."""
+    samples = [(suffix, labels, value) for suffix, labels, value in samples if value is not None]
+    if not samples:
+        return
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for suffix, labels, value in samples:
+        lines.append(f"{name}{suffix}{{{_labels(labels)}}} {float(value):g}")
+
+
+# (метрика, поле результата, описание) для узлов флота
+FLEET_GAUGES = (
+    ("story_fleet_node_height", "height", "Latest block height reported by the node's CometBFT RPC"),
+    ("story_fleet_node_lag_blocks", "lag", "Blocks behind the network head"),
+    ("story_fleet_node_peers", "peers", "Connected CometBFT peers"),
+    ("story_fleet_node_rpc_latency_ms", "latency_ms", "Round trip of the /status and /net_info probe"),
+)
+EL_GAUGES = (
+    ("story_el_block_number", "block_number", "Latest story-geth block (eth_blockNumber)"),
+    ("story_el_peers", "peers", "story-geth peers (net_peerCount)"),
+    ("story_el_txpool_pending", "txpool_pending", "Pending transactions in the story-geth txpool"),
+    ("story_el_txpool_queued", "txpool_queued", "Queued transactions in the story-geth txpool"),
+    ("story_el_cl_offset_blocks", "offset", "story-geth block number minus CometBFT height"),
+    ("story_el_cl_divergence_blocks", "divergence", "Change of the EL/CL offset since the baseline"),
+)
+
+
+def render_prometheus(network_caches, loop_lag=None, slow_spots=()):
+    """Метрики бота и узлов флота в текстовом формате Prometheus (для GET /metrics).
+
+    slow_spots — топ мест, где блокировался event loop: [(место, число, суммарно, максимум)].
+    """
+    lines = []
+    for metric, field, help_text in FLEET_GAUGES:
+        _metric(lines, metric, help_text, "gauge", [
+            ("", {"network": network_name, "node": result["name"]}, result.get(field))
+            for network_name, cache in network_caches.items()
+            for result in cache.get("fleet", [])
+        ])
+    _metric(lines, "story_fleet_node_up", "1 if the node is healthy", "gauge", [
+        ("", {"network": network_name, "node": result["name"]}, int(result.get("status") == "ok"))
+        for network_name, cache in network_caches.items()
+        for result in cache.get("fleet", [])
+    ])
+    for metric, field, help_text in EL_GAUGES:
+        _metric(lines, metric, help_text, "gauge", [
+            ("", {"network": network_name, "node": result["name"]}, result.get(field))
+            for network_name, cache in network_caches.items()
+            for result in cache.get("fleet_el", [])
+        ])
+    _metric(lines, "story_el_syncing", "1 if story-geth reports eth_syncing", "gauge", [
+        ("", {"network": network_name, "node": result["name"]}, int(bool(result.get("syncing"))))
+        for network_name, cache in network_caches.items()
+        for result in cache.get("fleet_el", [])
+    ])
+
+    # Гистограммы задержек обработки взаимодействий
+    samples = []
+    for name, histogram in histograms.items():
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+            cumulative += bucket_count
+            samples.append(("_bucket", {"handler": name, "le": bound}, cumulative))
+        samples.append(("_bucket", {"handler": name, "le": "+Inf"}, histogram.count))
+        samples.append(("_sum", {"handler": name}, histogram.total))
+        samples.append(("_count", {"handler": name}, histogram.count))
+    _metric(lines, "validatorbot_handler_latency_seconds", "Interaction handler latency", "histogram", samples)
+
+    _metric(lines, "validatorbot_event_loop_lag_seconds", "Latest event loop wake-up delay", "gauge",
+            [("", {}, loop_lag)])
+    _metric(lines, "validatorbot_event_loop_blocked_seconds", "Time the event loop was blocked, by location, "
+            "over the watchdog window", "gauge", [("", {"location": location}, total) for location, _, total, _ in slow_spots])
+    _metric(lines, "validatorbot_event_loop_stalls", "Event loop stalls by location over the watchdog window", "gauge",
+            [("", {"location": location}, count) for location, count, _, _ in slow_spots])
+    return "\n".join(lines) + "\n"
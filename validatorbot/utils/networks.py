@@ -0,0 +1,106 @@
+# utils/networks.py
+
+import os
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Список сетей задаётся через NETWORKS=testnet,mainnet. Параметры каждой сети
+# читаются из переменных с префиксом имени сети (TESTNET_COSMOS_API_URL, ...).
+# Для первой сети допускаются старые переменные без префикса (COSMOS_API_URL, ...),
+# поэтому существующий .env продолжает работать без изменений.
+NETWORK_NAMES = [n.strip() for n in os.getenv("NETWORKS", "testnet").split(",") if n.strip()]
+
+DEFAULT_REFRESH_INTERVAL = 240  # 4 минуты
+DEFAULT_SNAPSHOT_BASE_URL = "https://story.snapshot.stake-take.com"
+
+
+class NetworkProfile:
+    """Endpoints, bech32 prefixes, alert channel and refresh schedule of one network."""
+
+    def __init__(self, name, api_url, reserve_api_url, rpc_url, reserve_rpc_url,
+                 valoper_prefix="storyvaloper", valcons_prefix="storyvalcons",
+                 channel_id=None, refresh_interval=DEFAULT_REFRESH_INTERVAL, state_sync_rpcs=None,
+                 snapshot_base_url=DEFAULT_SNAPSHOT_BASE_URL, webhooks=None):
+        self.name = name
+        self.api_url = api_url
+        self.reserve_api_url = reserve_api_url
+        self.rpc_url = rpc_url
+        self.reserve_rpc_url = reserve_rpc_url
+        self.valoper_prefix = valoper_prefix
+        self.valcons_prefix = valcons_prefix
+        self.channel_id = channel_id
+        self.refresh_interval = refresh_interval
+        # RPC, которые отдаются в rpc_servers и используются для сверки trust_hash
+        self.state_sync_rpcs = state_sync_rpcs or [url for url in (rpc_url, reserve_rpc_url) if url]
+        self.snapshot_base_url = snapshot_base_url
+        # Дополнительные получатели алертов: {name: (kind, url)}, kind — "discord" или "json"
+        self.webhooks = webhooks or {}
+
+    def __repr__(self):
+        return f"<NetworkProfile {self.name} api={self.api_url} rpc={self.rpc_url}>"
+
+
+def _env(network_name, key, default=None, fallback=False):
+    """Читает NETWORK_KEY, а для сети по умолчанию ещё и KEY без префикса."""
+    value = os.getenv(f"{network_name.upper()}_{key}")
+    if value is None and fallback:
+        value = os.getenv(key)
+    return value if value is not None else default
+
+
+def parse_webhooks(value):
+    """Разбирает "ops=discord:https://discord.com/api/webhooks/...,partner=json:https://..."."""
+    webhooks = {}
+    for entry in (e.strip() for e in value.split(",")):
+        if not entry:
+            continue
+        name, _, target = entry.partition("=")
+        kind, _, url = target.partition(":")
+        if kind not in ("discord", "json") or not url:
+            logger.error(f"Invalid alert webhook entry: {entry}")
+            continue
+        webhooks[name.strip()] = (kind, url.strip())
+    return webhooks
+
+
+def load_networks():
+    """Собирает профили сетей из переменных окружения."""
+    profiles = {}
+    for index, name in enumerate(NETWORK_NAMES):
+        fallback = index == 0
+        channel_id = _env(name, "CHANNEL_ID", fallback=fallback)
+        state_sync_rpcs = _env(name, "STATE_SYNC_RPCS", "", fallback=fallback)
+        profile = NetworkProfile(
+            name=name,
+            api_url=_env(name, "COSMOS_API_URL", fallback=fallback),
+            reserve_api_url=_env(name, "COSMOS_RESERVE_API_URL", fallback=fallback),
+            rpc_url=_env(name, "COSMOS_RPC_URL", fallback=fallback),
+            reserve_rpc_url=_env(name, "COSMOS_RESERVE_RPC_URL", fallback=fallback),
+            valoper_prefix=_env(name, "VALOPER_PREFIX", "storyvaloper", fallback=fallback),
+            valcons_prefix=_env(name, "VALCONS_PREFIX", "storyvalcons", fallback=fallback),
+            channel_id=int(channel_id) if channel_id else None,
+            refresh_interval=int(_env(name, "REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL, fallback=fallback)),
+            state_sync_rpcs=[url.strip() for url in state_sync_rpcs.split(",") if url.strip()],
+            snapshot_base_url=_env(name, "SNAPSHOT_BASE_URL", DEFAULT_SNAPSHOT_BASE_URL, fallback=fallback),
+            webhooks=parse_webhooks(_env(name, "ALERT_WEBHOOKS", "", fallback=fallback)),
+        )
+        missing = [attr for attr in ("api_url", "reserve_api_url", "rpc_url", "reserve_rpc_url")
+                   if not getattr(profile, attr)]
+        if missing:
+            logger.error(f"Network {name} is missing endpoints: {', '.join(missing)}")
+        profiles[name] = profile
+        logger.info(f"Loaded network profile {profile}")
+    return profiles
+
+
+networks = load_networks()
+
+
+def get_network(name=None):
+    """Возвращает профиль сети по имени; без имени — сеть по умолчанию (первая в NETWORKS)."""
+    if name is None:
+        return networks[NETWORK_NAMES[0]]
+    return networks[name]
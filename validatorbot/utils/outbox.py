@@ -0,0 +1,256 @@
+# utils/outbox.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+import discord
+from discord import Embed
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Алерты сначала записываются в SQLite и только потом отправляются фоновым обработчиком,
+# поэтому сбой Discord не теряет алерт и не задерживает следующий опрос API
+OUTBOX_DB_PATH = os.getenv("OUTBOX_DB_PATH", os.getenv("SNAPSHOT_DB_PATH", "validatorbot_state.db"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_BASE_BACKOFF = float(os.getenv("OUTBOX_BASE_BACKOFF", "2"))  # секунд, удваивается с каждой попыткой
+OUTBOX_MAX_BACKOFF = float(os.getenv("OUTBOX_MAX_BACKOFF", "600"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "12"))
+OUTBOX_RETENTION = int(os.getenv("OUTBOX_RETENTION", str(7 * 24 * 3600)))  # сколько хранить отправленные
+
+
+class PermanentDeliveryError(Exception):
+    """Delivery can never succeed (deleted channel, missing permissions...), do not retry."""
+
+
+class Outbox:
+    """Persistent alert queue. Each row is one message for one target, e.g. "channel:123"."""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL UNIQUE, "
+                "target TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', "
+                "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, created_at REAL NOT NULL, "
+                "sent_at REAL, last_error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+            # Некритичные алерты, ждущие сводки: переживают перезапуск и смену лидера
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending_digest ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, network TEXT NOT NULL, alert TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def enqueue(self, rows):
+        """rows: [(idempotency_key, target, payload)]. Повторный ключ игнорируется. Возвращает число новых строк."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, target, payload, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, target, json.dumps(payload), now, now) for key, target, payload in rows],
+            )
+        return cursor.rowcount
+
+    def due(self, limit, exclude=()):
+        """Строки, которые пора отправить, кроме целей из exclude (их доставка ещё идёт)."""
+        placeholders = ", ".join("?" * len(exclude))
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, idempotency_key, target, payload, attempts FROM outbox "
+                f"WHERE status = 'pending' AND next_attempt_at <= ? AND target NOT IN ({placeholders}) "
+                "ORDER BY id LIMIT ?",
+                (time.time(), *exclude, limit),
+            ).fetchall()
+
+    def mark_sent(self, row_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+                         (time.time(), row_id))
+
+    def mark_failed(self, row_id, attempts, error, permanent=False):
+        """Планирует повтор с экспоненциальной задержкой или окончательно помечает строку неудачной."""
+        if permanent or attempts >= OUTBOX_MAX_ATTEMPTS:
+            with self._connect() as conn:
+                conn.execute("UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                             (attempts, error, row_id))
+            return None
+        delay = min(OUTBOX_MAX_BACKOFF, OUTBOX_BASE_BACKOFF * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+        with self._connect() as conn:
+            conn.execute("UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                         (attempts, time.time() + delay, error, row_id))
+        return delay
+
+    def prune(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM outbox WHERE status != 'pending' AND created_at < ?",
+                         (time.time() - OUTBOX_RETENTION,))
+
+    def next_due(self):
+        """Время ближайшей запланированной попытки или None, если очередь пуста."""
+        with self._connect() as conn:
+            return conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def add_to_digest(self, network, alert):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO pending_digest (network, alert, created_at) VALUES (?, ?, ?)",
+                         (network, alert, time.time()))
+
+    def pending_digest(self, network):
+        """[(id, alert)] алертов сети, ещё не попавших в отправленную сводку, от старых к новым."""
+        with self._connect() as conn:
+            return conn.execute("SELECT id, alert FROM pending_digest WHERE network = ? ORDER BY id",
+                                (network,)).fetchall()
+
+    def clear_digest(self, network, last_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM pending_digest WHERE network = ? AND id <= ?", (network, last_id))
+
+    def pending_count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+
+outbox = Outbox(OUTBOX_DB_PATH)
+_wakeup = asyncio.Event()
+
+# Отправители по префиксу цели: {"channel": coroutine(bot, address, payload, key)}
+senders = {}
+
+
+def register_sender(kind, sender):
+    senders[kind] = sender
+
+
+def make_key(*parts):
+    """Ключ идемпотентности: одинаковые части — один и тот же алерт."""
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def alert_payload(embed, mention_users=True):
+    return {"embed": embed.to_dict(), "mention_users": mention_users}
+
+
+def alert_targets(network):
+    """Куда доставлять общий поток алертов сети: канал бота и вебхуки сети."""
+    targets = [f"channel:{network.channel_id}"] if network.channel_id is not None else []
+    targets.extend(f"webhook:{name}" for name in network.webhooks)
+    return targets
+
+
+async def enqueue_alert(targets, embed, key, mention_users=True):
+    """Записывает алерт в outbox для каждой цели и будит обработчик."""
+    payload = alert_payload(embed, mention_users)
+    rows = [(make_key(key, target), target, payload) for target in targets]
+    added = await asyncio.to_thread(outbox.enqueue, rows)
+    if added:
+        _wakeup.set()
+    return added
+
+
+async def send_to_channel(bot, address, payload, key):
+    try:
+        channel = bot.get_channel(int(address)) or await bot.fetch_channel(int(address))
+        # nonce с enforce_nonce: Discord не создаст второе сообщение, если первое уже дошло,
+        # а мы не успели отметить строку отправленной
+        await channel.send(
+            embed=Embed.from_dict(payload["embed"]),
+            nonce=key[:25],
+            allowed_mentions=discord.AllowedMentions(users=payload.get("mention_users", True)),
+        )
+    except (discord.NotFound, discord.Forbidden) as e:
+        raise PermanentDeliveryError(str(e)) from e
+
+
+register_sender("channel", send_to_channel)
+
+
+async def deliver(bot, row):
+    row_id, key, target, payload, attempts = row
+    kind, _, address = target.partition(":")
+    sender = senders.get(kind)
+    try:
+        if sender is None:
+            raise PermanentDeliveryError(f"No sender for target {target}")
+        await sender(bot, address, json.loads(payload), key)
+    except PermanentDeliveryError as e:
+        await asyncio.to_thread(outbox.mark_failed, row_id, attempts + 1, str(e), True)
+        logger.error(f"Alert {row_id} to {target} cannot be delivered: {e}")
+    except Exception as e:
+        delay = await asyncio.to_thread(outbox.mark_failed, row_id, attempts + 1, str(e) or type(e).__name__)
+        if delay is None:
+            logger.error(f"Alert {row_id} to {target} failed after {attempts + 1} attempts: {e}")
+        else:
+            logger.warning(f"Alert {row_id} to {target} failed ({e}), retrying in {delay:.0f}s")
+    else:
+        await asyncio.to_thread(outbox.mark_sent, row_id)
+
+
+async def deliver_target(bot, rows):
+    # Сообщения одной цели уходят по порядку, разные цели — параллельно
+    for row in rows:
+        await deliver(bot, row)
+
+
+async def run_outbox_worker(bot):
+    """Фоновая задача: доставляет алерты из outbox, в том числе оставшиеся с прошлого запуска.
+
+    Каждая цель доставляется своей задачей: цель, которая упёрлась в rate limit или
+    медленно отвечает, не задерживает следующую порцию для остальных.
+    """
+    pending = await asyncio.to_thread(outbox.pending_count)
+    if pending:
+        logger.info(f"Outbox has {pending} pending alert(s) from a previous run.")
+    active = {}  # {target: Task}
+    last_prune = 0
+
+    def finished(target):
+        active.pop(target, None)
+        _wakeup.set()
+
+    try:
+        while True:
+            _wakeup.clear()
+            try:
+                rows = await asyncio.to_thread(outbox.due, OUTBOX_BATCH_SIZE, tuple(active))
+                by_target = {}
+                for row in rows:
+                    by_target.setdefault(row[2], []).append(row)
+                for target, target_rows in by_target.items():
+                    task = asyncio.create_task(deliver_target(bot, target_rows))
+                    active[target] = task
+                    task.add_done_callback(lambda _, target=target: finished(target))
+                if time.time() - last_prune > 3600:
+                    await asyncio.to_thread(outbox.prune)
+                    last_prune = time.time()
+                if len(rows) == OUTBOX_BATCH_SIZE:
+                    continue  # очередь не опустела — сразу следующая порция
+                next_due = await asyncio.to_thread(outbox.next_due)
+            except Exception as e:
+                logger.error(f"Error delivering alerts from outbox: {e}")
+                next_due = None
+            # Спим до ближайшего повтора, нового алерта, завершения доставки или OUTBOX_POLL_INTERVAL
+            timeout = OUTBOX_POLL_INTERVAL if next_due is None else min(OUTBOX_POLL_INTERVAL, max(0.05, next_due - time.time()))
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        # Процесс потерял аренду лидера (или останавливается): доставки, начатые этим
+        # обработчиком, тоже прекращаются, иначе бывший лидер продолжит слать алерты
+        for task in list(active.values()):
+            task.cancel()
@@ -0,0 +1,105 @@
+# utils/peer_prober.py
+
+import asyncio
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from utils.cache import get_validator_cache
+from utils.http import fetch_json
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+PEER_PROBE_INTERVAL = int(os.getenv("PEER_PROBE_INTERVAL", "300"))  # 5 минут
+PEER_PROBE_CONCURRENCY = int(os.getenv("PEER_PROBE_CONCURRENCY", "50"))  # одновременных TCP-подключений
+PEER_PROBE_TIMEOUT = float(os.getenv("PEER_PROBE_TIMEOUT", "3"))
+DEFAULT_P2P_PORT = 26656
+
+
+def parse_listen_port(listen_addr):
+    """Порт из listen_addr вида tcp://0.0.0.0:26656; если не удалось — порт по умолчанию."""
+    try:
+        return int(listen_addr.rsplit(":", 1)[1])
+    except (AttributeError, IndexError, ValueError):
+        return DEFAULT_P2P_PORT
+
+
+async def collect_peers(network):
+    """Собирает пиров из net_info всех RPC сети без дубликатов: {node_id: (ip, port)}."""
+    candidates = {}
+    seen_addresses = set()
+    for rpc_url in (network.rpc_url, network.reserve_rpc_url):
+        if not rpc_url:
+            continue
+        try:
+            data = await fetch_json(f"{rpc_url}/net_info", ttl=0) or {}
+        except Exception as e:
+            logger.error(f"[{network.name}] Error fetching net_info from {rpc_url}: {e}")
+            continue
+        for peer in data.get('result', {}).get('peers', []):
+            node_info = peer.get('node_info', {})
+            node_id = node_info.get('id', '')
+            remote_ip = peer.get('remote_ip', '')
+            if not node_id or not remote_ip or node_id in candidates:
+                continue
+            port = parse_listen_port(node_info.get('listen_addr'))
+            if (remote_ip, port) in seen_addresses:
+                continue
+            seen_addresses.add((remote_ip, port))
+            candidates[node_id] = (remote_ip, port)
+    return candidates
+
+
+async def probe_peer(host, port, semaphore):
+    """TCP-подключение к пиру. Возвращает время подключения в секундах или None."""
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), PEER_PROBE_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        latency = time.perf_counter() - start
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return latency
+
+
+async def refresh_peer_table(network):
+    """Проверяет всех известных пиров и сохраняет в кэш сети живых, отсортированных по задержке."""
+    candidates = await collect_peers(network)
+    if not candidates:
+        logger.warning(f"[{network.name}] No peers found in net_info, keeping the previous peer table.")
+        return
+
+    semaphore = asyncio.Semaphore(PEER_PROBE_CONCURRENCY)
+    node_ids = list(candidates)
+    latencies = await asyncio.gather(*(probe_peer(*candidates[node_id], semaphore) for node_id in node_ids))
+
+    peers = [
+        {
+            "peer": f"{node_id}@{candidates[node_id][0]}:{candidates[node_id][1]}",
+            "latency_ms": round(latency * 1000, 1),
+        }
+        for node_id, latency in zip(node_ids, latencies)
+        if latency is not None
+    ]
+    peers.sort(key=lambda p: p["latency_ms"])
+
+    cache = get_validator_cache(network.name)
+    cache["peers"] = peers
+    cache["peers_updated"] = time.time()
+    logger.info(f"[{network.name}] Peer table updated: {len(peers)} of {len(candidates)} peers reachable.")
+
+
+async def run_peer_prober(network):
+    """Фоновая задача: периодически обновляет таблицу пиров сети."""
+    while True:
+        try:
+            await refresh_peer_table(network)
+        except Exception as e:
+            logger.error(f"[{network.name}] Error probing peers: {e}")
+        await asyncio.sleep(PEER_PROBE_INTERVAL)
@@ -0,0 +1,78 @@
+# utils/ratelimit.py
+
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Лимиты для кнопок, которые ходят в сеть: скорость пополнения (токенов в секунду) и размер всплеска
+USER_RATE = float(os.getenv("INTERACTION_USER_RATE", "0.5"))
+USER_BURST = int(os.getenv("INTERACTION_USER_BURST", "3"))
+GLOBAL_RATE = float(os.getenv("INTERACTION_GLOBAL_RATE", "5"))
+GLOBAL_BURST = int(os.getenv("INTERACTION_GLOBAL_BURST", "20"))
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` stored."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def retry_after(self):
+        """Через сколько секунд появится следующий токен."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+class InteractionRateLimiter:
+    """Per-user and global token buckets for network-backed interactions."""
+
+    def __init__(self, user_rate=USER_RATE, user_burst=USER_BURST,
+                 global_rate=GLOBAL_RATE, global_burst=GLOBAL_BURST):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.user_buckets = {}  # {user_id: TokenBucket}
+
+    def check(self, user_id):
+        """Возвращает (allowed, retry_after). Сначала лимит пользователя, затем общий."""
+        bucket = self.user_buckets.get(user_id)
+        if bucket is None:
+            if len(self.user_buckets) > 10000:
+                self._cleanup()
+            bucket = self.user_buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        if not bucket.try_acquire():
+            return False, bucket.retry_after()
+        if not self.global_bucket.try_acquire():
+            return False, self.global_bucket.retry_after()
+        return True, 0.0
+
+    def _cleanup(self):
+        # Полные корзины ничем не отличаются от новых — их можно удалить
+        for user_id in [uid for uid, b in self.user_buckets.items() if b.is_full()]:
+            del self.user_buckets[user_id]
+
+
+interaction_limiter = InteractionRateLimiter()
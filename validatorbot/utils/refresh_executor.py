@@ -0,0 +1,42 @@
+# utils/refresh_executor.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Где выполняется тяжёлая по CPU часть обновления (разбор JSON, адреса, сборка снимка):
+#   thread  — пул потоков (по умолчанию): без копирования, но разбор JSON всё равно держит GIL;
+#   process — отдельные процессы: event loop с heartbeat Discord не ждёт GIL, но данные
+#             передаются через pickle, а spawn заново выполняет в каждом процессе верхний
+#             уровень bot.py (создание Bot, GUILD_ID, открытие SQLite-хранилища и outbox);
+#   inline  — прямо в event loop, как раньше (для отладки и сравнения).
+REFRESH_EXECUTOR = os.getenv("REFRESH_EXECUTOR", "thread")
+REFRESH_WORKERS = int(os.getenv("REFRESH_WORKERS", "2"))
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        if REFRESH_EXECUTOR == "process":
+            # spawn, а не fork: форк процесса с event loop и потоками aiohttp небезопасен
+            _executor = ProcessPoolExecutor(REFRESH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            _executor = ThreadPoolExecutor(REFRESH_WORKERS, thread_name_prefix="refresh")
+        logger.info(f"Refresh work runs in a {REFRESH_EXECUTOR} pool with {REFRESH_WORKERS} worker(s).")
+    return _executor
+
+
+async def run_cpu(func, *args):
+    """Выполняет func(*args) вне event loop; func и аргументы должны быть picklable для режима process."""
+    if REFRESH_EXECUTOR == "inline":
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), func, *args)
+
@@ -0,0 +1,146 @@
+# utils/search_index.py
+
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from utils.cache import get_validator_cache
+from utils.refresh_executor import run_cpu
+
+logger = logging.getLogger(__name__)
+
+# Сколько вариантов показывает автодополнение Discord
+MAX_RESULTS = 25
+# Доля общих триграмм, при которой моникер считается похожим на запрос
+FUZZY_MIN_SCORE = 0.4
+
+
+def _normalize(text):
+    return "".join(re.findall(r"\w+", text.casefold()))
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Moniker and operator address lookup over one network's validators.
+
+    Built once per refresh; a query is a couple of bisects over sorted keys, with a
+    trigram fallback for typos and substrings, so autocomplete never scans the whole set.
+    """
+
+    def __init__(self, validator_data=None):
+        self.entries = []     # [(operator_address, moniker)]
+        self.keys = []        # нормализованные моникеры и отдельные слова моникеров, по возрастанию
+        self.key_owners = []  # индекс в entries для каждого ключа
+        self.addresses = []   # [(адрес или его часть после "1", индекс в entries)], по возрастанию
+        self.trigrams = {}    # {trigram: [индекс в entries]}
+        if validator_data:
+            self.build(validator_data)
+
+    def build(self, validator_data):
+        self.entries = sorted(((address, validator.get("moniker") or address)
+                               for address, validator in validator_data.items()),
+                              key=lambda entry: entry[1].casefold())
+        keys = []
+        addresses = []
+        trigrams = {}
+        for index, (address, moniker) in enumerate(self.entries):
+            normalized = _normalize(moniker)
+            words = re.findall(r"\w+", moniker.casefold())
+            for key in dict.fromkeys([normalized, *words]):
+                if key:
+                    keys.append((key, index))
+            address = address.lower()
+            addresses.append((address, index))
+            addresses.append((address.partition("1")[2], index))
+            for trigram in _trigrams(normalized):
+                trigrams.setdefault(trigram, []).append(index)
+        keys.sort()
+        addresses.sort()
+        self.keys = [key for key, _ in keys]
+        self.key_owners = [index for _, index in keys]
+        self.addresses = addresses
+        self.trigrams = trigrams
+
+    def _prefix(self, prefix, found, limit):
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and len(found) < limit and self.keys[position].startswith(prefix):
+            found.setdefault(self.key_owners[position], None)
+            position += 1
+
+    def _address_prefix(self, prefix, found, limit):
+        position = bisect_left(self.addresses, (prefix,))
+        while position < len(self.addresses) and len(found) < limit:
+            key, index = self.addresses[position]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(index, None)
+            position += 1
+
+    def _fuzzy(self, query, found, limit):
+        grams = _trigrams(query)
+        if not grams:
+            return
+        counts = Counter()
+        for gram in grams:
+            counts.update(self.trigrams.get(gram, ()))
+        for index, shared in counts.most_common():
+            if shared / len(grams) < FUZZY_MIN_SCORE or len(found) >= limit:
+                break
+            found.setdefault(index, None)
+
+    def search(self, query, limit=MAX_RESULTS):
+        """[(operator_address, moniker)]: сначала совпадения с начала моникера или слова, затем адреса, затем похожие."""
+        if not query or not query.strip():
+            return self.entries[:limit]
+        normalized = _normalize(query)
+        found = {}  # dict вместо set: сохраняет порядок по качеству совпадения
+        if normalized:
+            # Полный моникер целиком совпадает с запросом — первым
+            position = bisect_left(self.keys, normalized)
+            if position < len(self.keys) and self.keys[position] == normalized:
+                found[self.key_owners[position]] = None
+            self._prefix(normalized, found, limit)
+        self._address_prefix(query.strip().lower(), found, limit)
+        if len(found) < limit and len(normalized) >= 3:
+            self._fuzzy(normalized, found, limit)
+        return [self.entries[index] for index in found]
+
+    def resolve(self, query):
+        """Адрес валидатора по точному адресу или моникеру; None, если однозначного совпадения нет."""
+        query = query.strip()
+        position = bisect_left(self.addresses, (query.lower(),))
+        while position < len(self.addresses) and self.addresses[position][0] == query.lower():
+            address = self.entries[self.addresses[position][1]][0]
+            if address.lower() == query.lower():  # полный адрес, а не его часть после "1"
+                return address
+            position += 1
+        normalized = _normalize(query)
+        if not normalized:
+            return None
+        # Ключи — это и моникеры целиком, и их отдельные слова: оставляем только совпадения моникера
+        matches = {self.key_owners[index]
+                   for index in range(bisect_left(self.keys, normalized), bisect_right(self.keys, normalized))
+                   if _normalize(self.entries[self.key_owners[index]][1]) == normalized}
+        if len(matches) != 1:
+            return None  # несколько валидаторов с одинаковым моникером — выбирать наугад нельзя
+        return self.entries[matches.pop()][0]
+
+
+search_indexes = {}  # {network_name: SearchIndex}
+
+
+async def rebuild_search_index(network_name):
+    """Пересобирает индекс сети в пуле refresh_executor и подменяет его одним присваиванием."""
+    search_indexes[network_name] = await run_cpu(SearchIndex, get_validator_cache(network_name)["data"])
+    logger.debug(f"[{network_name}] Search index rebuilt with {len(search_indexes[network_name].entries)} validators.")
+
+
+def get_search_index(network_name):
+    index = search_indexes.get(network_name)
+    if index is None:
+        # До первого обновления кэш пуст, строить нечего
+        index = search_indexes[network_name] = SearchIndex(get_validator_cache(network_name)["data"])
+    return index
@@ -0,0 +1,115 @@
+# utils/snapshot_catalog.py
+
+import asyncio
+import email.utils
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from utils.cache import get_validator_cache
+from utils.http import get_session
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILES = ("snapshot_geth.tar.lz4", "snapshot_consensus.tar.lz4")
+# Необязательный файл метаданных рядом со снимками:
+# {"snapshot_geth.tar.lz4": {"height": 123000, "sha256": "..."}, ...}
+SNAPSHOT_META_FILE = "snapshot_meta.json"
+SNAPSHOT_CATALOG_INTERVAL = int(os.getenv("SNAPSHOT_CATALOG_INTERVAL", "900"))  # 15 минут
+
+
+async def head_snapshot(session, url):
+    """HEAD-запрос: размер и время изменения файла без загрузки самого файла."""
+    async with session.head(url, allow_redirects=True) as response:
+        if response.status != 200:
+            logger.warning(f"HEAD {url} returned {response.status}")
+            return None
+        last_modified = response.headers.get("Last-Modified")
+        return {
+            "size": int(response.headers.get("Content-Length", 0)) or None,
+            "last_modified": email.utils.parsedate_to_datetime(last_modified).timestamp() if last_modified else None,
+        }
+
+
+async def fetch_sidecar(session, base_url):
+    """Метаданные снимков из snapshot_meta.json; пустой словарь, если файла нет."""
+    try:
+        async with session.get(f"{base_url}/{SNAPSHOT_META_FILE}") as response:
+            if response.status != 200:
+                return {}
+            return await response.json(content_type=None)
+    except Exception as e:
+        logger.debug(f"No snapshot metadata sidecar at {base_url}: {e}")
+        return {}
+
+
+async def refresh_snapshot_catalog(network):
+    """Собирает размер, время изменения, высоту и контрольную сумму каждого снимка сети."""
+    session = get_session()
+    base_url = network.snapshot_base_url
+    sidecar, *heads = await asyncio.gather(
+        fetch_sidecar(session, base_url),
+        *(head_snapshot(session, f"{base_url}/{name}") for name in SNAPSHOT_FILES),
+        return_exceptions=True,
+    )
+    if isinstance(sidecar, Exception):
+        sidecar = {}
+
+    catalog = []
+    for name, head in zip(SNAPSHOT_FILES, heads):
+        if isinstance(head, Exception) or head is None:
+            logger.warning(f"[{network.name}] Snapshot {name} is not available: {head}")
+            continue
+        meta = sidecar.get(name, {})
+        catalog.append({
+            "name": name,
+            "url": f"{base_url}/{name}",
+            "size": head["size"],
+            "last_modified": head["last_modified"],
+            "height": meta.get("height"),
+            "sha256": meta.get("sha256"),
+        })
+
+    cache = get_validator_cache(network.name)
+    cache["snapshots"] = catalog
+    cache["snapshots_updated"] = time.time()
+    logger.info(f"[{network.name}] Snapshot catalog updated: {len(catalog)} snapshot(s).")
+
+
+async def run_snapshot_catalog_refresher(network):
+    """Фоновая задача: обновляет каталог снимков сети."""
+    while True:
+        try:
+            await refresh_snapshot_catalog(network)
+        except Exception as e:
+            logger.error(f"[{network.name}] Error refreshing snapshot catalog: {e}")
+        await asyncio.sleep(SNAPSHOT_CATALOG_INTERVAL)
+
+
+def format_size(size):
+    if not size:
+        return "N/A"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_age(timestamp):
+    if not timestamp:
+        return "N/A"
+    hours = (time.time() - timestamp) / 3600
+    if hours < 1:
+        return f"{int(hours * 60)} min ago"
+    if hours < 48:
+        return f"{hours:.1f} h ago"
+    return f"{hours / 24:.1f} days ago"
+
+
+def estimate_download_time(size, mbit_per_second):
+    if not size:
+        return "N/A"
+    minutes = size * 8 / (mbit_per_second * 1_000_000) / 60
+    return f"~{minutes:.0f} min" if minutes >= 1 else "<1 min"
@@ -0,0 +1,284 @@
+# utils/snapshot_store.py
+
+import asyncio
+import datetime
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from dotenv import load_dotenv
+from utils.cache import get_validator_cache, selected_validators
+from utils.networks import get_network
+from utils.search_index import rebuild_search_index
+from utils.voting_power import update_voting_power
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Режим работы процесса:
+#   standalone — опрос, алерты и Discord-интерфейс в одном процессе (как раньше);
+#   poller     — лидер опрашивает API, шлёт алерты и публикует снимки в общее хранилище;
+#   frontend   — отвечает на нажатия кнопок, читая снимки из хранилища.
+BOT_MODE = os.getenv("BOT_MODE", "standalone")
+SNAPSHOT_DB_PATH = os.getenv("SNAPSHOT_DB_PATH", "validatorbot_state.db")
+SNAPSHOT_HISTORY = int(os.getenv("SNAPSHOT_HISTORY", "10"))  # сколько версий хранить на сеть
+SNAPSHOT_POLL_INTERVAL = float(os.getenv("SNAPSHOT_POLL_INTERVAL", "2"))
+LEADER_LEASE_TTL = int(os.getenv("LEADER_LEASE_TTL", "30"))
+
+
+class SnapshotStore:
+    """Versioned per-network snapshots, leader lease and user selections in one SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "network TEXT NOT NULL, version INTEGER NOT NULL, published_at REAL NOT NULL, "
+                "payload TEXT NOT NULL, PRIMARY KEY (network, version))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS selected_validators ("
+                "user_id INTEGER PRIMARY KEY, validator_address TEXT NOT NULL, network TEXT)"
+            )
+            # Файлы, созданные до появления сети у выбора: NULL означает сеть по умолчанию
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(selected_validators)")}
+            if "network" not in columns:
+                conn.execute("ALTER TABLE selected_validators ADD COLUMN network TEXT")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS alert_rules ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, network TEXT NOT NULL, "
+                "validator TEXT NOT NULL, kind TEXT NOT NULL, threshold REAL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS dm_subscribers (user_id INTEGER PRIMARY KEY)")
+
+    def _connect(self):
+        # Отдельное соединение на каждую операцию: методы вызываются из пула потоков
+        return sqlite3.connect(self.path, timeout=10)
+
+    def publish(self, network, payload):
+        """Записывает новую версию снимка сети и удаляет старые версии."""
+        data = json.dumps(payload, default=str)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT MAX(version) FROM snapshots WHERE network = ?", (network,)).fetchone()
+            version = (row[0] or 0) + 1
+            conn.execute(
+                "INSERT INTO snapshots (network, version, published_at, payload) VALUES (?, ?, ?, ?)",
+                (network, version, time.time(), data),
+            )
+            conn.execute(
+                "DELETE FROM snapshots WHERE network = ? AND version <= ?",
+                (network, version - SNAPSHOT_HISTORY),
+            )
+        return version
+
+    def latest_version(self, network):
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(version) FROM snapshots WHERE network = ?", (network,)).fetchone()
+        return row[0] or 0
+
+    def load_latest(self, network):
+        """Возвращает (version, published_at, payload) последнего снимка или None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT version, published_at, payload FROM snapshots WHERE network = ? "
+                "ORDER BY version DESC LIMIT 1",
+                (network,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def iter_snapshots(self, network):
+        """Генератор (version, published_at, payload) всех хранимых версий, от старых к новым.
+
+        Снимки читаются и разбираются по одному, чтобы не держать всю историю в памяти.
+        """
+        conn = self._connect()
+        try:
+            for version, published_at, payload in conn.execute(
+                "SELECT version, published_at, payload FROM snapshots WHERE network = ? ORDER BY version",
+                (network,),
+            ):
+                yield version, published_at, json.loads(payload)
+        finally:
+            conn.close()
+
+    def try_acquire_lease(self, name, holder, ttl):
+        """Захватывает или продлевает аренду; True, если holder теперь лидер."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row is not None and row[0] != holder and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at",
+                (name, holder, now + ttl),
+            )
+        return True
+
+    def save_selection(self, user_id, network, validator_address):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO selected_validators (user_id, validator_address, network) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET validator_address = excluded.validator_address, "
+                "network = excluded.network",
+                (user_id, validator_address, network),
+            )
+
+    def load_selections(self):
+        """{user_id: (network, validator_address)}"""
+        default_network = get_network().name
+        with self._connect() as conn:
+            rows = conn.execute("SELECT user_id, network, validator_address FROM selected_validators").fetchall()
+        return {user_id: (network or default_network, address) for user_id, network, address in rows}
+
+    def save_alert_rule(self, user_id, network, validator, kind, threshold):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO alert_rules (user_id, network, validator, kind, threshold) VALUES (?, ?, ?, ?, ?)",
+                (user_id, network, validator, kind, threshold),
+            )
+        return cursor.lastrowid
+
+    def delete_alert_rule(self, rule_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM alert_rules WHERE id = ?", (rule_id,))
+
+    def load_alert_rules(self):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, user_id, network, validator, kind, threshold FROM alert_rules ORDER BY id"
+            ).fetchall()
+
+    def set_dm_subscription(self, user_id, enabled):
+        with self._connect() as conn:
+            if enabled:
+                conn.execute("INSERT OR IGNORE INTO dm_subscribers (user_id) VALUES (?)", (user_id,))
+            else:
+                conn.execute("DELETE FROM dm_subscribers WHERE user_id = ?", (user_id,))
+
+    def load_dm_subscribers(self):
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute("SELECT user_id FROM dm_subscribers")}
+
+
+store = SnapshotStore(SNAPSHOT_DB_PATH) if BOT_MODE != "standalone" else None
+# Настройки пользователей (правила алертов, подписки на личные сообщения) не должны теряться при перезапуске,
+# поэтому в standalone они тоже хранятся в SQLite — в том же файле, что и outbox
+user_store = store if store is not None else SnapshotStore(SNAPSHOT_DB_PATH)
+
+
+async def publish_snapshot(network_name):
+    """Публикует текущий кэш сети в общее хранилище (только в режиме poller)."""
+    if store is None:
+        return
+    cache = get_validator_cache(network_name)
+    payload = {key: value for key, value in cache.items() if key != "last_updated"}
+    version = await asyncio.to_thread(store.publish, network_name, payload)
+    logger.info(f"[{network_name}] Published snapshot version {version}.")
+
+
+async def load_snapshot(network_name):
+    """Загружает последний снимок сети в локальный кэш. Возвращает его версию."""
+    snapshot = await asyncio.to_thread(store.load_latest, network_name)
+    if snapshot is None:
+        return 0
+    version, published_at, payload = snapshot
+    cache = get_validator_cache(network_name)
+    cache.update(payload)
+    cache["last_updated"] = datetime.datetime.fromtimestamp(published_at, tz=datetime.timezone.utc)
+    await rebuild_search_index(network_name)
+    update_voting_power(network_name)
+    return version
+
+
+async def follow_snapshots(network_name):
+    """Фоновая задача frontend-процесса: подхватывает новые версии снимков и выборы валидаторов.
+
+    Выборы делаются и в других frontend-процессах, а после перезапуска память пуста,
+    поэтому они перечитываются из хранилища на каждом шаге, а не только у poller.
+    """
+    current_version = 0
+    while True:
+        try:
+            await sync_selections()
+            latest = await asyncio.to_thread(store.latest_version, network_name)
+            if latest > current_version:
+                current_version = await load_snapshot(network_name)
+                logger.info(f"[{network_name}] Loaded snapshot version {current_version}.")
+        except Exception as e:
+            logger.error(f"[{network_name}] Error loading snapshot: {e}")
+        await asyncio.sleep(SNAPSHOT_POLL_INTERVAL)
+
+
+async def sync_selections():
+    """Подтягивает выборы валидаторов, сделанные пользователями в любом из frontend-процессов."""
+    if store is None:
+        return
+    selections = await asyncio.to_thread(store.load_selections)
+    selected_validators.clear()
+    selected_validators.update(selections)
+
+
+async def save_selection(user_id, network, validator_address):
+    if store is not None:
+        await asyncio.to_thread(store.save_selection, user_id, network, validator_address)
+
+
+async def save_alert_rule(user_id, network, validator, kind, threshold):
+    """Сохраняет правило алерта и возвращает его id."""
+    return await asyncio.to_thread(user_store.save_alert_rule, user_id, network, validator, kind, threshold)
+
+
+async def delete_alert_rule(rule_id):
+    await asyncio.to_thread(user_store.delete_alert_rule, rule_id)
+
+
+async def load_alert_rules():
+    return await asyncio.to_thread(user_store.load_alert_rules)
+
+
+async def set_dm_subscription(user_id, enabled):
+    await asyncio.to_thread(user_store.set_dm_subscription, user_id, enabled)
+
+
+async def load_dm_subscribers():
+    return await asyncio.to_thread(user_store.load_dm_subscribers)
+
+
+async def run_leader_election(on_elected):
+    """Выбор лидера через аренду в хранилище: только лидер опрашивает API и шлёт алерты.
+
+    on_elected() запускает задачи опроса и возвращает их список; при потере аренды
+    задачи отменяются, и процесс снова ждёт своей очереди.
+    """
+    holder = f"{socket.gethostname()}:{os.getpid()}"
+    tasks = []
+    while True:
+        try:
+            is_leader = await asyncio.to_thread(store.try_acquire_lease, "poller", holder, LEADER_LEASE_TTL)
+        except Exception as e:
+            # Не смогли продлить аренду — уступаем, чтобы не было двух лидеров
+            logger.error(f"Error renewing poller lease: {e}")
+            is_leader = False
+
+        if is_leader and not tasks:
+            logger.info(f"{holder} acquired the poller lease.")
+            tasks = await on_elected()
+        elif not is_leader and tasks:
+            logger.warning(f"{holder} lost the poller lease, stopping polling.")
+            for task in tasks:
+                task.cancel()
+            tasks = []
+        await asyncio.sleep(LEADER_LEASE_TTL / 3)
@@ -0,0 +1,97 @@
+# utils/state_sync.py
+
+import asyncio
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from utils.cache import get_validator_cache
+from utils.http import fetch_json
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+STATE_SYNC_REFRESH_INTERVAL = int(os.getenv("STATE_SYNC_REFRESH_INTERVAL", "600"))  # 10 минут
+STATE_SYNC_HEIGHT_STEP = 1000  # trust_height округляется вниз до кратного 1000, как в инструкции
+STATE_SYNC_MIN_CONFIRMATIONS = int(os.getenv("STATE_SYNC_MIN_CONFIRMATIONS", "2"))
+
+
+async def fetch_latest_height(rpc_url):
+    data = await fetch_json(f"{rpc_url}/status", ttl=0)
+    if not data:
+        return None
+    return int(data['result']['sync_info']['latest_block_height'])
+
+
+async def fetch_block_hash(rpc_url, height):
+    data = await fetch_json(f"{rpc_url}/block", params={'height': str(height)}, ttl=0)
+    if not data:
+        return None
+    return data['result']['block_id']['hash']
+
+
+async def _safe(coro, rpc_url, what):
+    try:
+        return await coro
+    except Exception as e:
+        logger.warning(f"Failed to fetch {what} from {rpc_url}: {e}")
+        return None
+
+
+async def compute_trust_point(network):
+    """Вычисляет trust_height/trust_hash и сверяет hash по нескольким RPC.
+
+    Возвращает словарь с параметрами state sync или None, если RPC не согласны
+    между собой или подтверждений меньше STATE_SYNC_MIN_CONFIRMATIONS.
+    """
+    rpcs = network.state_sync_rpcs
+    heights = await asyncio.gather(*(_safe(fetch_latest_height(rpc), rpc, "status") for rpc in rpcs))
+    available = [(rpc, height) for rpc, height in zip(rpcs, heights) if height]
+    if not available:
+        logger.error(f"[{network.name}] No state sync RPC is available.")
+        return None
+
+    # Берём минимальную высоту, чтобы блок точно был на всех RPC
+    latest_height = min(height for _, height in available)
+    trust_height = (latest_height // STATE_SYNC_HEIGHT_STEP) * STATE_SYNC_HEIGHT_STEP
+
+    hashes = await asyncio.gather(
+        *(_safe(fetch_block_hash(rpc, trust_height), rpc, f"block {trust_height}") for rpc, _ in available)
+    )
+    confirmed = {rpc: block_hash for (rpc, _), block_hash in zip(available, hashes) if block_hash}
+    distinct_hashes = set(confirmed.values())
+    if len(distinct_hashes) > 1:
+        logger.error(f"[{network.name}] State sync RPCs disagree on block {trust_height}: {confirmed}")
+        return None
+    if len(confirmed) < min(STATE_SYNC_MIN_CONFIRMATIONS, len(rpcs)):
+        logger.error(f"[{network.name}] Block {trust_height} hash confirmed by {len(confirmed)} RPC(s) only.")
+        return None
+
+    rpc_servers = list(confirmed)
+    # CometBFT требует минимум два адреса в rpc_servers
+    if len(rpc_servers) == 1:
+        rpc_servers = rpc_servers * 2
+    return {
+        "trust_height": trust_height,
+        "trust_hash": distinct_hashes.pop(),
+        "latest_height": latest_height,
+        "rpc_servers": rpc_servers,
+        "verified_by": len(confirmed),
+        "updated": time.time(),
+    }
+
+
+async def run_state_sync_refresher(network):
+    """Фоновая задача: держит в кэше сети свежую проверенную точку доверия."""
+    while True:
+        try:
+            trust_point = await compute_trust_point(network)
+            if trust_point:
+                get_validator_cache(network.name)["state_sync"] = trust_point
+                logger.info(
+                    f"[{network.name}] State sync trust point: height {trust_point['trust_height']}, "
+                    f"hash {trust_point['trust_hash']} (verified by {trust_point['verified_by']} RPCs)."
+                )
+        except Exception as e:
+            logger.error(f"[{network.name}] Error computing state sync trust point: {e}")
+        await asyncio.sleep(STATE_SYNC_REFRESH_INTERVAL)
@@ -1,172 +1,203 @@
 import asyncio
-import aiohttp
 import base64
 import hashlib
+import json
 import logging
-import os
+import re
+import time
 from Crypto.Hash import RIPEMD160
 import bech32
-from dotenv import load_dotenv
-from utils.cache import validator_cache
+from utils.cache import get_validator_cache
 from utils.cache import selected_validators
+from utils.http import get_session
+from utils.networks import get_network
+from utils.metrics import observe_latency
+from utils.refresh_executor import run_cpu
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
-COSMOS_API_URL = os.getenv("COSMOS_API_URL")
-COSMOS_RESERVE_API_URL = os.getenv("COSMOS_RESERVE_API_URL")
-
-async def fetch_validators(session, api_url):
-    """Получение списка валидаторов."""
-    validators = []
+async def fetch_pages(session, url, limit):
+    """Сырые страницы ответа с учётом пагинации. JSON здесь не разбирается: это делает build_validator_snapshot вне event loop."""
+    pages = []
     next_key = None
     while True:
-        params = {'pagination.limit': '20000'}
+        params = {'pagination.limit': str(limit)}
         if next_key:
             params['pagination.key'] = next_key
-        url = f"{api_url}/cosmos/staking/v1beta1/validators"
         async with session.get(url, params=params) as response:
-            if response.status == 200:
-                data = await response.json()
-                validators.extend(data.get('validators', []))
-                next_key = data.get('pagination', {}).get('next_key')
-                if not next_key:
-                    break
-            else:
-                logger.error(f"Ошибка при получении валидаторов: {response.status}")
+            if response.status != 200:
+                logger.error(f"Ошибка при запросе {url}: {response.status}")
                 return []
-    return validators
+            body = await response.read()
+        pages.append(body)
+        next_key = _next_key(body)
+        if not next_key:
+            break
+    return pages
 
-async def fetch_all_signing_infos(session, api_url):
-    """Получение всех signing_infos с учётом пагинации."""
-    signing_infos = []
-    next_key = None
-    while True:
-        params = {'pagination.limit': '2000'}
-        if next_key:
-            params['pagination.key'] = next_key
-        url = f"{api_url}/cosmos/slashing/v1beta1/signing_infos"
-        async with session.get(url, params=params) as response:
-            if response.status == 200:
-                data = await response.json()
-                signing_infos.extend(data.get('info', []))
-                next_key = data.get('pagination', {}).get('next_key')
-                if not next_key:
-                    break
-            else:
-                logger.error(f"Ошибка при получении signing_infos: {response.status}")
-                return []
-    return signing_infos
 
-def convert_pubkey_to_address(pubkey_base64):
+_NEXT_KEY = re.compile(rb'"next_key"\s*:\s*(?:null|"([^"]*)")')
+
+
+def _next_key(body):
+    """next_key из страницы без разбора всего JSON: pagination стоит в конце ответа."""
+    position = body.rfind(b'"next_key"')
+    if position < 0:
+        return None
+    match = _NEXT_KEY.match(body, position)
+    return match.group(1).decode() if match and match.group(1) else None
+
+
+def convert_pubkey_to_address(pubkey_base64, prefix="storyvalcons"):
     try:
         pubkey_bytes = base64.b64decode(pubkey_base64)
         sha256_digest = hashlib.sha256(pubkey_bytes).digest()
         ripemd160 = RIPEMD160.new()
         ripemd160.update(sha256_digest)
         ripemd160_digest = ripemd160.digest()
-        # Префикс меняется в зависимости от вашей сети (например, "cosmosvalcons")
-        bech32_address = bech32.bech32_encode("storyvalcons", bech32.convertbits(ripemd160_digest, 8, 5))
+        # Префикс берётся из профиля сети (например, "storyvalcons" или "cosmosvalcons")
+        bech32_address = bech32.bech32_encode(prefix, bech32.convertbits(ripemd160_digest, 8, 5))
         return bech32_address
     except Exception as e:
         logger.error(f"Ошибка при конвертации публичного ключа в адрес: {e}")
         return None
 
-async def get_window_size(session, api_url):
+async def get_slashing_params(session, api_url):
+    """signed_blocks_window и min_signed_per_window из параметров slashing."""
     url = f"{api_url}/cosmos/slashing/v1beta1/params"
     async with session.get(url) as response:
         if response.status == 200:
             data = await response.json()
             window_size = int(data['params']['signed_blocks_window'])
-            return window_size
+            min_signed = float(data['params']['min_signed_per_window'])
+            return window_size, min_signed
         else:
             logger.error(f"Failed to fetch slashing params: {response.status}")
-            return None
+            return None, None
+
+def build_validator_snapshot(validator_pages, signing_pages, window_size, min_signed, valcons_prefix):
+    """Разбор страниц и сборка данных валидаторов — вся работа для CPU при обновлении.
+
+    Выполняется в пуле refresh_executor; возвращает (validator_data, summary, problems) или None,
+    problems — сообщения для лога родительского процесса.
+    """
+    validators = [v for page in validator_pages for v in json.loads(page).get('validators', [])]
+    signing_infos = [i for page in signing_pages for i in json.loads(page).get('info', [])]
+    if not validators or not signing_infos:
+        return None
 
-async def get_validator_uptimes():
-    """Функция для обновления данных валидаторов и аптайма."""
+    # Инициализируем словарь для данных валидаторов
+    validator_data = {}
+    problems = []
+    summary = {
+        "total": len(validators),
+        "active": 0,
+        "inactive": 0,
+        "jailed": 0,
+        "signed_blocks_window": window_size,
+        "min_signed_per_window": min_signed,
+    }
+
+    # Получаем signing_infos только для активных валидаторов
+    active_validators = [v for v in validators if v.get("status") == "BOND_STATUS_BONDED" and not v.get("jailed", False)]
+    summary["active"] = len(active_validators)
+    summary["inactive"] = len(validators) - len(active_validators)
+
+    signing_info_dict = {info['address']: info for info in signing_infos}
+
+    for validator in validators:
+        operator_address = validator.get("operator_address")
+        moniker = validator.get("description", {}).get("moniker", "Unknown")
+        status = validator.get("status")
+        jailed = validator.get("jailed", False)
+        commission = float(validator.get("commission", {}).get("commission_rates", {}).get("rate", 0))
+        consensus_pubkey = validator.get("consensus_pubkey", {}).get("key")
+
+        if jailed:
+            summary["jailed"] += 1
+
+        uptime_percent = 0.0  # По умолчанию аптайм 0%
+        consensus_address = None
+        missed_blocks = None
+        index_offset = None
+
+        # Если валидатор активен, вычисляем аптайм
+        if status == "BOND_STATUS_BONDED" and not jailed:
+            consensus_address = convert_pubkey_to_address(consensus_pubkey, valcons_prefix)
+            if not consensus_address:
+                problems.append(f"Не удалось конвертировать публичный ключ валидатора {moniker}")
+                continue
+
+            signing_info = signing_info_dict.get(consensus_address)
+            if not signing_info:
+                problems.append(f"Не найден signing_info для валидатора {moniker} с адресом {consensus_address}")
+                continue
+
+            missed_blocks = int(signing_info.get("missed_blocks_counter", 0))
+            # index_offset растёт на 1 с каждым блоком, в котором валидатор должен был подписывать
+            index_offset = int(signing_info.get("index_offset", 0))
+            uptime_percent = round((1 - missed_blocks / window_size) * 100, 2)
+
+        validator_data[operator_address] = {
+            'moniker': moniker,
+            'uptime': uptime_percent,
+            'status': status,
+            'jailed': jailed,
+            'commission': commission,
+            'tokens': int(validator.get("tokens", 0)),
+            'consensus_address': consensus_address,
+            'missed_blocks': missed_blocks,
+            'index_offset': index_offset,
+        }
+    return validator_data, summary, problems
+
+
+async def get_validator_uptimes(network=None):
+    """Функция для обновления данных валидаторов и аптайма в кэше сети.
+
+    Сетевые запросы идут в event loop, а разбор ответов и сборка снимка — в пуле
+    refresh_executor; готовый снимок подменяет кэш одним присваиванием.
+    """
+    network = network or get_network()
+    validator_cache = get_validator_cache(network.name)
     try:
-        current_api_url = COSMOS_API_URL
-        main_api_available = await check_api_availability(COSMOS_API_URL)
+        current_api_url = network.api_url
+        main_api_available = await check_api_availability(network.api_url)
 
         if not main_api_available:
-            logger.info(f"Switching to reserve API URL: {COSMOS_RESERVE_API_URL}")
-            current_api_url = COSMOS_RESERVE_API_URL
-
-        async with aiohttp.ClientSession() as session:
-            validators = await fetch_validators(session, current_api_url)
-            if not validators:
-                return
-
-            # Инициализируем словарь для данных валидаторов
-            validator_data = {}
-            summary = {
-                "total": len(validators),
-                "active": 0,
-                "inactive": 0,
-                "jailed": 0
-            }
-
-            # Получаем signing_infos только для активных валидаторов
-            active_validators = [v for v in validators if v.get("status") == "BOND_STATUS_BONDED" and not v.get("jailed", False)]
-            summary["active"] = len(active_validators)
-            summary["inactive"] = len(validators) - len(active_validators)
-
-            signing_infos = await fetch_all_signing_infos(session, current_api_url)
-            if not signing_infos:
-                return
-
-            signing_info_dict = {info['address']: info for info in signing_infos}
-            window_size = await get_window_size(session, current_api_url)
-
-            for validator in validators:
-                operator_address = validator.get("operator_address")
-                moniker = validator.get("description", {}).get("moniker", "Unknown")
-                status = validator.get("status")
-                jailed = validator.get("jailed", False)
-                commission = float(validator.get("commission", {}).get("commission_rates", {}).get("rate", 0))
-                consensus_pubkey = validator.get("consensus_pubkey", {}).get("key")
-
-                if jailed:
-                    summary["jailed"] += 1
-
-                uptime_percent = 0.0  # По умолчанию аптайм 0%
-
-                # Если валидатор активен, вычисляем аптайм
-                if status == "BOND_STATUS_BONDED" and not jailed:
-                    consensus_address = convert_pubkey_to_address(consensus_pubkey)
-                    if not consensus_address:
-                        logger.error(f"Не удалось конвертировать публичный ключ валидатора {moniker}")
-                        continue
-
-                    signing_info = signing_info_dict.get(consensus_address)
-                    if not signing_info:
-                        logger.error(f"Не найден signing_info для валидатора {moniker} с адресом {consensus_address}")
-                        continue
-
-                    missed_blocks = int(signing_info.get("missed_blocks_counter", 0))
-                    uptime_percent = round((1 - missed_blocks / window_size) * 100, 2)
-
-                validator_data[operator_address] = {
-                    'moniker': moniker,
-                    'uptime': uptime_percent,
-                    'status': status,
-                    'jailed': jailed,
-                    'commission': commission
-                }
-
-            validator_cache["data"] = validator_data
-            validator_cache["summary"] = summary
-            validator_cache["last_updated"] = asyncio.get_event_loop().time()
-            logger.info("Validator cache updated successfully.")
+            logger.info(f"[{network.name}] Switching to reserve API URL: {network.reserve_api_url}")
+            current_api_url = network.reserve_api_url
+
+        session = get_session()
+        validator_pages = await fetch_pages(session, f"{current_api_url}/cosmos/staking/v1beta1/validators", 20000)
+        if not validator_pages:
+            return
+        signing_pages = await fetch_pages(session, f"{current_api_url}/cosmos/slashing/v1beta1/signing_infos", 2000)
+        if not signing_pages:
+            return
+        window_size, min_signed = await get_slashing_params(session, current_api_url)
+
+        start = time.perf_counter()
+        snapshot = await run_cpu(build_validator_snapshot, validator_pages, signing_pages,
+                                 window_size, min_signed, network.valcons_prefix)
+        observe_latency("refresh.build_snapshot", time.perf_counter() - start)
+        if snapshot is None:
+            return
+        validator_data, summary, problems = snapshot
+        for problem in problems:
+            logger.error(f"[{network.name}] {problem}")
+
+        validator_cache["data"] = validator_data
+        validator_cache["summary"] = summary
+        validator_cache["last_updated"] = asyncio.get_event_loop().time()
+        logger.info(f"[{network.name}] Validator cache updated successfully.")
     except Exception as e:
-        logger.error(f"Error updating validator data: {e}")
+        logger.error(f"[{network.name}] Error updating validator data: {e}")
 
 async def check_api_availability(api_url):
     """Проверка доступности API."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(api_url) as response:
-                return response.status == 200
+        async with get_session().get(api_url) as response:
+            return response.status == 200
     except Exception:
         return False
\ No newline at end of file
@@ -9,18 +9,19 @@ import discord
 from hashlib import sha256
 from bech32 import bech32_encode, convertbits
 from discord import Embed, Client
-from dotenv import load_dotenv
-import os
-from utils.cache import validator_cache, selected_validators
+from utils.cache import get_validator_cache, selected_validators
 from utils.validator_data import get_validator_uptimes
 from utils.validator_data import check_api_availability
+from utils.snapshot_store import publish_snapshot, sync_selections
+from utils.jail_predictor import check_jail_risk
+from utils.alert_rules import rule_index, changed_fields, format_rule_alert, sync_alert_rules
+from utils.alert_policy import check_uptime_alert, reset_uptime_level, route_alert
+from utils.search_index import rebuild_search_index
+from utils.voting_power import update_voting_power
+from utils.outbox import alert_targets, enqueue_alert, make_key
+from utils.dm_alerts import dm_subscribers, dm_recipients, dm_targets, channel_mentions, sync_dm_subscribers
 
-load_dotenv()
-
-COSMOS_API_URL = os.getenv("COSMOS_API_URL")
-COSMOS_RESERVE_API_URL = os.getenv("COSMOS_RESERVE_API_URL")
-
-previous_states = {}
+previous_states = {}  # {network_name: {operator_address: state}}
 
 alert_priority = {
     'jailed': 5,
@@ -31,54 +32,73 @@ alert_priority = {
     'inactive_insufficient': 6,
     'commission': 2,
     'uptime': 3,
+    'uptime_recovery': 3,
     'new_validator': 1
 }
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def monitor_validators(bot: Client, channel_id: int):
-    logger.info("Starting monitor_validators function.")
+async def monitor_validators(bot: Client, network):
+    """Обновляет кэш сети и проверяет алерты по расписанию этой сети."""
+    logger.info(f"Starting monitor_validators for network {network.name}.")
     while True:
         try:
-            logger.info("Checking validators and updating cache...")
-            await update_validator_cache(bot, channel_id)
+            logger.info(f"[{network.name}] Checking validators and updating cache...")
+            await update_validator_cache(bot, network)
         except Exception as e:
-            logger.error(f"Error during monitoring: {e}")
-        await asyncio.sleep(4 * 60)  # Интервал обновления - 4 минут
+            logger.error(f"[{network.name}] Error during monitoring: {e}")
+        await asyncio.sleep(network.refresh_interval)
 
-async def update_validator_cache(bot, channel_id):
+async def update_validator_cache(bot, network):
     """Фоновая задача для обновления кэша валидаторов и мониторинга."""
     try:
-        await get_validator_uptimes()
+        validator_cache = get_validator_cache(network.name)
+        await get_validator_uptimes(network)
+        await rebuild_search_index(network.name)
+        update_voting_power(network.name)
         validator_data = validator_cache["data"]
         summary = validator_cache["summary"]
         validator_cache["last_updated"] = discord.utils.utcnow()
+        await publish_snapshot(network.name)
+
+        # Подписки читаются до проверки каналов: после перезапуска dm_subscribers пуст, пока
+        # его не загрузили, и без канала алертов личные сообщения иначе не отправлялись бы
+        await sync_selections()
+        await sync_alert_rules()
+        await sync_dm_subscribers()
 
-        logger.info("Validator cache updated. Now checking for alerts...")
+        if not alert_targets(network) and not dm_subscribers:
+            logger.info(f"[{network.name}] Validator cache updated. No alert channel configured.")
+            return
+
+        logger.info(f"[{network.name}] Validator cache updated. Now checking for alerts...")
 
         # Выполнение проверки на изменения и отправка алертов
-        await check_validators(bot, channel_id, validator_data)
+        await check_validators(bot, network, validator_data)
+        await check_jail_risk(bot, network, validator_data, summary)
 
     except Exception as e:
-        logger.error(f"Error updating validator cache: {e}")
+        logger.error(f"[{network.name}] Error updating validator cache: {e}")
 
-async def check_validators(bot: Client, channel_id: int, validator_data):
+async def check_validators(bot: Client, network, validator_data):
+    network_name = network.name
     alerts = []
-    global previous_states
+    network_states = previous_states.setdefault(network_name, {})
 
-    if not previous_states:
-        previous_states = {v: data for v, data in validator_data.items()}
-        logger.info("Initialized previous_states with current validators.")
+    if not network_states:
+        network_states.update(validator_data)
+        logger.info(f"[{network_name}] Initialized previous_states with current validators.")
         return
 
+    changes = {}  # {operator_address: (previous, current, changed_fields)} для пользовательских правил
     for operator_address, validator in validator_data.items():
         moniker = validator['moniker']
         status = validator['status']
         jailed = validator['jailed']
         commission = validator.get('commission', 0)
         uptime = validator['uptime']
-        previous_state = previous_states.get(operator_address)
+        previous_state = network_states.get(operator_address)
 
         validator_alerts = []
 
@@ -86,40 +106,45 @@ async def check_validators(bot: Client, channel_id: int, validator_data):
             prev_status = previous_state.get('status')
             prev_jailed = previous_state.get('jailed')
             prev_commission = previous_state.get('commission')
-            prev_uptime = previous_state.get('uptime')
 
             #logger.debug(f"Previous state for {moniker}: status={prev_status}, jailed={prev_jailed}, commission={prev_commission}, uptime={prev_uptime}")
             #logger.debug(f"Current state for {moniker}: status={status}, jailed={jailed}, commission={commission}, uptime={uptime}")
 
             # Проверяем изменения и добавляем возможные алерты
             if commission != prev_commission:
-                alert = generate_alert("commission", moniker, prev_commission, commission, operator_address)
+                alert = generate_alert(network_name, "commission", moniker, prev_commission, commission, operator_address)
                 validator_alerts.append(('commission', alert))
             if not prev_jailed and jailed:
-                alert = generate_alert("jailed", moniker, None, None, operator_address)
+                alert = generate_alert(network_name, "jailed", moniker, None, None, operator_address)
                 validator_alerts.append(('jailed', alert))
             elif prev_jailed and not jailed:
                 if status == "BOND_STATUS_BONDED":
-                    alert = generate_alert("unjailed_active", moniker, None, None, operator_address)
+                    alert = generate_alert(network_name, "unjailed_active", moniker, None, None, operator_address)
                     validator_alerts.append(('unjailed_active', alert))
                 else:
-                    alert = generate_alert("unjailed_inactive", moniker, None, None, operator_address)
+                    alert = generate_alert(network_name, "unjailed_inactive", moniker, None, None, operator_address)
                     validator_alerts.append(('unjailed_inactive', alert))
             if prev_status != status:
                 if prev_status == "BOND_STATUS_BONDED" and status != "BOND_STATUS_BONDED":
                     if jailed:
-                        alert = generate_alert("inactive_jailed", moniker, None, None, operator_address)
+                        alert = generate_alert(network_name, "inactive_jailed", moniker, None, None, operator_address)
                         validator_alerts.append(('inactive_jailed', alert))
                     else:
-                        alert = generate_alert("inactive_insufficient", moniker, None, None, operator_address)
+                        alert = generate_alert(network_name, "inactive_insufficient", moniker, None, None, operator_address)
                         validator_alerts.append(('inactive_insufficient', alert))
                 elif prev_status != "BOND_STATUS_BONDED" and status == "BOND_STATUS_BONDED":
-                    alert = generate_alert("active", moniker, None, None, operator_address)
+                    alert = generate_alert(network_name, "active", moniker, None, None, operator_address)
                     validator_alerts.append(('active', alert))
             if status == "BOND_STATUS_BONDED" and not jailed:
-                uptime_alert = check_uptime_alert(moniker, prev_uptime, uptime, operator_address)
+                uptime_alert = check_uptime_alert(network_name, moniker, uptime, operator_address)
                 if uptime_alert:
-                    validator_alerts.append(('uptime', uptime_alert))
+                    validator_alerts.append(uptime_alert)
+            else:
+                reset_uptime_level(network_name, operator_address)
+
+            fields = changed_fields(previous_state, validator)
+            if fields:
+                changes[operator_address] = (previous_state, validator, fields)
         else:
             # Если предыдущего состояния нет, пропускаем этот валидатор
             # Это предотвратит отправку алертов для валидаторов без предыдущего состояния
@@ -128,32 +153,45 @@ async def check_validators(bot: Client, channel_id: int, validator_data):
 
         # Выбираем алерт с наивысшим приоритетом
         if validator_alerts:
-            highest_priority_alert = min(validator_alerts, key=lambda x: alert_priority.get(x[0], 99))
-            alerts.append(highest_priority_alert[1])
+            alert_type, alert = min(validator_alerts, key=lambda x: alert_priority.get(x[0], 99))
+            alerts.append((operator_address, alert_type, alert, dm_recipients(network_name, operator_address)))
 
         # Обновляем состояние валидатора
-        previous_states[operator_address] = validator
-
-    # Отправляем алерты
-    if alerts:
-        channel = await bot.fetch_channel(channel_id)
-        for alert in alerts:
-            try:
-                embed = Embed(title="Validator Alert", description=alert, color=discord.Color.red() if "⚠️" in alert or "🔴" in alert else discord.Color.green())
-                await channel.send(embed=embed, allowed_mentions=discord.AllowedMentions(users=True))
-                logger.info(f"Sent alert: {alert}")
-            except Exception as e:
-                logger.error(f"Failed to send alert: {e}")
-
-
-def generate_alert(alert_type, moniker, old_value, new_value, operator_address):
+        network_states[operator_address] = validator
+
+    # Пользовательские правила проверяются только для изменившихся валидаторов
+    for rule, rule_address, rule_moniker, text in rule_index.evaluate(network_name, changes):
+        recipients = [rule.user_id] if rule.user_id in dm_subscribers else []
+        alerts.append((rule_address, f"rule:{rule.kind}:{rule.rule_id}", format_rule_alert(rule, rule_moniker, text), recipients))
+
+    # Записываем алерты в outbox; отправляет их фоновый обработчик, так что медленный
+    # Discord не задерживает опрос, а сбой отправки не теряет алерт
+    cycle = get_validator_cache(network_name)["last_updated"]
+    for address, alert_type, alert, recipients in alerts:
+        # Cooldown и сводка: критичные алерты уходят в канал сразу, некритичные копятся в сводке.
+        # Подписчики с /dm_alerts получают в личку и те, и другие, не дожидаясь сводки.
+        route = await route_alert(network_name, address, alert_type, alert)
+        if route is None:
+            continue
+        targets = dm_targets(recipients)
+        if route == "send":
+            targets = alert_targets(network) + targets
+        if not targets:
+            continue
+        # Вебхуки бывают общими для сетей, поэтому сеть указывается в каждом алерте
+        embed = Embed(title=f"Validator Alert ({network_name})", description=alert, color=discord.Color.red() if "⚠️" in alert or "🔴" in alert else discord.Color.green())
+        await enqueue_alert(targets, embed, make_key(network_name, cycle, alert))
+        logger.info(f"Queued alert: {alert}")
+
+
+def generate_alert(network_name, alert_type, moniker, old_value, new_value, operator_address):
     """Генерация текста алертов."""
     operator_address = operator_address.lower()
     logger.debug(f"Generating alert: {alert_type} for {moniker} ({operator_address})")
     logger.debug(f"Selected validators: {selected_validators}")
-    user_list = [user_id for user_id, val_addr in selected_validators.items() if val_addr == operator_address]
-    logger.debug(f"Users to mention: {user_list}")
-    user_mentions = " ".join(f"<@{user_id}>" for user_id in user_list)
+    # Подписчики с /dm_alerts получают алерт в личку и в канале не упоминаются
+    user_mentions = channel_mentions(network_name, operator_address)
+    logger.debug(f"Users to mention: {user_mentions}")
 
     if alert_type == "commission":
         return f"⚠️ **{moniker}** has changed commission from **{old_value * 100:.2f}%** to **{new_value * 100:.2f}%**. {user_mentions}"
@@ -172,13 +210,3 @@ def generate_alert(alert_type, moniker, old_value, new_value, operator_address):
     elif alert_type == "new_validator":
         return f"🆕 **New validator {moniker}** has joined the network. {user_mentions}"
     return None
-
-def check_uptime_alert(moniker, prev_uptime, current_uptime, operator_address):
-    """Проверка пороговых значений аптайма и генерация одного алерта."""
-    thresholds = [95, 90, 80, 70, 60, 50]
-    for threshold in thresholds:
-        if prev_uptime < threshold <= current_uptime:
-            return f"🟢 **{moniker}** uptime has risen above {threshold}%: now at {current_uptime}%."
-        elif prev_uptime >= threshold > current_uptime:
-            return f"⚠️ **{moniker}** uptime has dropped below {threshold}%: now at {current_uptime}%."
-    return None
\ No newline at end of file
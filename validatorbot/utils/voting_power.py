@@ -0,0 +1,106 @@
+# utils/voting_power.py
+
+import logging
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+from utils.cache import get_validator_cache
+
+logger = logging.getLogger(__name__)
+
+# Если изменилось больше этой доли валидаторов, дешевле пересортировать всё заново
+FULL_REBUILD_RATIO = 0.25
+TOP_N = (1, 5, 10, 20)
+
+
+def _voting_power(validator):
+    """Голосующая сила есть только у активных валидаторов вне джейла."""
+    if validator.get("status") != "BOND_STATUS_BONDED" or validator.get("jailed"):
+        return 0
+    return validator.get("tokens") or 0
+
+
+class VotingPowerIndex:
+    """Active validators sorted by voting power, kept up to date between refreshes.
+
+    A refresh usually changes the stake of a handful of validators, so only those
+    entries are moved with bisect; derived metrics are rebuilt lazily on first use.
+    """
+
+    def __init__(self):
+        self.powers = {}     # {operator_address: tokens}
+        self.ranked = []     # [(-tokens, operator_address)], по убыванию силы
+        self.total = 0
+        self._cumulative = None  # накопленные суммы по ranked, строятся по запросу
+
+    def update(self, validator_data):
+        powers = {}
+        for address, validator in validator_data.items():
+            power = _voting_power(validator)
+            if power > 0:
+                powers[address] = power
+        changed = [address for address in self.powers.keys() | powers.keys()
+                   if self.powers.get(address) != powers.get(address)]
+        if not changed:
+            return 0
+
+        if len(changed) > max(1, len(self.ranked)) * FULL_REBUILD_RATIO:
+            self.ranked = sorted((-power, address) for address, power in powers.items())
+        else:
+            for address in changed:
+                old = self.powers.get(address)
+                if old is not None:
+                    del self.ranked[bisect_left(self.ranked, (-old, address))]
+                new = powers.get(address)
+                if new is not None:
+                    insort(self.ranked, (-new, address))
+        self.powers = powers
+        self.total = sum(powers.values())
+        self._cumulative = None
+        return len(changed)
+
+    @property
+    def cumulative(self):
+        if self._cumulative is None:
+            self._cumulative = list(accumulate(-negative for negative, _ in self.ranked))
+        return self._cumulative
+
+    def rank(self, address):
+        """Место валидатора по силе (с 1) или None, если у него нет голосующей силы."""
+        power = self.powers.get(address)
+        if power is None:
+            return None
+        return bisect_left(self.ranked, (-power, address)) + 1
+
+    def share(self, address):
+        power = self.powers.get(address)
+        return power / self.total if power and self.total else 0.0
+
+    def concentration(self, top_n):
+        """Доля голосующей силы у top_n крупнейших валидаторов."""
+        if not self.ranked or not self.total:
+            return 0.0
+        return self.cumulative[min(top_n, len(self.ranked)) - 1] / self.total
+
+    def nakamoto(self, threshold=1 / 3):
+        """Минимальное число валидаторов, у которых вместе больше threshold голосующей силы."""
+        if not self.total:
+            return 0
+        return min(len(self.ranked), bisect_right(self.cumulative, self.total * threshold) + 1)
+
+    def top(self, count=None):
+        """[(operator_address, tokens)] по убыванию силы."""
+        return [(address, -negative) for negative, address in self.ranked[:count]]
+
+
+voting_power_indexes = {}  # {network_name: VotingPowerIndex}
+
+
+def get_voting_power_index(network_name):
+    return voting_power_indexes.setdefault(network_name, VotingPowerIndex())
+
+
+def update_voting_power(network_name):
+    index = get_voting_power_index(network_name)
+    changed = index.update(get_validator_cache(network_name)["data"])
+    logger.debug(f"[{network_name}] Voting power index: {changed} validator(s) changed, {len(index.ranked)} ranked.")
+    return index
@@ -0,0 +1,129 @@
+# utils/webhooks.py
+
+import aiohttp
+import asyncio
+import datetime
+import logging
+import os
+from email.utils import parsedate_to_datetime
+from dotenv import load_dotenv
+from utils.http import get_session
+from utils.networks import networks
+from utils.outbox import PermanentDeliveryError, register_sender
+from utils.ratelimit import TokenBucket
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Вебхуки задаются на сеть: TESTNET_ALERT_WEBHOOKS=ops=discord:https://discord.com/api/webhooks/...,partner=json:https://...
+# Каждая цель — отдельная строка в outbox ("webhook:<name>"), поэтому медленный или
+# недоступный получатель не задерживает остальных.
+WEBHOOK_RATE = float(os.getenv("WEBHOOK_RATE", "1"))    # сообщений в секунду на вебхук
+WEBHOOK_BURST = int(os.getenv("WEBHOOK_BURST", "5"))
+WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "10"))
+# 429 с retry_after не больше этого значения переждать на месте, иначе отдать повтор outbox
+WEBHOOK_MAX_INLINE_WAIT = float(os.getenv("WEBHOOK_MAX_INLINE_WAIT", "30"))
+
+
+class WebhookTarget:
+    """One alert webhook: a Discord webhook URL or a generic endpoint accepting JSON."""
+
+    def __init__(self, name, kind, url):
+        self.name = name
+        self.kind = kind
+        self.url = url
+        self.bucket = TokenBucket(WEBHOOK_RATE, WEBHOOK_BURST)
+
+    async def acquire(self):
+        while not self.bucket.try_acquire():
+            await asyncio.sleep(self.bucket.retry_after())
+
+
+webhook_targets = {}  # {name: WebhookTarget}
+
+
+def load_webhook_targets():
+    """Собирает вебхуки всех сетей. Одно имя в разных сетях — одна цель, если URL совпадает."""
+    for network in networks.values():
+        for name, (kind, url) in network.webhooks.items():
+            existing = webhook_targets.get(name)
+            if existing and (existing.kind, existing.url) != (kind, url):
+                logger.error(f"Alert webhook {name} is configured differently in {network.name}, keeping the first one")
+                continue
+            if not existing:
+                webhook_targets[name] = WebhookTarget(name, kind, url)
+    if webhook_targets:
+        logger.info(f"Alert webhooks: {', '.join(f'{t.name} ({t.kind})' for t in webhook_targets.values())}")
+    return webhook_targets
+
+
+def _request(target, payload, key):
+    embed = payload["embed"]
+    if target.kind == "discord":
+        mentions = ["users"] if payload.get("mention_users", True) else []
+        return f"{target.url}?wait=true", {"embeds": [embed], "allowed_mentions": {"parse": mentions}}, {}
+    body = {
+        "id": key,
+        "title": embed.get("title"),
+        "description": embed.get("description"),
+        "color": embed.get("color"),
+    }
+    # Получатель может отбрасывать повторы по ключу: после сбоя outbox повторит ту же строку
+    return target.url, body, {"Idempotency-Key": key}
+
+
+def _parse_retry_after(value):
+    """Retry-After в секундах или в виде HTTP-даты; None, если заголовка нет или он не разбирается."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+async def _retry_after(response):
+    """Сколько ждать после 429: retry_after из тела (Discord), иначе заголовок Retry-After."""
+    try:
+        data = await response.json(content_type=None)
+        return float(data.get("retry_after"))
+    except Exception:
+        return _parse_retry_after(response.headers.get("Retry-After"))
+
+
+async def send_to_webhook(bot, address, payload, key):
+    target = webhook_targets.get(address)
+    if target is None:
+        raise PermanentDeliveryError(f"Alert webhook {address} is not configured")
+    url, body, headers = _request(target, payload, key)
+    while True:
+        await target.acquire()
+        session = get_session()
+        async with session.post(url, json=body, headers=headers,
+                                timeout=aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT)) as response:
+            if response.status < 300:
+                return
+            if response.status == 429:
+                delay = await _retry_after(response)
+                if delay is None:
+                    # Срок не указан — повтор по расписанию outbox с экспоненциальной задержкой
+                    raise RuntimeError("rate limited")
+                if delay > WEBHOOK_MAX_INLINE_WAIT:
+                    raise RuntimeError(f"rate limited for {delay:.0f}s")
+                logger.warning(f"Alert webhook {target.name} rate limited, waiting {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            # 4xx (кроме таймаута) — вебхук удалён или не принимает такие запросы, повтор не поможет
+            if 400 <= response.status < 500 and response.status != 408:
+                raise PermanentDeliveryError(f"HTTP {response.status}")
+            raise RuntimeError(f"HTTP {response.status}")
+
+
+register_sender("webhook", send_to_webhook)